@@ -4,7 +4,7 @@ AI自動カット編集＆テロップ生成システム - GUIアプリケーシ
 """
 import os
 import sys
-import threading
+import logging
 from pathlib import Path
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
@@ -12,7 +12,8 @@ from PyQt6.QtWidgets import (
     QSpinBox, QTextEdit, QGroupBox, QFormLayout, QMessageBox,
     QProgressBar, QComboBox
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QObject
+from PyQt6.QtCore import Qt, pyqtSignal, QObject, QThread, QRunnable, QThreadPool, QUrl
+from PyQt6.QtGui import QDesktopServices
 
 # 設定をインポート
 from config import OPENAI_API_KEY as DEFAULT_API_KEY, DEFAULT_SETTINGS
@@ -20,15 +21,57 @@ from config import OPENAI_API_KEY as DEFAULT_API_KEY, DEFAULT_SETTINGS
 # 処理関数をインポート
 from process_video import process_video
 
-class WorkerSignals(QObject):
-    """ワーカースレッドからのシグナルを定義するクラス"""
-    finished = pyqtSignal()
+# 設定のデフォルト値
+_DEFAULT_SILENCE = DEFAULT_SETTINGS.get('silence_threshold', 1.0)
+_DEFAULT_MAX_CHARS = DEFAULT_SETTINGS.get('max_chars_per_line', 15)
+_DEFAULT_OUTPUT_DIR = DEFAULT_SETTINGS.get('output_dir', 'output')
+
+# 出力フォーマットのコンボボックスのインデックスに対応するフォーマット文字列
+_FORMAT_MAP = (
+    "xml",         # Premiere Pro XML (推奨)
+    "pure-fcp7",   # Pure FCP7 XML
+    "edl",         # EDL
+    "all"          # 全フォーマット
+)
+
+class QtLogHandler(QObject, logging.Handler):
+    """ログレコードをQtシグナルとして送出するハンドラ"""
+    log = pyqtSignal(str)
+
+    def __init__(self):
+        QObject.__init__(self)
+        logging.Handler.__init__(self, level=logging.INFO)
+        self.setFormatter(logging.Formatter("%(message)s"))
+
+    def emit(self, record):
+        """ログレコードを文字列に整形してシグナルで送信"""
+        try:
+            self.log.emit(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+class StatRunnerSignals(QObject):
+    """StatRunnerからのシグナルを定義するクラス"""
+    found = pyqtSignal(list)
+
+class StatRunner(QRunnable):
+    """ファイルの存在確認をスレッドプールで行うクラス"""
+    def __init__(self, paths):
+        super().__init__()
+        self.paths = paths
+        self.signals = StatRunnerSignals()
+
+    def run(self):
+        """存在するファイルのみをシグナルで通知"""
+        self.signals.found.emit([path for path in self.paths if os.path.exists(path)])
+
+class Worker(QThread):
+    """バックグラウンドでの処理を行うワーカークラス"""
     error = pyqtSignal(str)
     progress = pyqtSignal(str)
+    percent = pyqtSignal(int)
     result = pyqtSignal(str)
 
-class Worker(threading.Thread):
-    """バックグラウンドでの処理を行うワーカークラス"""
     def __init__(self, video_path, silence_threshold, margin, max_chars_per_line, api_key, output_format, output_folder):
         super().__init__()
         self.video_path = video_path
@@ -38,22 +81,23 @@ class Worker(threading.Thread):
         self.api_key = api_key
         self.output_format = output_format
         self.output_folder = output_folder
-        self.signals = WorkerSignals()
-        self.daemon = True  # メインスレッドが終了したら一緒に終了
 
     def run(self):
-        """スレッドの実行"""
+        """スレッドの実行（終了時はQThread.finishedが発行される）"""
+        # 処理ログをUIスレッドに転送
+        log_handler = QtLogHandler()
+        log_handler.log.connect(self.progress.emit)
+        root_logger = logging.getLogger()
+        root_logger.addHandler(log_handler)
+        # INFOのログもハンドラに届くよう一時的にレベルを下げる（終了時に元に戻す）
+        previous_level = root_logger.level
+        if root_logger.level > logging.INFO or root_logger.level == logging.NOTSET:
+            root_logger.setLevel(logging.INFO)
+
         try:
             # APIキーを設定
             os.environ["OPENAI_API_KEY"] = self.api_key
             
-            # ログ出力をキャプチャするためのリダイレクト
-            from io import StringIO
-            import sys
-            old_stdout = sys.stdout
-            redirected_output = StringIO()
-            sys.stdout = redirected_output
-            
             # 動画処理を実行
             output_file = process_video(
                 self.video_path,
@@ -61,20 +105,19 @@ class Worker(threading.Thread):
                 margin=self.margin,
                 max_chars_per_line=self.max_chars_per_line,
                 output_format=self.output_format,
-                output_dir=self.output_folder
+                output_dir=self.output_folder,
+                on_progress=self.percent.emit
             )
             
-            # 標準出力を元に戻す
-            sys.stdout = old_stdout
-            
-            # 完了シグナルを発行
-            self.signals.result.emit(output_file)
-            self.signals.finished.emit()
+            # 結果シグナルを発行
+            self.result.emit(output_file or "")
             
         except Exception as e:
             # エラー発生時のシグナル
-            self.signals.error.emit(str(e))
-            self.signals.finished.emit()
+            self.error.emit(str(e))
+        finally:
+            root_logger.removeHandler(log_handler)
+            root_logger.setLevel(previous_level)
 
 class MainWindow(QMainWindow):
     """メインウィンドウクラス"""
@@ -115,7 +158,7 @@ class MainWindow(QMainWindow):
         # 無音閾値
         self.silence_threshold = QDoubleSpinBox()
         self.silence_threshold.setRange(0.1, 10.0)
-        self.silence_threshold.setValue(DEFAULT_SETTINGS.get('silence_threshold', 1.0))
+        self.silence_threshold.setValue(_DEFAULT_SILENCE)
         self.silence_threshold.setSingleStep(0.1)
         self.silence_threshold.setDecimals(1)
         self.silence_threshold.setSuffix(" 秒")
@@ -133,7 +176,7 @@ class MainWindow(QMainWindow):
         # テロップ1行の最大文字数
         self.max_chars_per_line = QSpinBox()
         self.max_chars_per_line.setRange(5, 30)
-        self.max_chars_per_line.setValue(DEFAULT_SETTINGS.get('max_chars_per_line', 15))
+        self.max_chars_per_line.setValue(_DEFAULT_MAX_CHARS)
         self.max_chars_per_line.setSuffix(" 文字")
         params_layout.addRow("テロップ1行の最大文字数:", self.max_chars_per_line)
         
@@ -162,7 +205,7 @@ class MainWindow(QMainWindow):
         output_group = QGroupBox("出力設定")
         output_layout = QHBoxLayout()
         
-        self.output_folder_label = QLabel(DEFAULT_SETTINGS.get('output_dir', 'output'))
+        self.output_folder_label = QLabel(_DEFAULT_OUTPUT_DIR)
         self.output_folder_label.setStyleSheet("QLabel { padding: 5px; border: 1px solid gray; border-radius: 3px; }")
         
         select_output_button = QPushButton("出力フォルダを選択")
@@ -201,17 +244,20 @@ class MainWindow(QMainWindow):
         self.video_path = None
         self.worker = None
         self.output_file = None
+        self._last_dir = str(Path.home())  # 前回ファイルを選択したフォルダ
     
     def select_file(self):
         """ファイル選択ダイアログを表示"""
         file_path, _ = QFileDialog.getOpenFileName(
             self, 
             "動画ファイルを選択", 
-            str(Path.home()),
-            "動画ファイル (*.mp4 *.mov *.avi *.mkv);;音声ファイル (*.wav *.mp3 *.aac *.m4a);;すべてのファイル (*.*)"
+            self._last_dir,
+            "動画ファイル (*.mp4 *.mov *.avi *.mkv);;音声ファイル (*.wav *.mp3 *.aac *.m4a);;すべてのファイル (*.*)",
+            options=QFileDialog.Option.ReadOnly | QFileDialog.Option.DontResolveSymlinks
         )
         
         if file_path:
+            self._last_dir = os.path.dirname(file_path)
             self.video_path = file_path
             self.file_path_label.setText(file_path)
             self.log_text.append(f"ファイルを選択しました: {file_path}")
@@ -222,7 +268,7 @@ class MainWindow(QMainWindow):
             self,
             "出力フォルダを選択",
             self.output_folder_label.text(),
-            QFileDialog.Option.ShowDirsOnly
+            QFileDialog.Option.ShowDirsOnly | QFileDialog.Option.ReadOnly | QFileDialog.Option.DontResolveSymlinks
         )
         
         if folder_path:
@@ -246,13 +292,7 @@ class MainWindow(QMainWindow):
         max_chars_per_line = self.max_chars_per_line.value()
         
         # フォーマットを取得（インデックスをフォーマット文字列に変換）
-        format_map = {
-            0: "xml",         # Premiere Pro XML (推奨)
-            1: "pure-fcp7",   # Pure FCP7 XML
-            2: "edl",         # EDL
-            3: "all"          # 全フォーマット
-        }
-        output_format = format_map[self.output_format.currentIndex()]
+        output_format = _FORMAT_MAP[self.output_format.currentIndex()]
         
         # ログにパラメータを表示
         self.log_text.append("---- 処理開始 ----")
@@ -262,7 +302,8 @@ class MainWindow(QMainWindow):
         self.log_text.append(f"出力フォーマット: {self.output_format.currentText()}")
         self.log_text.append("処理中...")
         
-        # 進捗バーを表示
+        # 進捗バーを表示（進捗率を受け取るまでは不定進行表示）
+        self.progress_bar.setRange(0, 0)
         self.progress_bar.setVisible(True)
         
         # 出力フォルダを取得
@@ -279,14 +320,22 @@ class MainWindow(QMainWindow):
             output_folder
         )
         
-        # シグナル接続
-        self.worker.signals.finished.connect(self.on_worker_finished)
-        self.worker.signals.error.connect(self.on_worker_error)
-        self.worker.signals.result.connect(self.on_worker_result)
+        # シグナル接続（ワーカースレッドからのシグナルはUIスレッドのキューで処理）
+        self.worker.progress.connect(self.log_text.append, Qt.ConnectionType.QueuedConnection)
+        self.worker.percent.connect(self.on_worker_percent, Qt.ConnectionType.QueuedConnection)
+        self.worker.finished.connect(self.on_worker_finished)
+        self.worker.error.connect(self.on_worker_error)
+        self.worker.result.connect(self.on_worker_result)
         
         # スレッド開始
         self.worker.start()
     
+    def on_worker_percent(self, percent):
+        """進捗率受信時の処理"""
+        if self.progress_bar.maximum() == 0:
+            self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(percent)
+    
     def on_worker_finished(self):
         """ワーカー終了時の処理"""
         self.progress_bar.setVisible(False)
@@ -308,8 +357,7 @@ class MainWindow(QMainWindow):
             
             # 出力フォルダを開く
             if msg.clickedButton() == open_button:
-                import subprocess
-                subprocess.Popen(['open', os.path.dirname(self.output_file)])
+                QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.dirname(self.output_file)))
     
     def on_worker_error(self, error_msg):
         """エラー発生時の処理"""
@@ -325,11 +373,19 @@ class MainWindow(QMainWindow):
             if self.output_format.currentIndex() == 3:  # 全フォーマット
                 output_dir = os.path.dirname(output_file)
                 base_name = Path(self.video_path).stem
-                # 他の生成されたファイルも表示
-                for ext in ['.xml', '_fcp7.xml', '.edl', '.srt']:
-                    file_path = os.path.join(output_dir, f"{base_name}_edited{ext}")
-                    if os.path.exists(file_path) and file_path != output_file:
-                        self.log_text.append(f"追加出力ファイル: {file_path}")
+                # 他の生成されたファイルも表示（存在確認はスレッドプールで実行）
+                candidates = [
+                    os.path.join(output_dir, f"{base_name}_edited{ext}")
+                    for ext in ['.xml', '_fcp7.xml', '.edl', '.srt']
+                ]
+                self._stat_runner = StatRunner([path for path in candidates if path != output_file])
+                self._stat_runner.signals.found.connect(self.on_extra_files_found, Qt.ConnectionType.QueuedConnection)
+                QThreadPool.globalInstance().start(self._stat_runner)
+    
+    def on_extra_files_found(self, file_paths):
+        """追加の出力ファイル確認後の処理"""
+        for file_path in file_paths:
+            self.log_text.append(f"追加出力ファイル: {file_path}")
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -39,3 +39,6 @@ GPT_MODEL = "gpt-4o"
 
 # Whisperモデル名
 WHISPER_MODEL = "whisper-1"
+
+# ローカル文字起こし（faster-whisper）のモデルサイズ
+FASTER_WHISPER_MODEL = "large-v3"
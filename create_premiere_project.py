@@ -5,10 +5,11 @@ Premiere Proプロジェクトファイルを直接生成
 """
 import os
 import sys
-import json
 import subprocess
 from pathlib import Path
 
+from utils import fastjson
+
 def create_premiere_project_script(video_path, segments_path, output_dir):
     """
     Adobe ExtendScript (JSX) を生成してPremiere Proを制御
@@ -18,8 +19,12 @@ def create_premiere_project_script(video_path, segments_path, output_dir):
     output_dir.mkdir(exist_ok=True)
     
     # セグメントデータを読み込み
-    with open(segments_path, 'r') as f:
-        segments = json.load(f)
+    with open(segments_path, 'rb') as f:
+        segments = fastjson.load(f)
+    
+    # イン点・アウト点を別々の配列として埋め込む（JSX側でのオブジェクト参照を減らす）
+    ins_js = fastjson.dumps([segment["start"] for segment in segments], ensure_ascii=False)
+    outs_js = fastjson.dumps([segment["end"] for segment in segments], ensure_ascii=False)
     
     # JSXスクリプトを生成
     jsx_content = f"""
@@ -43,14 +48,14 @@ var videoTrack = sequence.videoTracks[0];
 var audioTrack = sequence.audioTracks[0];
 
 // セグメントごとにクリップを配置
-var segments = {json.dumps(segments)};
+var ins = {ins_js};
+var outs = {outs_js};
+var count = ins.length;
 var currentTime = 0;
 
-for (var i = 0; i < segments.length; i++) {{
-    var segment = segments[i];
-    var inPoint = segment.start;
-    var outPoint = segment.end;
-    var duration = outPoint - inPoint;
+for (var i = 0; i < count; i++) {{
+    var inPoint = ins[i];
+    var outPoint = outs[i];
     
     // サブクリップを作成してタイムラインに配置
     projectItem.setInPoint(inPoint, 4); // 4 = seconds
@@ -62,7 +67,7 @@ for (var i = 0; i < segments.length; i++) {{
     // オーディオトラックに挿入
     audioTrack.insertClip(projectItem, currentTime);
     
-    currentTime += duration;
+    currentTime += outPoint - inPoint;
 }}
 
 // プロジェクトを保存
@@ -3,8 +3,9 @@
 主要なセグメントのみを検出（5秒以上の無音で区切る）
 """
 
-import json
-from utils.silence_detector import SilenceDetector
+import numpy as np
+from utils import fastjson
+from utils.silence_detector_ffmpeg import FFmpegSilenceDetector
 
 def main():
     video_path = '/Users/takayakazuki/Desktop/IMG_2525.mov'
@@ -16,7 +17,7 @@ def main():
     print("  silence_thresh: -35dB")
     print("  keep_silence: 500ms")
     
-    detector = SilenceDetector(
+    detector = FFmpegSilenceDetector(
         min_silence_len=5000,  # 5秒以上の無音のみ検出
         silence_thresh=-35,    # 感度を高めに
         keep_silence=500       # 前後に500ms残す
@@ -25,30 +26,33 @@ def main():
     # 無音検出を実行
     segments = detector.analyze_video(video_path, save_segments=False)
     
-    # セグメント情報を整理
-    segments_data = []
-    for i, (start, end) in enumerate(segments):
-        segments_data.append({
-            "index": i,
-            "start": round(start, 2),
-            "end": round(end, 2),
-            "duration": round(end - start, 2)
-        })
+    arr = np.asarray(segments, dtype=np.float64).reshape(-1, 2)
+    
+    # セグメント情報を整理（丸めは配列でまとめて計算）
+    durations = (arr[:, 1] - arr[:, 0]).round(2).tolist()
+    starts = arr[:, 0].round(2).tolist()
+    ends = arr[:, 1].round(2).tolist()
+    segments_data = [
+        {"index": i, "start": start, "end": end, "duration": duration}
+        for i, (start, end, duration) in enumerate(zip(starts, ends, durations))
+    ]
     
     # 結果を表示
     print(f"\n検出された主要セグメント数: {len(segments_data)}")
     print("\nセグメント詳細:")
-    total_duration = 0
-    for seg in segments_data:
-        print(f"  セグメント{seg['index']+1}: {seg['start']}s - {seg['end']}s ({seg['duration']}s)")
-        total_duration += seg['duration']
+    if segments_data:
+        print("\n".join(
+            f"  セグメント{seg['index']+1}: {seg['start']}s - {seg['end']}s ({seg['duration']}s)"
+            for seg in segments_data
+        ))
+    total_duration = sum(durations)
     
     print(f"\n音声がある総時間: {total_duration:.2f}秒")
     
     # ファイルに保存
     output_file = 'major_segments.json'
-    with open(output_file, 'w') as f:
-        json.dump(segments_data, f, indent=2)
+    with open(output_file, 'wb') as f:
+        fastjson.dump(segments_data, f, ensure_ascii=False, indent=2)
     
     print(f"\nセグメント情報を {output_file} に保存しました")
     
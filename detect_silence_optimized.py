@@ -3,8 +3,8 @@
 最適化された無音検出
 """
 
-import json
-from utils.silence_detector import SilenceDetector
+from utils import fastjson
+from utils.silence_detector_ffmpeg import FFmpegSilenceDetector
 
 def main():
     video_path = '/Users/takayakazuki/Desktop/IMG_2525.mov'
@@ -16,7 +16,7 @@ def main():
     print("  silence_thresh: -38dB")
     print("  keep_silence: 300ms")
     
-    detector = SilenceDetector(
+    detector = FFmpegSilenceDetector(
         min_silence_len=2000,  # 2秒以上の無音のみ検出
         silence_thresh=-38,    # バランス型のしきい値
         keep_silence=300       # 前後に300ms残す
@@ -38,17 +38,19 @@ def main():
     # 結果を表示
     print(f"\n検出されたセグメント数: {len(segments_data)}")
     print("\nセグメント詳細:")
-    total_duration = 0
-    for seg in segments_data:
-        print(f"  セグメント{seg['index']+1}: {seg['start']:.2f}s - {seg['end']:.2f}s ({seg['duration']:.2f}s)")
-        total_duration += seg['duration']
+    if segments_data:
+        print("\n".join(
+            f"  セグメント{seg['index']+1}: {seg['start']:.2f}s - {seg['end']:.2f}s ({seg['duration']:.2f}s)"
+            for seg in segments_data
+        ))
+    total_duration = sum(seg['duration'] for seg in segments_data)
     
     print(f"\n音声がある総時間: {total_duration:.2f}秒")
     
     # ファイルに保存
     output_file = 'optimized_segments.json'
-    with open(output_file, 'w') as f:
-        json.dump(segments_data, f, indent=2)
+    with open(output_file, 'wb') as f:
+        fastjson.dump(segments_data, f, ensure_ascii=False, indent=2)
     
     print(f"\nセグメント情報を {output_file} に保存しました")
     
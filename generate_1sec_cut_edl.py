@@ -3,8 +3,9 @@
 1秒無音でカット - 動画編集者向けの効率的なEDL生成
 """
 
-import json
-from utils.silence_detector import SilenceDetector
+import numpy as np
+from utils import fastjson
+from utils.silence_detector_ffmpeg import FFmpegSilenceDetector
 from utils.edl_generator_fixed import generate_fixed_edl
 
 def main():
@@ -17,7 +18,7 @@ def main():
     print("  silence_thresh: -40dB (標準)")
     print("  keep_silence: 200ms (自然な余白)")
     
-    detector = SilenceDetector(
+    detector = FFmpegSilenceDetector(
         min_silence_len=1000,  # 1秒の無音でカット
         silence_thresh=-40,    # 標準的な無音判定
         keep_silence=200       # 前後200ms残して自然に
@@ -28,42 +29,40 @@ def main():
     segments = detector.analyze_video(video_path, save_segments=False)
     
     # 短すぎるセグメント（0.5秒未満）を除外
-    filtered_segments = []
-    for start, end in segments:
-        duration = end - start
-        if duration >= 0.5:  # 0.5秒以上のセグメントのみ使用
-            filtered_segments.append((start, end))
+    arr = np.asarray(segments, dtype=np.float64).reshape(-1, 2)
+    arr = arr[(arr[:, 1] - arr[:, 0]) >= 0.5]  # 0.5秒以上のセグメントのみ使用
     
-    # セグメント情報を整理
-    segments_data = []
-    for i, (start, end) in enumerate(filtered_segments):
-        segments_data.append({
-            "index": i,
-            "start": round(start, 2),
-            "end": round(end, 2),
-            "duration": round(end - start, 2)
-        })
+    # セグメント情報を整理（丸めは配列でまとめて計算）
+    durations = (arr[:, 1] - arr[:, 0]).round(2).tolist()
+    starts = arr[:, 0].round(2).tolist()
+    ends = arr[:, 1].round(2).tolist()
+    segments_data = [
+        {"index": i, "start": start, "end": end, "duration": duration}
+        for i, (start, end, duration) in enumerate(zip(starts, ends, durations))
+    ]
     
     # 結果を表示
     print(f"\n検出されたセグメント数: {len(segments_data)}")
     print(f"（元: {len(segments)}個 → フィルタ後: {len(segments_data)}個）")
     
     print("\nセグメント一覧:")
-    total_duration = 0
+    lines = []
     for i, seg in enumerate(segments_data):
-        print(f"  {i+1:3d}. {seg['start']:7.2f}s - {seg['end']:7.2f}s ({seg['duration']:6.2f}s)")
-        total_duration += seg['duration']
+        lines.append(f"  {i+1:3d}. {seg['start']:7.2f}s - {seg['end']:7.2f}s ({seg['duration']:6.2f}s)")
         
         # 30個ごとに区切り
         if (i + 1) % 30 == 0 and i < len(segments_data) - 1:
-            print("  " + "-"*40)
+            lines.append("  " + "-"*40)
+    if lines:
+        print("\n".join(lines))
+    total_duration = sum(durations)
     
     print(f"\n合計時間: {total_duration:.2f}秒 / 元動画: 746.68秒")
     print(f"カット率: {(1 - total_duration/746.68)*100:.1f}%削減")
     
     # セグメント情報を保存
-    with open('editor_segments.json', 'w') as f:
-        json.dump(segments_data, f, indent=2)
+    with open('editor_segments.json', 'wb') as f:
+        fastjson.dump(segments_data, f, ensure_ascii=False, indent=2)
     
     # EDL生成
     output_path = '/Users/takayakazuki/Desktop/IMG_2525_1sec_cut.edl'
@@ -3,7 +3,8 @@
 1秒無音でカット - マージン調整版
 """
 
-import json
+import numpy as np
+from utils import fastjson
 from utils.silence_detector import SilenceDetector
 from utils.edl_generator_fixed import generate_fixed_edl
 
@@ -27,57 +28,50 @@ def main():
     print("\n無音区間を検出中...")
     segments = detector.analyze_video(video_path, save_segments=False)
     
-    # セグメントの前後にマージンを追加
-    adjusted_segments = []
+    # セグメントの前後にマージンを追加（全セグメントをまとめて計算）
     margin = 0.3  # 追加のマージン（秒）
+    arr = np.asarray(segments, dtype=np.float64).reshape(-1, 2)
     
-    for i, (start, end) in enumerate(segments):
-        # 開始位置を早める（最小0）
-        adj_start = max(0, start - margin)
-        
-        # 終了位置を遅らせる（次のセグメントと重ならないように）
-        if i < len(segments) - 1:
-            next_start = segments[i + 1][0]
-            adj_end = min(end + margin, next_start - 0.1)
-        else:
-            adj_end = end + margin
-        
-        duration = adj_end - adj_start
-        
-        # 0.5秒以上のセグメントのみ使用
-        if duration >= 0.5:
-            adjusted_segments.append((adj_start, adj_end))
-    
-    # セグメント情報を整理
-    segments_data = []
-    for i, (start, end) in enumerate(adjusted_segments):
-        segments_data.append({
-            "index": i,
-            "start": round(start, 2),
-            "end": round(end, 2),
-            "duration": round(end - start, 2)
-        })
+    # 開始位置を早める（最小0）
+    adj_starts = np.maximum(0.0, arr[:, 0] - margin)
+    
+    # 終了位置を遅らせる（次のセグメントと重ならないように、最後のセグメントは制限なし）
+    next_starts = np.concatenate((arr[1:, 0], [np.inf]))
+    adj_ends = np.minimum(arr[:, 1] + margin, next_starts - 0.1)
+    
+    # 0.5秒以上のセグメントのみ使用
+    mask = (adj_ends - adj_starts) >= 0.5
+    arr = np.column_stack((adj_starts[mask], adj_ends[mask]))
+    
+    # セグメント情報を整理（丸めは配列でまとめて計算）
+    durations = (arr[:, 1] - arr[:, 0]).round(2).tolist()
+    starts = arr[:, 0].round(2).tolist()
+    ends = arr[:, 1].round(2).tolist()
+    segments_data = [
+        {"index": i, "start": start, "end": end, "duration": duration}
+        for i, (start, end, duration) in enumerate(zip(starts, ends, durations))
+    ]
     
     # 結果を表示
     print(f"\n検出されたセグメント数: {len(segments_data)}")
     print(f"（元: {len(segments)}個 → 調整後: {len(segments_data)}個）")
     
     print("\nセグメント一覧（最初の10個）:")
-    total_duration = 0
-    for i, seg in enumerate(segments_data[:10]):
-        print(f"  {i+1:3d}. {seg['start']:7.2f}s - {seg['end']:7.2f}s ({seg['duration']:6.2f}s)")
-        total_duration += seg['duration']
+    if segments_data:
+        print("\n".join(
+            f"  {i+1:3d}. {seg['start']:7.2f}s - {seg['end']:7.2f}s ({seg['duration']:6.2f}s)"
+            for i, seg in enumerate(segments_data[:10])
+        ))
     
     if len(segments_data) > 10:
         print(f"  ... 他 {len(segments_data)-10} セグメント")
-        for seg in segments_data[10:]:
-            total_duration += seg['duration']
+    total_duration = sum(durations)
     
     print(f"\n合計時間: {total_duration:.2f}秒")
     
     # セグメント情報を保存
-    with open('editor_segments_margin.json', 'w') as f:
-        json.dump(segments_data, f, indent=2)
+    with open('editor_segments_margin.json', 'wb') as f:
+        fastjson.dump(segments_data, f, ensure_ascii=False, indent=2)
     
     # EDL生成
     output_path = '/Users/takayakazuki/Desktop/IMG_2525_margin.edl'
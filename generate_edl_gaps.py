@@ -3,14 +3,14 @@
 Generate EDL with gaps between segments
 """
 
-import json
 from pathlib import Path
+from utils import fastjson
 from utils.edl_generator_gaps import EDLGeneratorGaps
 
 def main():
     # Load segments
     with open('correct_segments.json', 'r') as f:
-        segments = json.load(f)
+        segments = fastjson.load(f)
     
     # Video path
     video_path = '/Users/takayakazuki/Desktop/IMG_2525.mov'
@@ -3,13 +3,19 @@
 最終的なEDLを生成（改善された無音検出結果を使用）
 """
 
-import json
+import argparse
+from itertools import islice
+from utils import fastjson
 from utils.edl_generator_fixed import generate_fixed_edl
 
 def main():
+    parser = argparse.ArgumentParser(description="最終的なEDLを生成")
+    parser.add_argument("--preview", action="store_true", help="生成したEDLの先頭30行を表示")
+    args = parser.parse_args()
+    
     # セグメントを読み込む
     with open('final_segments.json', 'r') as f:
-        segments = json.load(f)
+        segments = fastjson.load(f)
     
     # ビデオパス
     video_path = '/Users/takayakazuki/Desktop/IMG_2525.mov'
@@ -35,13 +41,15 @@ def main():
     
     print(f"\nEDL生成完了: {edl_path}")
     
-    # EDLプレビュー
-    print("\nEDLプレビュー:")
-    with open(output_path, 'r') as f:
-        lines = f.readlines()
-        for line in lines[:30]:
+    # EDLプレビュー（指定時のみ）
+    if args.preview:
+        print("\nEDLプレビュー:")
+        # 先頭30行（続きがあるかの判定用に1行多く）だけを読み込む
+        with open(output_path, 'r') as f:
+            head = list(islice(f, 31))
+        for line in head[:30]:
             print(line.rstrip())
-        if len(lines) > 30:
+        if len(head) > 30:
             print("...")
 
 if __name__ == "__main__":
@@ -3,13 +3,13 @@
 IMG_2525.edlを生成
 """
 
-import json
+from utils import fastjson
 from utils.edl_generator_fixed import generate_fixed_edl
 
 def main():
     # セグメントを読み込む
     with open('editor_segments.json', 'r') as f:
-        segments = json.load(f)
+        segments = fastjson.load(f)
     
     # ビデオパス
     video_path = '/Users/takayakazuki/Desktop/IMG_2525.mov'
@@ -3,14 +3,14 @@
 Generate a proper EDL file with V and A tracks
 """
 
-import json
 from pathlib import Path
+from utils import fastjson
 from utils.edl_generator_v2 import generate_edl_from_segments
 
 def main():
     # Load segments
     with open('temp/IMG_2525_segments.json', 'r') as f:
-        segments = json.load(f)
+        segments = fastjson.load(f)
     
     # Video path
     video_path = '/Users/takayakazuki/Desktop/IMG_2525.mov'
@@ -3,11 +3,15 @@
 短い無音も検出してEDLを生成（YouTubeショート向け）
 """
 
-import json
-from utils.silence_detector import SilenceDetector
+import argparse
+from utils.silence_detector_ffmpeg import create_silence_detector
 from utils.edl_generator_fixed import generate_fixed_edl
 
 def main():
+    parser = argparse.ArgumentParser(description="短い無音も検出してEDLを生成（YouTubeショート向け）")
+    parser.add_argument("--ffmpeg-silence", action="store_true", help="無音検出にffmpegのsilencedetectを使用（長尺動画で高速）")
+    args = parser.parse_args()
+    
     video_path = '/Users/takayakazuki/Desktop/IMG_2525.mov'
     
     # 短い無音も検出する設定
@@ -17,10 +21,12 @@ def main():
     print("  silence_thresh: -35dB")
     print("  keep_silence: 100ms")
     
-    detector = SilenceDetector(
+    detector = create_silence_detector(
         min_silence_len=1000,  # 1秒以上の無音を検出
         silence_thresh=-35,    # 標準的なしきい値
-        keep_silence=100       # 前後100ms残す（タイトに）
+        keep_silence=100,      # 前後100ms残す（タイトに）
+        cache_dir='temp/silence_cache',  # 2回目以降は検出結果を再利用
+        use_ffmpeg=args.ffmpeg_silence
     )
     
     # 既存の音声ファイルを使用
@@ -10,6 +10,7 @@ Usage:
 """
 
 import argparse
+import logging
 import os
 import sys
 from pathlib import Path
@@ -17,49 +18,15 @@ from pathlib import Path
 # プロジェクトのルートディレクトリをPythonパスに追加
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from utils.audio_extractor import AudioExtractor
-from utils.transcriber import Transcriber
-from utils.caption_formatter import CaptionFormatter
-from config import OPENAI_API_KEY, WHISPER_API_ENDPOINT, WHISPER_MODEL, GPT_API_ENDPOINT, GPT_MODEL
-
-
-def generate_srt_from_captions(captions, output_path):
-    """
-    キャプションデータからSRTファイルを生成
-    
-    Args:
-        captions: キャプションデータ（format_captionsの出力）
-        output_path: 出力SRTファイルパス
-    """
-    with open(output_path, 'w', encoding='utf-8') as f:
-        for i, caption in enumerate(captions['captions'], 1):
-            # SRT形式のタイムコード
-            start_time = format_srt_time(caption['start'])
-            end_time = format_srt_time(caption['end'])
-            
-            # SRTフォーマットで書き込み
-            f.write(f"{i}\n")
-            f.write(f"{start_time} --> {end_time}\n")
-            f.write(f"{caption['text']}\n")
-            f.write("\n")
-    
-    print(f"✅ SRTファイルを生成しました: {output_path}")
-
-
-def format_srt_time(seconds):
-    """
-    秒数をSRTタイムコード形式に変換
-    例: 1.5 -> "00:00:01,500"
-    """
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    millis = int((seconds % 1) * 1000)
-    
-    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
-
 
 def main():
+    # 重いモジュール（pydub・OpenAIクライアントなど）はスクリプト実行時にのみ読み込む
+    from utils.srt_writer import write_srt, seconds_to_srt_time
+    from utils.audio_extractor import AudioExtractor
+    from utils.transcriber import Transcriber
+    from utils.caption_formatter import CaptionFormatter
+    from config import OPENAI_API_KEY, WHISPER_API_ENDPOINT, WHISPER_MODEL, GPT_API_ENDPOINT, GPT_MODEL
+    
     parser = argparse.ArgumentParser(
         description='カット調整済み動画からSRT字幕ファイルを生成'
     )
@@ -73,6 +40,9 @@ def main():
     
     args = parser.parse_args()
     
+    # utils内の処理ログをコンソールに出力
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     # 入力ファイルの確認
     video_path = Path(args.video_path)
     if not video_path.exists():
@@ -137,7 +107,8 @@ def main():
         
         # 4. SRTファイルを生成
         print("📄 SRTファイルを生成中...")
-        generate_srt_from_captions(captions_data, output_path)
+        write_srt(captions_data['captions'], output_path)
+        print(f"✅ SRTファイルを生成しました: {output_path}")
         
         # 統計情報を表示
         total_captions = len(captions_data['captions'])
@@ -145,14 +116,14 @@ def main():
         
         print("\n📊 生成結果:")
         print(f"  - キャプション数: {total_captions}")
-        print(f"  - 総時間: {format_srt_time(total_duration).replace(',', '.')}")
+        print(f"  - 総時間: {seconds_to_srt_time(total_duration).replace(',', '.')}")
         print(f"  - 1行最大文字数: {args.max_chars_per_line}")
         print(f"  - 出力ファイル: {output_path}")
         
         # 最初の数行をプレビュー
         print("\n📝 プレビュー（最初の3つ）:")
         for i, caption in enumerate(captions_data['captions'][:3], 1):
-            print(f"{i}. [{format_srt_time(caption['start'])} - {format_srt_time(caption['end'])}]")
+            print(f"{i}. [{seconds_to_srt_time(caption['start'])} - {seconds_to_srt_time(caption['end'])}]")
             print(f"   {caption['text']}")
         
     except Exception as e:
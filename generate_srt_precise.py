@@ -8,6 +8,7 @@ Usage:
 """
 
 import argparse
+import logging
 import os
 import sys
 from pathlib import Path
@@ -15,49 +16,16 @@ from pathlib import Path
 # プロジェクトのルートディレクトリをPythonパスに追加
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from utils.audio_extractor import AudioExtractor
-from utils.transcriber_improved import ImprovedTranscriber
-from utils.caption_formatter_precise import PreciseCaptionFormatter
-from config import OPENAI_API_KEY, WHISPER_API_ENDPOINT, WHISPER_MODEL, GPT_API_ENDPOINT, GPT_MODEL
-
-
-def generate_srt_from_captions(captions, output_path):
-    """
-    キャプションデータからSRTファイルを生成
-    
-    Args:
-        captions: キャプションデータ（format_captionsの出力）
-        output_path: 出力SRTファイルパス
-    """
-    with open(output_path, 'w', encoding='utf-8') as f:
-        for i, caption in enumerate(captions['captions'], 1):
-            # SRT形式のタイムコード
-            start_time = format_srt_time(caption['start'])
-            end_time = format_srt_time(caption['end'])
-            
-            # SRTフォーマットで書き込み
-            f.write(f"{i}\n")
-            f.write(f"{start_time} --> {end_time}\n")
-            f.write(f"{caption['text']}\n")
-            f.write("\n")
-    
-    print(f"✅ SRTファイルを生成しました: {output_path}")
-
-
-def format_srt_time(seconds):
-    """
-    秒数をSRTタイムコード形式に変換
-    例: 1.5 -> "00:00:01,500"
-    """
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    millis = int((seconds % 1) * 1000)
-    
-    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
-
 
 def main():
+    # 重いモジュール（pydub・OpenAIクライアントなど）はスクリプト実行時にのみ読み込む
+    from utils.audio_extractor import AudioExtractor
+    from utils.srt_writer import write_srt, seconds_to_srt_time
+    from utils.transcriber_improved import ImprovedTranscriber
+    from utils.transcriber_local import LocalFasterWhisperTranscriber, is_faster_whisper_available
+    from utils.caption_formatter_precise import PreciseCaptionFormatter
+    from config import OPENAI_API_KEY, WHISPER_API_ENDPOINT, WHISPER_MODEL, GPT_API_ENDPOINT, GPT_MODEL, FASTER_WHISPER_MODEL
+    
     parser = argparse.ArgumentParser(
         description='カット調整済み動画からSRT字幕ファイルを生成（精密版）'
     )
@@ -68,11 +36,25 @@ def main():
     parser.add_argument('--temp-dir', default='temp',
                        help='一時ファイル用ディレクトリ（デフォルト: temp）')
     parser.add_argument('--api-key', help='OpenAI APIキー（環境変数より優先）')
+    parser.add_argument('--backend', choices=['openai', 'faster-whisper'],
+                       default='faster-whisper' if is_faster_whisper_available() else 'openai',
+                       help='文字起こしのバックエンド（デフォルト: faster-whisperがインストールされていればfaster-whisper）')
+    parser.add_argument('--min-silence', type=int, default=1000,
+                       help='faster-whisperのVADで無音として読み飛ばす最小の長さ（ミリ秒、デフォルト: 1000）')
+    parser.add_argument('--no-vad', action='store_true',
+                       help='faster-whisperのVADを無効にして音声全体をデコード')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='文字起こし・テロップ整形結果のキャッシュを使用しない')
+    parser.add_argument('--cleanup', action='store_true',
+                       help='処理後に抽出した音声ファイルを削除（デフォルトでは再実行時のために残す）')
     parser.add_argument('--debug', action='store_true',
                        help='デバッグ情報を表示')
     
     args = parser.parse_args()
     
+    # utils内の処理ログをコンソールに出力
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     # 入力ファイルの確認
     video_path = Path(args.video_path)
     if not video_path.exists():
@@ -113,7 +95,16 @@ def main():
         
         # 2. 音声を文字起こし（単語レベルのタイムスタンプ付き）
         print("📝 音声を文字起こし中（単語タイムスタンプ付き）...")
-        transcriber = ImprovedTranscriber(api_key, WHISPER_API_ENDPOINT, WHISPER_MODEL)
+        cache_dir = None if args.no_cache else str(temp_dir / 'whisper_cache')
+        if args.backend == 'faster-whisper':
+            transcriber = LocalFasterWhisperTranscriber(
+                FASTER_WHISPER_MODEL,
+                vad_filter=not args.no_vad,
+                min_silence_ms=args.min_silence,
+                cache_dir=cache_dir
+            )
+        else:
+            transcriber = ImprovedTranscriber(api_key, WHISPER_API_ENDPOINT, WHISPER_MODEL, cache_dir=cache_dir)
         transcript = transcriber.transcribe(str(audio_path))
         
         if not transcript:
@@ -136,7 +127,8 @@ def main():
             api_key, 
             GPT_API_ENDPOINT, 
             GPT_MODEL,
-            max_chars_per_line=args.max_chars_per_line
+            max_chars_per_line=args.max_chars_per_line,
+            cache_dir=None if args.no_cache else str(temp_dir / 'caption_cache')
         )
         formatted_text = formatter.format_captions(transcript['text'])
         
@@ -155,7 +147,8 @@ def main():
         
         # 4. SRTファイルを生成
         print("📄 SRTファイルを生成中...")
-        generate_srt_from_captions(captions_data, output_path)
+        write_srt(captions_data['captions'], output_path)
+        print(f"✅ SRTファイルを生成しました: {output_path}")
         
         # 統計情報を表示
         total_captions = len(captions_data['captions'])
@@ -163,7 +156,7 @@ def main():
         
         print("\n📊 生成結果:")
         print(f"  - キャプション数: {total_captions}")
-        print(f"  - 総時間: {format_srt_time(total_duration).replace(',', '.')}")
+        print(f"  - 総時間: {seconds_to_srt_time(total_duration).replace(',', '.')}")
         print(f"  - 1行最大文字数: {args.max_chars_per_line}")
         print(f"  - 出力ファイル: {output_path}")
         print(f"  - タイミング精度: 最高（文字列マッチング）")
@@ -171,20 +164,31 @@ def main():
         # 最初の数行をプレビュー
         print("\n📝 プレビュー（最初の5つ）:")
         for i, caption in enumerate(captions_data['captions'][:5], 1):
-            print(f"{i}. [{format_srt_time(caption['start'])} - {format_srt_time(caption['end'])}]")
+            print(f"{i}. [{seconds_to_srt_time(caption['start'])} - {seconds_to_srt_time(caption['end'])}]")
             print(f"   {caption['text']}")
         
         if args.debug:
+            import numpy as np
+            
             print("\n🔍 デバッグ: タイミング検証（最初の3つ）")
+            # 単語の開始・終了時刻をソートしておき、二分探索で±0.1秒以内の単語を探す
+            words = transcript['words']
+            starts = np.fromiter((w['start'] for w in words), dtype=np.float64, count=len(words))
+            ends = np.fromiter((w['end'] for w in words), dtype=np.float64, count=len(words))
+            start_order = np.argsort(starts, kind='stable')
+            end_order = np.argsort(ends, kind='stable')
+            sorted_starts = starts[start_order]
+            sorted_ends = ends[end_order]
+            
+            def words_near(sorted_times, order, t, tol=0.1):
+                lo = np.searchsorted(sorted_times, t - tol, side='right')
+                hi = np.searchsorted(sorted_times, t + tol, side='left')
+                return [words[j]['word'] for j in np.sort(order[lo:hi])]
+            
             for i, caption in enumerate(captions_data['captions'][:3]):
                 # 対応する単語を探す
-                start_words = []
-                end_words = []
-                for word in transcript['words']:
-                    if abs(word['start'] - caption['start']) < 0.1:
-                        start_words.append(word['word'])
-                    if abs(word['end'] - caption['end']) < 0.1:
-                        end_words.append(word['word'])
+                start_words = words_near(sorted_starts, start_order, caption['start'])
+                end_words = words_near(sorted_ends, end_order, caption['end'])
                 print(f"\n  キャプション{i+1}: {caption['text']}")
                 print(f"    開始単語: {', '.join(start_words) if start_words else '不明'}")
                 print(f"    終了単語: {', '.join(end_words) if end_words else '不明'}")
@@ -196,8 +200,8 @@ def main():
         sys.exit(1)
     
     finally:
-        # 一時ファイルのクリーンアップ
-        if audio_path.exists():
+        # 一時ファイルのクリーンアップ（指定時のみ。残した音声は次回の実行で再利用される）
+        if args.cleanup and audio_path.exists():
             audio_path.unlink()
 
 
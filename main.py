@@ -5,98 +5,70 @@ AI動画編集ツール - メインスクリプト
 """
 import os
 import sys
-import json
 import argparse
+import logging
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from utils.silence_detector import SilenceDetector
-from utils.premiere_xml_generator import PremiereXMLGenerator
-from utils.pure_fcp7_xml_generator import PureFCP7XMLGenerator
-from utils.edl_generator import EDLGenerator
-from utils.ppro_time_utils import PproTimeCalculator
-from utils.video_metadata import VideoMetadataExtractor
+from utils import fastjson
+from utils.tc_cache import record_times
+from utils.srt_writer import write_srt
 
 
-def _generate_srt_file(captions, output_path):
-    """SRTファイルを生成"""
+def _generate_edl_file(segments, video_path, output_path, time_calc):
+    """EDLファイルを生成"""
+    clip_name = os.path.basename(video_path)
+    
+    # ソース・タイムライン上の位置のタイムコードを全セグメント分まとめて計算
+    starts = [start_sec for start_sec, _ in segments]
+    ends = [end_sec for _, end_sec in segments]
+    record_in, record_out = record_times(starts, ends)
+    source_in_tcs = time_calc.seconds_to_timecodes(starts)
+    source_out_tcs = time_calc.seconds_to_timecodes(ends)
+    record_in_tcs = time_calc.seconds_to_timecodes(record_in)
+    record_out_tcs = time_calc.seconds_to_timecodes(record_out)
+    
+    # EDLエントリの作成（V/A/A2の3行を1つの文字列にまとめ、最後に1回で書き込む）
+    events = []
+    for i, timecodes in enumerate(zip(source_in_tcs, source_out_tcs, record_in_tcs, record_out_tcs), 1):
+        timecodes = " ".join(timecodes) + "\n"
+        events.append(
+            f"{i:03d}  {clip_name} V     C        {timecodes}"
+            f"{i:03d}  {clip_name} A     C        {timecodes}"
+            f"{i:03d}  {clip_name} A2    C        {timecodes}"
+        )
+    
     with open(output_path, 'w', encoding='utf-8') as f:
-        for i, caption in enumerate(captions):
-            start_time = _seconds_to_srt_time(caption.get("start", 0))
-            end_time = _seconds_to_srt_time(caption.get("end", 0))
-            text = caption.get("text", "")
-            
-            f.write(f"{i+1}\n")
-            f.write(f"{start_time} --> {end_time}\n")
-            f.write(f"{text}\n\n")
+        f.write("TITLE: AI SILENCE CUT SEQUENCE\nFCM: NON-DROP FRAME\n\n" + "".join(events))
     
-    print(f"SRTファイルも生成しました: {output_path}")
+    print(f"EDLファイルも生成しました: {output_path}")
 
 
-def _seconds_to_srt_time(seconds):
-    """秒からSRT形式のタイムコードに変換"""
-    milliseconds = int((seconds % 1) * 1000)
-    seconds = int(seconds)
-    minutes = seconds // 60
-    hours = minutes // 60
-    minutes %= 60
-    seconds %= 60
-    
-    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+def _configure_logging():
+    """utils内の処理ログをコンソールに出力（バッチ処理の子プロセスでも呼び出す）"""
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
 
 
-def _generate_edl_file(segments, video_path, output_path, time_calc):
-    """EDLファイルを生成"""
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write("TITLE: AI SILENCE CUT SEQUENCE\n")
-        f.write("FCM: NON-DROP FRAME\n\n")
-        
-        # 出力位置のタイムコード（タイムライン上の位置）
-        record_in_sec = 0
-        
-        for i, (start_sec, end_sec) in enumerate(segments):
-            clip_name = os.path.basename(video_path)
-            
-            # タイムコードを計算
-            source_in_tc = time_calc.seconds_to_timecode(start_sec)
-            source_out_tc = time_calc.seconds_to_timecode(end_sec)
-            
-            record_in_tc = time_calc.seconds_to_timecode(record_in_sec)
-            record_out_sec = record_in_sec + (end_sec - start_sec)
-            record_out_tc = time_calc.seconds_to_timecode(record_out_sec)
-            
-            # EDLエントリの作成
-            f.write(f"{i+1:03d}  {clip_name} V     C        {source_in_tc} {source_out_tc} {record_in_tc} {record_out_tc}\n")
-            f.write(f"{i+1:03d}  {clip_name} A     C        {source_in_tc} {source_out_tc} {record_in_tc} {record_out_tc}\n")
-            f.write(f"{i+1:03d}  {clip_name} A2    C        {source_in_tc} {source_out_tc} {record_in_tc} {record_out_tc}\n")
-            
-            # 次のクリップの開始位置を更新
-            record_in_sec = record_out_sec
-    
-    print(f"EDLファイルも生成しました: {output_path}")
+def _process_one(video_path, args, name=None):
+    """
+    1本の動画を処理して編集ファイルを生成
 
+    Args:
+        video_path (str): 処理する動画ファイルのパス
+        args (argparse.Namespace): コマンドライン引数（全動画で共通）
+        name (str, optional): 出力ファイル名に使う名前（省略時は動画ファイル名）
 
-def main():
-    """メイン処理"""
-    parser = argparse.ArgumentParser(description="AI動画編集ツール - 無音検出自動カット＆テロップ生成")
-    parser.add_argument("video_path", help="処理する動画ファイルのパス")
-    parser.add_argument("--output", "-o", help="出力XMLファイルのパス（省略時は動画ファイル名_edited.xml）")
-    parser.add_argument("--min-silence", type=int, default=1000, help="無音と判定する最小の長さ（ミリ秒）")
-    parser.add_argument("--silence-thresh", type=int, default=-35, help="無音と判定する音量のしきい値（dB）")
-    parser.add_argument("--keep-silence", type=int, default=200, help="無音区間の前後に残す無音の長さ（ミリ秒）")
-    parser.add_argument("--temp-dir", default="temp", help="一時ファイルの保存ディレクトリ")
-    parser.add_argument("--captions", help="使用するテロップデータのJSONファイルパス")
-    parser.add_argument("--segments", help="使用するセグメントデータのJSONファイルパス（無音検出をスキップ）")
-    parser.add_argument("--format", choices=["xml", "pure-fcp7", "edl", "srt"], default="xml", help="出力フォーマット（デフォルト: xml）")
-    
-    args = parser.parse_args()
-    
+    Returns:
+        int: 終了コード（0: 成功、1: エラー）
+    """
     # 入力ファイルの存在確認
-    video_path = args.video_path
     if not os.path.exists(video_path):
         print(f"エラー: 指定された動画ファイルが見つかりません: {video_path}")
         return 1
+    name = name or Path(video_path).stem
     
-    # 出力ファイルパスの設定
-    if args.output:
+    # 出力ファイルパスの設定（バッチ処理時は動画ごとに出力先を決める）
+    if args.output and not args.batch:
         output_path = args.output
     else:
         output_dir = "output"
@@ -108,7 +80,7 @@ def main():
             ext = ".srt"
         else:
             ext = ".xml"
-        output_path = os.path.join(output_dir, f"{Path(video_path).stem}_edited{ext}")
+        output_path = os.path.join(output_dir, f"{name}_edited{ext}")
     
     # 一時ディレクトリの作成
     os.makedirs(args.temp_dir, exist_ok=True)
@@ -118,7 +90,7 @@ def main():
     if args.captions:
         if os.path.exists(args.captions):
             with open(args.captions, 'r', encoding='utf-8') as f:
-                caption_data = json.load(f)
+                caption_data = fastjson.load(f)
             print(f"テロップデータを読み込みました: {args.captions}")
         else:
             print(f"警告: 指定されたテロップファイルが見つかりません: {args.captions}")
@@ -128,7 +100,7 @@ def main():
         # 既存のセグメントデータを使用
         if os.path.exists(args.segments):
             with open(args.segments, 'r', encoding='utf-8') as f:
-                segments_data = json.load(f)
+                segments_data = fastjson.load(f)
             
             # JSON形式からタプルのリストに変換
             keep_segments = [(segment["start"], segment["end"]) for segment in segments_data]
@@ -138,14 +110,20 @@ def main():
             return 1
     else:
         # 無音検出器を使用して音声があるセグメントを特定
+        # （pydub/NumPyを読み込むため、検出を行う場合のみインポート）
+        from utils.silence_detector_ffmpeg import create_silence_detector
+        
         print("無音区間検出を開始します...")
-        detector = SilenceDetector(
+        detector = create_silence_detector(
             min_silence_len=args.min_silence,
             silence_thresh=args.silence_thresh,
-            keep_silence=args.keep_silence
+            keep_silence=args.keep_silence,
+            cache_dir=os.path.join(args.temp_dir, 'silence_cache'),
+            use_ffmpeg=args.ffmpeg_silence
         )
         
-        keep_segments = detector.analyze_video(video_path, output_dir=args.temp_dir)
+        keep_segments = detector.analyze_video(video_path, output_dir=args.temp_dir, save_segments=False)
+        detector.save_segments(video_path, keep_segments, args.temp_dir, name=name)
     
     # セグメント情報の表示
     print(f"\n音声がある区間（カットせずに保持する区間）: {len(keep_segments)}個")
@@ -156,7 +134,7 @@ def main():
     if args.format == "srt":
         # SRTファイルのみ生成
         if caption_data and "captions" in caption_data:
-            _generate_srt_file(caption_data["captions"], output_path)
+            write_srt(caption_data["captions"], output_path)
             print(f"\n処理が完了しました。出力ファイル: {output_path}")
         else:
             print("エラー: SRTフォーマットにはキャプションデータが必要です")
@@ -165,13 +143,17 @@ def main():
         # セグメントデータをDict形式に変換
         segment_dicts = [{"start": start, "end": end} for start, end in keep_segments]
         
+        # 生成器は使用するフォーマットの分だけインポートする
         if args.format == "pure-fcp7":
+            from utils.pure_fcp7_xml_generator import PureFCP7XMLGenerator
+            from utils.video_metadata import VideoMetadataExtractor
+            
             # Pure FCP7 XML生成
             print("\nPure FCP7 XML生成を開始します...")
             print("標準FCP7 XML形式でファイルを生成します（Premiere Pro互換）")
             
             # ビデオメタデータを取得
-            metadata_extractor = VideoMetadataExtractor()
+            metadata_extractor = VideoMetadataExtractor(cache_dir=os.path.join(args.temp_dir, '.meta_cache'))
             metadata = metadata_extractor.extract_metadata(video_path)
             
             generator = PureFCP7XMLGenerator(
@@ -184,12 +166,15 @@ def main():
             output_file = generator.save()
             
         elif args.format == "edl":
+            from utils.edl_generator import EDLGenerator
+            from utils.video_metadata import VideoMetadataExtractor
+            
             # EDL生成（新しいジェネレーターを使用）
             print("\nEDL生成を開始します...")
             print("CMX 3600 EDL形式でファイルを生成します")
             
             # ビデオメタデータを取得
-            metadata_extractor = VideoMetadataExtractor()
+            metadata_extractor = VideoMetadataExtractor(cache_dir=os.path.join(args.temp_dir, '.meta_cache'))
             metadata = metadata_extractor.extract_metadata(video_path)
             
             generator = EDLGenerator(
@@ -205,6 +190,8 @@ def main():
             
         else:
             # デフォルト: Premiere Pro XML形式
+            from utils.premiere_xml_generator import PremiereXMLGenerator
+            
             print("\nXML生成を開始します...")
             print("Premiere Pro XML形式でファイルを生成します（フレームレート自動検出、pproTicks対応）")
             
@@ -222,17 +209,91 @@ def main():
             # SRTファイルも生成（字幕として使える）
             if caption_data and "captions" in caption_data:
                 srt_output_path = os.path.splitext(output_path)[0] + ".srt"
-                _generate_srt_file(caption_data["captions"], srt_output_path)
+                write_srt(caption_data["captions"], srt_output_path)
+                print(f"SRTファイルも生成しました: {srt_output_path}")
         
         print(f"\n処理が完了しました。出力ファイル: {output_path if args.format == 'xml' else output_file}")
     
     return 0
 
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="AI動画編集ツール - 無音検出自動カット＆テロップ生成")
+    parser.add_argument("video_path", nargs="?", help="処理する動画ファイルのパス")
+    parser.add_argument("--batch", metavar="DIR", help="フォルダ内の動画（*.mov, *.mp4）をまとめて並列処理")
+    parser.add_argument("--output", "-o", help="出力XMLファイルのパス（省略時は動画ファイル名_edited.xml、--batch時は無視）")
+    parser.add_argument("--min-silence", type=int, default=1000, help="無音と判定する最小の長さ（ミリ秒）")
+    parser.add_argument("--silence-thresh", type=int, default=-35, help="無音と判定する音量のしきい値（dB）")
+    parser.add_argument("--keep-silence", type=int, default=200, help="無音区間の前後に残す無音の長さ（ミリ秒、--ffmpeg-silence指定時のみ区間に反映）")
+    parser.add_argument("--ffmpeg-silence", action="store_true", help="無音検出にffmpegのsilencedetectを使用（長尺動画で高速）")
+    parser.add_argument("--temp-dir", default="temp", help="一時ファイルの保存ディレクトリ")
+    parser.add_argument("--captions", help="使用するテロップデータのJSONファイルパス")
+    parser.add_argument("--segments", help="使用するセグメントデータのJSONファイルパス（無音検出をスキップ）")
+    parser.add_argument("--format", choices=["xml", "pure-fcp7", "edl", "srt"], default="xml", help="出力フォーマット（デフォルト: xml）")
+    
+    args = parser.parse_args()
+    _configure_logging()
+    
+    if not args.batch:
+        if not args.video_path:
+            parser.error("動画ファイルのパスか --batch DIR を指定してください")
+        return _process_one(args.video_path, args)
+    
+    # セグメント・テロップのファイルは1本の動画用のため、全動画に同じものを適用しない
+    if args.segments or args.captions:
+        parser.error("--segments と --captions は --batch と同時に指定できません")
+    
+    # バッチ処理: フォルダ内の動画を収集
+    if not os.path.isdir(args.batch):
+        print(f"エラー: 指定されたフォルダが見つかりません: {args.batch}")
+        return 1
+    
+    video_paths = sorted({
+        str(p) for pattern in ("*.mov", "*.MOV", "*.mp4", "*.MP4")
+        for p in Path(args.batch).glob(pattern)
+    })
+    if not video_paths:
+        print(f"エラー: 処理対象の動画が見つかりません: {args.batch}")
+        return 1
+    
+    print(f"{len(video_paths)}本の動画を並列処理します: {args.batch}")
+    
+    # 同じファイル名で拡張子だけ違う動画（clip.movとclip.mp4など）は出力が上書きされないよう名前に拡張子を付ける
+    stem_counts = Counter(Path(path).stem.lower() for path in video_paths)
+    names = {}
+    for path in video_paths:
+        stem, suffix = Path(path).stem, Path(path).suffix.lstrip('.')
+        names[path] = stem if stem_counts[stem.lower()] == 1 else f"{stem}_{suffix}"
+    
+    # 各動画は独立しているため、プロセスごとに無音検出〜ファイル生成までを実行
+    # 1本でエラーが発生しても残りの動画の処理と結果の表示は続ける
+    failed = []
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_configure_logging) as ex:
+        futures = {ex.submit(_process_one, path, args, names[path]): path for path in video_paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                code = future.result()
+            except Exception as e:
+                print(f"エラー: {path} の処理中にエラーが発生しました: {e}")
+                code = 1
+            if code != 0:
+                failed.append(path)
+    failed.sort()
+    
+    print(f"\nバッチ処理が完了しました: 成功 {len(video_paths) - len(failed)}本 / 失敗 {len(failed)}本")
+    for path in failed:
+        print(f"  失敗: {path}")
+    
+    return 1 if failed else 0
+
 if __name__ == "__main__":
     # 使用例を表示
     if len(sys.argv) == 1:
         print("使用方法: python main.py <動画ファイルパス> [オプション]")
         print("\n例: python main.py IMG_7453.MP4 --min-silence 500 --silence-thresh -40")
+        print("    python main.py --batch videos/ --format edl")
         print("\n利用可能なオプションについては --help を参照してください。")
         sys.exit(1)
     
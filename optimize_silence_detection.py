@@ -4,56 +4,400 @@
 動画の特性を分析して最適なパラメータを見つける
 """
 
+import os
 import sys
-import json
+import subprocess
+from functools import lru_cache
 from pathlib import Path
+from utils import fastjson
+from utils.cache_key import file_cache_key
 from utils.silence_detector import SilenceDetector
 from utils.silence_detector_advanced import AdvancedSilenceDetector
 from pydub import AudioSegment
+from scipy import signal
 import numpy as np
 
+try:
+    # SIMD（AVX/NEON）で窓ごとのRMSを計算するライブラリ（オプション）
+    import numpy_rms
+except ImportError:
+    numpy_rms = None
+
+# フレームごとのRMSを計算する際のフレーム長（ミリ秒）
+FRAME_MS = 10
+
+# 音声を読み込む際のサンプルレート（無音検出には16kHzで十分）
+LOAD_SAMPLE_RATE = 16000
+
+# デコード済みの音声（float32）を保存する際の拡張子
+NPY_CACHE_SUFFIX = ".mono16k.f32.npy"
+
+# フレームRMSのキャッシュ先
+RMS_CACHE_DIR = os.path.join("temp", "rms_cache")
+
+
+def windowed_rms(csum, w, step=1):
+    """
+    二乗値の累積和からwサンプルの窓ごとのRMSを計算
+
+    Args:
+        csum (np.ndarray): 先頭に0を置いた二乗値の累積和
+        w (int): 窓の長さ（サンプル数）
+        step (int): 窓をずらす間隔（サンプル数）
+    """
+    return np.sqrt((csum[w::step] - csum[:-w:step]) / w)
+
+
+def compute_frame_rms(samples, frame_rate):
+    """
+    FRAME_MSごとのRMSを計算（numpy_rmsがインストールされていれば使用）
+
+    Args:
+        samples (np.ndarray): モノラルのサンプル列（float32）
+        frame_rate (int): サンプルレート
+    """
+    window = max(1, frame_rate * FRAME_MS // 1000)
+    samples = np.ascontiguousarray(samples, dtype=np.float32)
+    if numpy_rms is not None:
+        return numpy_rms.rms(samples, window_size=window)
+
+    frames = samples[:len(samples) // window * window].reshape(-1, window)
+    return np.sqrt(np.einsum('ij,ij->i', frames, frames) / window)
+
+
+def compute_frame_zcr(samples, frame_rate):
+    """
+    FRAME_MSごとのゼロ交差率を計算（compute_frame_rmsと同じフレーム分割）
+
+    Args:
+        samples (np.ndarray): モノラルのサンプル列（float32）
+        frame_rate (int): サンプルレート
+    """
+    window = max(1, frame_rate * FRAME_MS // 1000)
+    n_frames = len(samples) // window
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    # 符号が変わった位置を1とし、フレームごとに合計（先頭にはフレーム内の最初のサンプルとの差がないため0を置く）
+    signs = np.signbit(samples[:n_frames * window]).view(np.int8)
+    crossings = np.empty(n_frames * window, dtype=np.int8)
+    crossings[0] = 0
+    np.not_equal(signs[1:], signs[:-1], out=crossings[1:])
+    return crossings.reshape(n_frames, window).sum(axis=1, dtype=np.int32) / np.float32(window)
+
+
+def voiced_cut_ratio(starts, ends, frame_rms, zcr_mask, max_amplitude, floor_db=-70):
+    """
+    カットされるフレームのうち、有声音らしい（ゼロ交差率が低い）フレームの割合を計算
+
+    小さな声の有声音は音量だけでは無音と区別できないが、ゼロ交差率が低いことで見分けられる
+    （ノイズやハムのみの区間はゼロ交差率が高い）
+
+    Args:
+        starts, ends (np.ndarray): 音声がある区間の開始・終了時刻（秒）
+        frame_rms (np.ndarray): FRAME_MSごとのRMS
+        zcr_mask (np.ndarray): ゼロ交差率が高い（ノイズらしい）フレームのマスク
+        max_amplitude (float): しきい値の基準とする振幅（音声のピーク）
+        floor_db (float): これより小さいフレームは完全な無音として除外（ピーク基準のdB）
+    """
+    n_frames = len(frame_rms)
+    if n_frames == 0:
+        return 0.0
+
+    # 音声がある区間に含まれるフレームを差分配列の累積和で求める
+    first = np.clip((np.asarray(starts) * 1000 / FRAME_MS).astype(np.int64), 0, n_frames)
+    last = np.clip(np.ceil(np.asarray(ends) * 1000 / FRAME_MS).astype(np.int64), 0, n_frames)
+    marks = np.zeros(n_frames + 1, dtype=np.int32)
+    np.add.at(marks, first, 1)
+    np.add.at(marks, last, -1)
+    kept = np.cumsum(marks[:-1]) > 0
+
+    cut = ~kept & (frame_rms > max_amplitude * 10 ** (floor_db / 20))
+    if not cut.any():
+        return 0.0
+    return float(np.mean(~zcr_mask[cut]))
+
+
+def silence_window_rms(frame_rms, min_silence_len):
+    """
+    min_silence_len分のフレームをまとめたRMS（1フレームずつずらす）を計算
+
+    しきい値には依存しないため、同じmin_silence_lenの候補ではこの結果を共有できる
+
+    Returns:
+        np.ndarray: 窓ごとのRMS（フレーム数が窓より少ない場合はNone）
+    """
+    window = max(1, min_silence_len // FRAME_MS)
+    if len(frame_rms) < window:
+        return None
+
+    # フレームのエネルギーの累積和から、窓ごとのRMSを求める
+    energy = np.square(frame_rms, dtype=np.float64)
+    csum = np.concatenate(([0.0], np.cumsum(energy)))
+    return windowed_rms(csum, window)
+
+
+def estimate_segments(frame_rms, duration, max_amplitude, min_silence_len, silence_thresh, keep_silence=200,
+                      window_rms=None):
+    """
+    フレームRMSから音声がある区間を推定（SilenceDetectorと同様にmin_silence_len以上の無音で区切る）
+
+    min_silence_len分のフレームをまとめたRMSをしきい値と一括で比較し、無音が続く範囲をランレングスで求める
+
+    Args:
+        window_rms (np.ndarray, optional): silence_window_rmsで計算済みの窓ごとのRMS
+
+    Returns:
+        tuple: (区間の開始時刻の配列, 区間の終了時刻の配列)（秒）
+    """
+    rms = window_rms if window_rms is not None else silence_window_rms(frame_rms, min_silence_len)
+    if rms is None:
+        return np.array([0.0]), np.array([duration])
+
+    # しきい値（dB）を振幅に換算して比較
+    silent = (rms < max_amplitude * 10 ** (silence_thresh / 20)).view(np.int8)
+
+    # 無音の窓が連続する範囲を取り出す
+    edges = np.diff(silent, prepend=0, append=0)
+    silence_starts = np.flatnonzero(edges == 1) * FRAME_MS / 1000
+    silence_ends = np.minimum((np.flatnonzero(edges == -1) - 1) * FRAME_MS / 1000 + min_silence_len / 1000, duration)
+    if len(silence_starts) == 0:
+        return np.array([0.0]), np.array([duration])
+
+    # 無音区間の間を音声区間とする（窓が重なって隣接する無音区間は間の音声区間を作らない）
+    starts = np.concatenate(([0.0], silence_ends))
+    ends = np.concatenate((silence_starts, [duration]))
+    voiced = ends > starts
+    starts, ends = starts[voiced], ends[voiced]
+    if len(starts) == 0:
+        return np.array([0.0]), np.array([duration])
+
+    # 前後にkeep_silence分の余白を追加し、重なった区間を結合
+    margin = keep_silence / 1000
+    starts = np.maximum(starts - margin, 0)
+    ends = np.minimum(ends + margin, duration)
+    separate = starts[1:] > ends[:-1]
+    return (np.concatenate((starts[:1], starts[1:][separate])),
+            np.concatenate((ends[:-1][separate], ends[-1:])))
+
+
+def estimate_threshold(frame_rms, max_amplitude, floor_db=-90):
+    """
+    フレームRMSの音量分布（ピーク基準のdB）から無音と判定するしきい値を推定
+
+    音声の分布は発話とノイズフロアの2つの山を持つため、大きい2つの山の間の谷をしきい値とする
+
+    Args:
+        frame_rms (np.ndarray): FRAME_MSごとのRMS
+        max_amplitude (float): しきい値の基準とする振幅（音声のピーク）
+        floor_db (float): 完全な無音（デジタルゼロ）をまとめる下限（dB）
+
+    Returns:
+        int: しきい値（dB）（山が2つ見つからない場合はNone）
+    """
+    if len(frame_rms) == 0:
+        return None
+
+    db = np.maximum(20 * np.log10(frame_rms / max_amplitude + 1e-9), floor_db)
+    hist, edges = np.histogram(db, bins=100)
+
+    # 長さ5の移動平均で平滑化してから山を探す
+    smoothed = np.convolve(hist, np.ones(5) / 5, mode="same")
+    peaks, _ = signal.find_peaks(smoothed)
+    if len(peaks) < 2:
+        return None
+
+    # 大きい2つの山の間で最も度数が小さい位置（同じ度数が続く場合はその中央）
+    low, high = np.sort(peaks[np.argsort(smoothed[peaks])[-2:]])
+    between = smoothed[low:high + 1]
+    minima = np.flatnonzero(between == between.min())
+    valley = low + minima[len(minima) // 2]
+    return int(round((edges[valley] + edges[valley + 1]) / 2))
+
+
+def _analysis_cache_base(audio_path):
+    """音声特性キャッシュのパス（拡張子なし）を取得"""
+    # max_amplitudeをピーク基準に変更する前のキャッシュを使わないよう、"peak"をキーに含める
+    return os.path.join(RMS_CACHE_DIR, file_cache_key(audio_path, FRAME_MS, "peak"))
+
+
+def _load_cached_analysis(audio_path):
+    """キャッシュ済みの音声特性とフレームごとのRMS・ゼロ交差率を取得（存在しない場合は (None, None, None)）"""
+    cache_base = _analysis_cache_base(audio_path)
+    if not (os.path.exists(cache_base + ".json") and os.path.exists(cache_base + ".npz")):
+        return None, None, None
+
+    try:
+        with open(cache_base + ".json", "rb") as f:
+            audio_info = fastjson.load(f)
+        with np.load(cache_base + ".npz") as frames:
+            frame_rms, frame_zcr = frames["rms"], frames["zcr"]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"音声特性キャッシュの読み込みに失敗: {e}")
+        return None, None, None
+
+    print(f"キャッシュ済みの音声特性を使用します: {cache_base}.npz")
+    return audio_info, frame_rms, frame_zcr
+
+
+def _save_cached_analysis(audio_path, audio_info, frame_rms, frame_zcr):
+    """音声特性とフレームごとのRMS・ゼロ交差率をキャッシュに保存"""
+    os.makedirs(RMS_CACHE_DIR, exist_ok=True)
+    cache_base = _analysis_cache_base(audio_path)
+    np.savez(cache_base + ".npz", rms=frame_rms, zcr=frame_zcr)
+    with open(cache_base + ".json", "wb") as f:
+        fastjson.dump(audio_info, f)
+
+
+def _decode_with_ffmpeg(audio_path):
+    """ffmpegで音声をLOAD_SAMPLE_RATEのモノラルfloat32（-1〜1）にデコードし、パイプから直接受け取る"""
+    cmd = [
+        'ffmpeg', '-v', 'error',
+        '-i', audio_path,
+        '-vn', '-ac', '1', '-ar', str(LOAD_SAMPLE_RATE),
+        '-f', 'f32le', '-'
+    ]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    data, stderr = proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpegの実行に失敗しました: {stderr.decode('utf-8', errors='replace').strip()}")
+    return np.frombuffer(data, dtype=np.float32)
+
+
+@lru_cache(maxsize=4)
+def _load_audio(audio_path, mtime):
+    """
+    音声ファイルをモノラルのfloat32配列（-1〜1）として読み込む（同じファイル・更新日時なら再デコードしない）
+
+    デコード結果は音声ファイルの隣に.npyとして保存し、次回以降の実行でも再利用する
+
+    Returns:
+        tuple: (モノラルのサンプル列（float32）, サンプルレート)
+    """
+    cache_path = str(Path(audio_path).with_suffix(NPY_CACHE_SUFFIX))
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= mtime:
+        return np.load(cache_path), LOAD_SAMPLE_RATE
+    
+    try:
+        samples = _decode_with_ffmpeg(audio_path)
+    except (OSError, RuntimeError) as e:
+        print(f"ffmpegでの読み込みに失敗したため、pydubで読み込みます: {e}")
+        audio = AudioSegment.from_file(audio_path)
+        
+        # get_array_of_samplesによるPythonのarrayへのコピーを避け、生データをそのまま参照する
+        samples = np.frombuffer(audio.raw_data, dtype=audio.array_type)
+        samples = samples.reshape(-1, audio.channels).astype(np.float32, copy=False)
+        if audio.channels > 1:
+            samples = samples.mean(axis=1, dtype=np.float32)
+        else:
+            samples = samples[:, 0]
+        samples = samples / np.float32(audio.max_possible_amplitude)
+        return np.ascontiguousarray(samples), audio.frame_rate
+    
+    np.save(cache_path, samples)
+    return samples, LOAD_SAMPLE_RATE
+
+
 def analyze_audio_characteristics(audio_path):
-    """音声ファイルの特性を分析"""
+    """
+    音声ファイルの特性を分析
+
+    Returns:
+        tuple: (音声特性の辞書, FRAME_MSごとのRMSの配列, FRAME_MSごとのゼロ交差率の配列)
+               （失敗した場合は (None, None, None)）
+    """
     print("音声特性を分析中...")
     
+    # 同じ音声を分析済みならデコードを省略
+    audio_info, frame_rms, frame_zcr = _load_cached_analysis(audio_path)
+    if audio_info is not None:
+        return audio_info, frame_rms, frame_zcr
+    
     try:
-        # 音声を読み込む
-        audio = AudioSegment.from_file(audio_path)
+        # 音声を読み込む（モノラルのfloat32配列、振幅は-1〜1）
+        samples, frame_rate = _load_audio(audio_path, os.path.getmtime(audio_path))
+        duration = len(samples) / frame_rate
         
-        # dBFSで音量レベルを取得
-        loudness = audio.dBFS
-        max_loudness = audio.max_dBFS
+        # 10msごとのRMS（パラメータ探索ではこの短い配列だけを使う）
+        frame_rms = compute_frame_rms(samples, frame_rate)
+        frame_zcr = compute_frame_zcr(samples, frame_rate)
         
-        # 音声のダイナミックレンジを計算
-        samples = np.array(audio.get_array_of_samples())
-        if audio.channels == 2:
-            samples = samples.reshape((-1, 2))
-            samples = samples.mean(axis=1)
+        # 統計値（全体のRMSはフレームRMSの二乗平均から求め、サンプル列をもう一度走査しない）
+        # ピークは最大・最小値から一時配列を作らずに計算
+        rms = float(np.sqrt(np.mean(np.square(frame_rms, dtype=np.float64)))) if len(frame_rms) else 0.0
+        peak = max(float(samples.max()), -float(samples.min())) if len(samples) else 0.0
         
-        # 統計値
-        rms = np.sqrt(np.mean(samples**2))
-        peak = np.max(np.abs(samples))
+        # dBFSで音量レベルを取得（振幅1.0がフルスケール）
+        loudness = 20 * np.log10(rms) if rms > 0 else -float("inf")
+        max_loudness = 20 * np.log10(peak) if peak > 0 else -float("inf")
         
         print(f"\n音声特性:")
         print(f"  平均音量: {loudness:.1f} dBFS")
         print(f"  最大音量: {max_loudness:.1f} dBFS") 
         print(f"  RMS: {rms:.4f}")
-        print(f"  ピーク: {peak}")
-        print(f"  長さ: {len(audio)/1000:.1f}秒")
+        print(f"  ピーク: {peak:.4f}")
+        print(f"  長さ: {duration:.1f}秒")
         
         # 推奨パラメータ
         recommended_thresh = int(loudness - 15)  # 平均より15dB低い
         
-        return {
-            "loudness": loudness,
-            "max_loudness": max_loudness,
+        audio_info = {
+            "loudness": float(loudness),
+            "max_loudness": float(max_loudness),
             "recommended_threshold": recommended_thresh,
-            "duration": len(audio) / 1000
+            "duration": duration,
+            # SilenceDetectorはnormalize()でピークを-0.1dBFSに揃えてから判定するため、
+            # しきい値はピーク（に0.1dBの余裕を加えた値）を基準にする
+            "max_amplitude": peak * 10 ** (0.1 / 20) if peak > 0 else 1.0
         }
+        _save_cached_analysis(audio_path, audio_info, frame_rms, frame_zcr)
+        return audio_info, frame_rms, frame_zcr
         
     except Exception as e:
         print(f"音声分析エラー: {e}")
+        return None, None, None
+
+def _score_segments(segments, min_silence, thresh, audio_duration=None, voiced_cut=0.0):
+    """
+    検出結果をスコア化（セグメント数と総時間のバランス）
+
+    voiced_cutにはカットされるフレームのうち有声音らしいものの割合を渡し、その分スコアを下げる
+
+    Returns:
+        dict: 設定とスコア（セグメントがない場合はNone）
+    """
+    if not segments:
         return None
+    
+    total_duration = sum(end - start for start, end in segments)
+    segment_count = len(segments)
+    
+    # 理想的なセグメント数は5-15
+    if 5 <= segment_count <= 15:
+        count_score = 1.0
+    elif segment_count < 5:
+        count_score = segment_count / 5.0
+    else:
+        count_score = max(0, 1.0 - (segment_count - 15) / 20.0)
+    
+    # 総時間の割合（音声がある部分の割合）
+    if audio_duration:
+        duration_ratio = total_duration / audio_duration
+    else:
+        duration_ratio = 0.7  # デフォルト
+    
+    # 総合スコア（有声音をカットしている設定は減点）
+    score = count_score * 0.6 + min(duration_ratio, 1.0) * 0.4 - voiced_cut * 0.2
+    
+    return {
+        "min_silence_len": min_silence,
+        "silence_thresh": thresh,
+        "segment_count": segment_count,
+        "total_duration": total_duration,
+        "voiced_cut_ratio": voiced_cut,
+        "score": score
+    }
+
 
 def find_optimal_parameters(video_path):
     """最適なパラメータを見つける"""
@@ -63,64 +407,62 @@ def find_optimal_parameters(video_path):
     audio_path = detector.extract_audio_from_video(video_path)
     
     # 音声特性を分析
-    audio_info = analyze_audio_characteristics(audio_path)
+    audio_info, frame_rms, frame_zcr = analyze_audio_characteristics(audio_path)
     
     if audio_info:
         base_threshold = audio_info["recommended_threshold"]
     else:
         base_threshold = -40
     
-    # グリッドサーチでパラメータを探索
+    # パラメータを探索
     print("\n最適なパラメータを探索中...")
     
     # テストパラメータ
     silence_lengths = [300, 500, 700, 1000]
-    thresholds = [base_threshold + offset for offset in [-5, 0, 5, 10]]
     
-    best_config = None
-    best_score = -1
+    # しきい値は音量分布の谷から一意に決める（求められない場合は従来のグリッドサーチ）
+    analytic_threshold = None
+    if frame_rms is not None:
+        analytic_threshold = estimate_threshold(frame_rms, audio_info["max_amplitude"])
     
-    for min_silence in silence_lengths:
-        for thresh in thresholds:
+    if analytic_threshold is not None:
+        print(f"音量分布から求めたしきい値: {analytic_threshold}dB")
+        thresholds = [analytic_threshold]
+    else:
+        thresholds = [base_threshold + offset for offset in [-5, 0, 5, 10]]
+    
+    candidates = [(min_silence, thresh) for min_silence in silence_lengths for thresh in thresholds]
+    audio_duration = audio_info["duration"] if audio_info else None
+    
+    if frame_rms is not None:
+        # 事前に計算したフレームRMSから区間を推定（短い配列のため1プロセスで十分高速）
+        # ゼロ交差率が上位15%のフレームをノイズらしいフレームとし、それ以外をカットしている設定を減点する
+        zcr_mask = frame_zcr >= np.quantile(frame_zcr, 0.85) if len(frame_zcr) else frame_zcr.astype(bool)
+        # 窓ごとのRMSはしきい値に依存しないため、min_silence_lenごとに1回だけ計算して共有する
+        window_rms = {min_silence: silence_window_rms(frame_rms, min_silence) for min_silence in silence_lengths}
+        results = []
+        for min_silence, thresh in candidates:
+            starts, ends = estimate_segments(
+                frame_rms, audio_info["duration"], audio_info["max_amplitude"],
+                min_silence, thresh, keep_silence=200, window_rms=window_rms[min_silence]
+            )
+            voiced_cut = voiced_cut_ratio(starts, ends, frame_rms, zcr_mask, audio_info["max_amplitude"])
+            segments = list(zip(starts.tolist(), ends.tolist()))
+            results.append(_score_segments(segments, min_silence, thresh, audio_duration, voiced_cut))
+    else:
+        # 音声特性を分析できなかった場合は、従来通りSilenceDetectorで各設定を検出して評価
+        results = []
+        for min_silence, thresh in candidates:
             detector = SilenceDetector(
                 min_silence_len=min_silence,
                 silence_thresh=thresh,
                 keep_silence=200
             )
-            
             segments = detector.analyze_video(video_path, save_segments=False)
-            
-            # スコアを計算（セグメント数と総時間のバランス）
-            if segments:
-                total_duration = sum(end - start for start, end in segments)
-                segment_count = len(segments)
-                
-                # 理想的なセグメント数は5-15
-                if 5 <= segment_count <= 15:
-                    count_score = 1.0
-                elif segment_count < 5:
-                    count_score = segment_count / 5.0
-                else:
-                    count_score = max(0, 1.0 - (segment_count - 15) / 20.0)
-                
-                # 総時間の割合（音声がある部分の割合）
-                if audio_info:
-                    duration_ratio = total_duration / audio_info["duration"]
-                else:
-                    duration_ratio = 0.7  # デフォルト
-                
-                # 総合スコア
-                score = count_score * 0.6 + min(duration_ratio, 1.0) * 0.4
-                
-                if score > best_score:
-                    best_score = score
-                    best_config = {
-                        "min_silence_len": min_silence,
-                        "silence_thresh": thresh,
-                        "segment_count": segment_count,
-                        "total_duration": total_duration,
-                        "score": score
-                    }
+            results.append(_score_segments(segments, min_silence, thresh, audio_duration))
+    
+    # スコアが最も高い設定（同点の場合は先に評価したもの）
+    best_config = max((r for r in results if r), key=lambda r: r["score"], default=None)
     
     # 高度な検出も試す
     print("\n高度な検出アルゴリズムをテスト中...")
@@ -150,8 +492,8 @@ def find_optimal_parameters(video_path):
     
     # 結果を保存
     output_file = "optimized_silence_params.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump({
+    with open(output_file, 'wb') as f:
+        fastjson.dump({
             "standard_algorithm": best_config,
             "advanced_algorithm": recommendations,
             "audio_info": audio_info
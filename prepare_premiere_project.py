@@ -5,9 +5,50 @@ EDLと動画ファイルを同じフォルダにコピーして、インポー
 """
 import os
 import shutil
+import subprocess
 import sys
 from pathlib import Path
 
+def _link_or_copy_video(src, dst):
+    """
+    動画ファイルをプロジェクトフォルダに配置
+
+    同じファイルシステム上ならハードリンク、できなければCoWコピー（APFS/Btrfs/XFSのreflink）を試し、
+    どちらも使えない場合は通常のコピーを行う
+    """
+    if dst.exists():
+        dst.unlink()
+
+    if os.stat(src).st_dev == os.stat(dst.parent).st_dev:
+        try:
+            os.link(src, dst)
+            print("  ハードリンクを作成しました（コピーなし）")
+            return
+        except OSError:
+            pass
+
+        # CoWコピー（macOSは cp -c でclonefile、Linuxは --reflink=auto で非対応時は通常コピー）
+        if sys.platform == "darwin":
+            cmd = ['cp', '-c', str(src), str(dst)]
+        elif sys.platform.startswith("linux"):
+            cmd = ['cp', '--reflink=auto', '--preserve=timestamps', str(src), str(dst)]
+        else:
+            cmd = None
+
+        if cmd:
+            try:
+                result = subprocess.run(cmd, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                if result.returncode == 0:
+                    return
+            except OSError:
+                pass
+            if dst.exists():
+                dst.unlink()
+
+    # Linuxではsendfile、macOSではfcopyfileによるOSのコピーが使われる
+    shutil.copy2(src, dst)
+
+
 def prepare_premiere_project(video_path, edl_path, output_dir=None):
     """
     Premiere Proプロジェクト用にファイルを準備
@@ -28,10 +69,11 @@ def prepare_premiere_project(video_path, edl_path, output_dir=None):
     print(f"プロジェクトフォルダを作成中: {output_dir}")
     
     # 動画ファイルをコピー
+    # （途中で中断したコピーを見逃さないよう、サイズが一致しない場合もコピーし直す）
     video_dest = output_dir / video_path.name
-    if not video_dest.exists():
+    if not (video_dest.exists() and video_dest.stat().st_size == video_path.stat().st_size):
         print(f"動画ファイルをコピー中: {video_path.name}")
-        shutil.copy2(video_path, video_dest)
+        _link_or_copy_video(video_path, video_dest)
     
     # EDLファイルをコピー
     edl_dest = output_dir / edl_path.name
@@ -3,7 +3,7 @@
 7セグメントを再現（前回成功した設定）
 """
 
-import json
+from utils import fastjson
 from utils.silence_detector import SilenceDetector
 
 def main():
@@ -73,8 +73,8 @@ def main():
     
     # ファイルに保存
     output_file = 'final_segments.json'
-    with open(output_file, 'w') as f:
-        json.dump(segments_data, f, indent=2)
+    with open(output_file, 'wb') as f:
+        fastjson.dump(segments_data, f, ensure_ascii=False, indent=2)
     
     print(f"\nセグメント情報を {output_file} に保存しました")
     
@@ -4,19 +4,259 @@ AI動画カット＆テロップツール - Streamlit Web版
 """
 
 import streamlit as st
+import logging
 import tempfile
 import os
+import hashlib
+import queue
+import wave
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
+from types import SimpleNamespace
 
 # ツールのインポート
 from utils.audio_extractor import AudioExtractor
-from utils.transcriber_improved import ImprovedTranscriber
+from utils.transcriber_improved import ImprovedTranscriber, CHUNK_SECONDS
 from utils.caption_formatter_japanese import JapaneseCaptionFormatter
 from utils.silence_detector import SilenceDetector
 from utils.edl_generator import EDLGenerator
 from utils.video_metadata import VideoMetadataExtractor
+from utils.srt_writer import srt_content
 from config_custom import get_api_config
 
+# utils内の処理ログをサーバーのコンソールに出力
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+# 抽出した音声の保存先（Streamlitの再実行をまたいで再利用するため、処理ごとの一時ディレクトリとは別にする）
+AUDIO_CACHE_DIR = Path(tempfile.gettempdir()) / "ai_movie_edit_audio"
+
+
+def format_time(seconds):
+    """秒数を時:分:秒形式に変換"""
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = int(seconds % 60)
+    
+    if hours > 0:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    else:
+        return f"{minutes}:{secs:02d}"
+
+
+def file_digest(uploaded_file):
+    """アップロードされたファイルの内容からキャッシュ用のキーを作成"""
+    return hashlib.blake2b(uploaded_file.getbuffer(), digest_size=16).hexdigest()
+
+
+@st.cache_data(show_spinner=False)
+def cached_extract_audio(video_hash, _video_path):
+    """音声抽出（同じ動画であれば抽出済みの音声を再利用）"""
+    return get_tools().extractor.extract_audio(str(_video_path), str(AUDIO_CACHE_DIR / video_hash))
+
+
+@st.cache_resource(show_spinner=False)
+def get_tools():
+    """状態を持たない処理クラスのインスタンス（全セッションで共有）"""
+    return SimpleNamespace(
+        extractor=AudioExtractor(),
+        metadata=VideoMetadataExtractor()
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_transcriber(api_key, api_endpoint, model):
+    """文字起こしクライアント（APIの設定ごとに1つ作成し、HTTPセッションを再利用）"""
+    return ImprovedTranscriber(api_key, api_endpoint, model)
+
+
+@st.cache_resource(show_spinner=False)
+def get_caption_formatter(api_key, api_endpoint, model, max_chars):
+    """テロップ整形クライアント（APIの設定・文字数ごとに1つ作成し、HTTPセッションを再利用）"""
+    return JapaneseCaptionFormatter(api_key, api_endpoint, model, max_chars_per_line=max_chars)
+
+
+@st.cache_data(show_spinner=False, persist="disk")
+def cached_detect_silence(video_hash, min_silence_len, silence_thresh, keep_silence, auto_threshold, _audio_path):
+    """
+    無音検出（同じ動画・同じパラメータであれば検出結果を再利用）
+    無音検出のパラメータを変えた場合はこのキャッシュだけが無効になり、音声抽出はやり直さない
+    """
+    detector = SilenceDetector()
+    return detector.detect_silence(
+        _audio_path,
+        min_silence_len=min_silence_len,
+        silence_thresh=silence_thresh,
+        keep_silence=keep_silence,
+        auto_threshold=auto_threshold
+    )
+
+
+@st.cache_data(show_spinner=False, persist="disk")
+def cached_transcribe(audio_hash, model, api_key_hash, _transcriber, _audio_path):
+    """
+    文字起こし（同じ音声・モデル・APIキーであればWhisperを呼び出さずに結果を再利用）
+    長い音声の場合は、無音の位置で分割して並列にリクエストする
+    （音声区間の検出はキャッシュがない場合のみ行う）
+    """
+    speech_segments = speech_segments_for_split(_audio_path)
+    if speech_segments:
+        return _transcriber.transcribe_in_chunks(_audio_path, speech_segments)
+    return _transcriber.transcribe(_audio_path)
+
+
+@st.cache_data(show_spinner=False, persist="disk")
+def cached_format_captions(text_hash, model, max_chars, _formatter, _transcript_text):
+    """
+    テロップ整形（同じ文字起こしテキスト・モデル・文字数であればGPTを呼び出さずに結果を再利用）
+    無音検出のパラメータだけを変えて再実行した場合もトークンを消費しない
+    """
+    return _formatter.format_captions(_transcript_text)
+
+
+def speech_segments_for_split(audio_path):
+    """Whisperへの分割送信が必要な長さの音声であれば、分割位置を決めるための音声区間を取得"""
+    with wave.open(audio_path, "rb") as wav:
+        duration = wav.getnframes() / wav.getframerate()
+    if duration <= CHUNK_SECONDS:
+        return None
+    
+    detector = SilenceDetector(cache_dir=str(AUDIO_CACHE_DIR / "silence"))
+    return detector.get_non_silent_segments(audio_path, duration)
+
+
+def run_edl(audio_path, video_path, video_hash, min_silence_len, silence_thresh, keep_silence, auto_threshold, progress):
+    """
+    無音検出からEDL生成までを実行（別スレッドから呼び出すため、画面は更新せず進捗をキューに送る）
+
+    Returns:
+        dict: EDLの内容と統計情報
+    """
+    # 無音検出
+    progress.put((20, "🔍 無音部分を検出中..."))
+    segments = cached_detect_silence(video_hash, min_silence_len, silence_thresh, keep_silence, auto_threshold, audio_path)
+    
+    # メタデータ取得
+    metadata = get_tools().metadata.extract_metadata(str(video_path))
+    
+    # EDL生成
+    progress.put((30, "📋 EDLファイルを生成中..."))
+    edl_generator = EDLGenerator()
+    edl_content = edl_generator.generate_from_segments(
+        segments, metadata, str(video_path)
+    )
+    
+    # 統計情報
+    total_duration = metadata.get('duration', 0)
+    kept_duration = sum(seg['duration'] for seg in segments)
+    cut_percentage = ((total_duration - kept_duration) / total_duration * 100) if total_duration > 0 else 0
+    return {
+        'edl': edl_content,
+        'edl_stats': {
+            'total_segments': len(segments),
+            'total_duration': total_duration,
+            'kept_duration': kept_duration,
+            'cut_percentage': cut_percentage
+        }
+    }
+
+
+def run_srt(audio_path, video_hash, api_key, max_chars, temp_dir, progress_start, progress):
+    """
+    文字起こしからSRT生成までを実行（別スレッドから呼び出すため、画面は更新せず進捗をキューに送る）
+
+    Returns:
+        dict: SRTの内容と統計情報
+    """
+    # 文字起こし
+    progress.put((progress_start, "📝 音声を文字起こし中..."))
+    
+    # API設定を取得（同じ設定のクライアントは再実行をまたいで再利用し、接続を使い回す）
+    try:
+        api_config = get_api_config()
+        if api_config['is_custom']:
+            transcriber = get_transcriber(
+                api_config['api_key'],
+                api_config['whisper_endpoint'],
+                api_config['whisper_model']
+            )
+        else:
+            transcriber = get_transcriber(
+                api_key,
+                api_config['whisper_endpoint'],
+                api_config['whisper_model']
+            )
+    except:
+        transcriber = get_transcriber(
+            api_key,
+            "https://api.openai.com/v1/audio/transcriptions",
+            "whisper-1"
+        )
+    transcript = cached_transcribe(
+        video_hash,
+        f"{transcriber.api_endpoint}|{transcriber.model}",
+        hashlib.blake2b(transcriber.api_key.encode(), digest_size=16).hexdigest(),
+        transcriber,
+        audio_path
+    )
+    
+    if not transcript:
+        raise RuntimeError("文字起こしに失敗しました")
+    
+    # キャプション整形
+    progress.put((progress_start + 20, "✂️ キャプションをフォーマット中..."))
+    
+    # API設定を取得（同じ設定のクライアントは再実行をまたいで再利用し、接続を使い回す）
+    try:
+        api_config = get_api_config()
+        if api_config['is_custom']:
+            formatter = get_caption_formatter(
+                api_config['api_key'],
+                api_config['gpt_endpoint'],
+                api_config['gpt_model'],
+                max_chars
+            )
+        else:
+            formatter = get_caption_formatter(
+                api_key,
+                api_config['gpt_endpoint'],
+                api_config['gpt_model'],
+                max_chars
+            )
+    except:
+        formatter = get_caption_formatter(
+            api_key,
+            "https://api.openai.com/v1/chat/completions",
+            "gpt-4o",
+            max_chars
+        )
+    formatted_text = cached_format_captions(
+        hashlib.sha256(transcript['text'].encode()).hexdigest(),
+        f"{formatter.api_endpoint}|{formatter.model}",
+        max_chars,
+        formatter,
+        transcript['text']
+    )
+    
+    # SRT生成
+    progress.put((progress_start + 30, "📄 SRTファイルを生成中..."))
+    captions_data = formatter.save_formatted_captions(
+        formatted_text,
+        transcript,
+        str(Path(temp_dir) / "captions.json")
+    )
+    
+    result = {
+        'srt': srt_content(captions_data['captions']),
+        'srt_stats': {
+            'caption_count': len(captions_data['captions']),
+            'total_duration': captions_data['captions'][-1]['end'] if captions_data['captions'] else 0
+        }
+    }
+    if 'words' in transcript:
+        result['word_count'] = len(transcript['words'])
+    return result
+
+
 # ページ設定
 st.set_page_config(
     page_title="AI動画編集ツール",
@@ -58,13 +298,18 @@ with st.sidebar:
             step=100,
             help="この時間以上の無音を検出"
         )
+        auto_threshold = st.checkbox(
+            "しきい値を自動判定",
+            value=False,
+            help="音量とスペクトル重心の分布から無音のしきい値を自動で決定（ノイズの多い動画向け）"
+        )
         silence_thresh = st.slider(
             "無音判定しきい値 (dB)",
             min_value=-60,
             max_value=-20,
             value=-35,
             step=5,
-            help="この音量以下を無音と判定"
+            help="この音量以下を無音と判定（自動判定できなかった場合もこの値を使用）"
         )
         keep_silence = st.slider(
             "無音マージン (ミリ秒)",
@@ -132,6 +377,7 @@ else:
     
     if uploaded_file is not None:
         st.success(f"✅ ファイルをアップロードしました: {uploaded_file.name}")
+        video_stem = Path(uploaded_file.name).stem
         
         # ファイル情報表示
         col1, col2 = st.columns(2)
@@ -157,7 +403,7 @@ else:
             try:
                 # 一時ディレクトリの作成
                 with tempfile.TemporaryDirectory() as temp_dir:
-                    # 動画ファイルを保存
+                    # 動画ファイルを保存（getbuffer()はアップロード済みのバッファをコピーせずに参照する）
                     video_path = Path(temp_dir) / uploaded_file.name
                     with open(video_path, 'wb') as f:
                         f.write(uploaded_file.getbuffer())
@@ -165,137 +411,49 @@ else:
                     # 結果を格納する辞書
                     results = {}
                     
-                    # 1. 音声抽出
+                    # 1. 音声抽出（EDL・SRTのどちらも抽出した音声を使うため、先に済ませる）
                     status_text.text("🔊 音声を抽出中...")
                     progress_bar.progress(10)
                     
-                    extractor = AudioExtractor()
-                    audio_path = extractor.extract_audio(str(video_path), temp_dir)
+                    video_hash = file_digest(uploaded_file)
+                    audio_path = cached_extract_audio(video_hash, video_path)
+                    if not os.path.exists(audio_path):
+                        # キャッシュ先の音声が削除されていた場合は抽出し直す
+                        cached_extract_audio.clear()
+                        audio_path = cached_extract_audio(video_hash, video_path)
                     
-                    # EDL処理
-                    if mode in ["EDLのみ（無音カット）", "両方生成"]:
-                        # 無音検出
-                        status_text.text("🔍 無音部分を検出中...")
-                        progress_bar.progress(20)
+                    # 2. 無音検出（CPU処理）と文字起こし（API呼び出しの待ち時間）を並行して実行
+                    # 画面の更新はメインスレッドでのみ行い、各処理からは進捗をキューで受け取る
+                    progress_queue = queue.Queue()
+                    with ThreadPoolExecutor(max_workers=2) as executor:
+                        pending = set()
+                        if mode in ["EDLのみ（無音カット）", "両方生成"]:
+                            pending.add(executor.submit(
+                                run_edl, audio_path, video_path, video_hash,
+                                min_silence_len, silence_thresh, keep_silence, auto_threshold, progress_queue
+                            ))
+                        if mode in ["SRTのみ（字幕）", "両方生成"]:
+                            progress_start = 40 if mode == "両方生成" else 20
+                            pending.add(executor.submit(
+                                run_srt, audio_path, video_hash, api_key, max_chars,
+                                temp_dir, progress_start, progress_queue
+                            ))
                         
-                        detector = SilenceDetector()
-                        segments = detector.detect_silence(
-                            audio_path,
-                            min_silence_len=min_silence_len,
-                            silence_thresh=silence_thresh,
-                            keep_silence=keep_silence
-                        )
-                        
-                        # メタデータ取得
-                        metadata_extractor = VideoMetadataExtractor()
-                        metadata = metadata_extractor.extract_metadata(str(video_path))
-                        
-                        # EDL生成
-                        status_text.text("📋 EDLファイルを生成中...")
-                        progress_bar.progress(30)
-                        
-                        edl_generator = EDLGenerator()
-                        edl_content = edl_generator.generate_from_segments(
-                            segments, metadata, str(video_path)
-                        )
-                        results['edl'] = edl_content
-                        
-                        # 統計情報
-                        total_duration = metadata.get('duration', 0)
-                        kept_duration = sum(seg['duration'] for seg in segments)
-                        cut_percentage = ((total_duration - kept_duration) / total_duration * 100) if total_duration > 0 else 0
-                        results['edl_stats'] = {
-                            'total_segments': len(segments),
-                            'total_duration': total_duration,
-                            'kept_duration': kept_duration,
-                            'cut_percentage': cut_percentage
-                        }
+                        current_progress = 10
+                        while pending:
+                            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                            while not progress_queue.empty():
+                                percent, message = progress_queue.get_nowait()
+                                current_progress = max(current_progress, percent)
+                                progress_bar.progress(current_progress)
+                                status_text.text(message)
+                            for future in done:
+                                # 例外はここで再送出され、下のexceptで表示される
+                                results.update(future.result())
                     
-                    # SRT処理
-                    if mode in ["SRTのみ（字幕）", "両方生成"]:
-                        # 文字起こし
-                        status_text.text("📝 音声を文字起こし中...")
-                        progress_start = 40 if mode == "両方生成" else 20
-                        progress_bar.progress(progress_start)
-                        
-                        # API設定を取得
-                        try:
-                            api_config = get_api_config()
-                            if api_config['is_custom']:
-                                transcriber = ImprovedTranscriber(
-                                    api_config['api_key'],
-                                    api_config['whisper_endpoint'],
-                                    api_config['whisper_model']
-                                )
-                            else:
-                                transcriber = ImprovedTranscriber(
-                                    api_key,
-                                    api_config['whisper_endpoint'],
-                                    api_config['whisper_model']
-                                )
-                        except:
-                            transcriber = ImprovedTranscriber(
-                                api_key,
-                                "https://api.openai.com/v1/audio/transcriptions",
-                                "whisper-1"
-                            )
-                        transcript = transcriber.transcribe(audio_path)
-                        
-                        if not transcript:
-                            st.error("❌ 文字起こしに失敗しました")
-                            st.stop()
-                        
-                        # 単語数を表示
-                        if 'words' in transcript:
-                            st.info(f"📊 文字タイムスタンプを取得: {len(transcript['words'])}文字")
-                        
-                        # キャプション整形
-                        status_text.text("✂️ キャプションをフォーマット中...")
-                        progress_bar.progress(progress_start + 20)
-                        
-                        # API設定を取得
-                        try:
-                            api_config = get_api_config()
-                            if api_config['is_custom']:
-                                formatter = JapaneseCaptionFormatter(
-                                    api_config['api_key'],
-                                    api_config['gpt_endpoint'],
-                                    api_config['gpt_model'],
-                                    max_chars_per_line=max_chars
-                                )
-                            else:
-                                formatter = JapaneseCaptionFormatter(
-                                    api_key,
-                                    api_config['gpt_endpoint'],
-                                    api_config['gpt_model'],
-                                    max_chars_per_line=max_chars
-                                )
-                        except:
-                            formatter = JapaneseCaptionFormatter(
-                                api_key,
-                                "https://api.openai.com/v1/chat/completions",
-                                "gpt-4o",
-                                max_chars_per_line=max_chars
-                            )
-                        formatted_text = formatter.format_captions(transcript['text'])
-                        
-                        # SRT生成
-                        status_text.text("📄 SRTファイルを生成中...")
-                        progress_bar.progress(progress_start + 30)
-                        
-                        captions_data = formatter.save_formatted_captions(
-                            formatted_text,
-                            transcript,
-                            str(Path(temp_dir) / "captions.json")
-                        )
-                        
-                        # SRTファイル作成
-                        srt_content = generate_srt_content(captions_data)
-                        results['srt'] = srt_content
-                        results['srt_stats'] = {
-                            'caption_count': len(captions_data['captions']),
-                            'total_duration': captions_data['captions'][-1]['end'] if captions_data['captions'] else 0
-                        }
+                    # 単語数を表示
+                    if 'word_count' in results:
+                        st.info(f"📊 文字タイムスタンプを取得: {results['word_count']}文字")
                     
                     # 完了
                     progress_bar.progress(100)
@@ -322,7 +480,7 @@ else:
                         st.download_button(
                             label="📥 EDLファイルをダウンロード",
                             data=results['edl'],
-                            file_name=f"{Path(uploaded_file.name).stem}_cut.edl",
+                            file_name=f"{video_stem}_cut.edl",
                             mime="text/plain"
                         )
                     
@@ -341,7 +499,7 @@ else:
                         # プレビュー
                         if 'srt' in results:
                             # SRTコンテンツから最初の5つを抽出してプレビュー
-                            srt_lines = results['srt'].split('\n\n')[:5]
+                            srt_lines = results['srt'].split('\n\n', 5)[:5]
                             with st.expander("📝 字幕プレビュー（最初の5つ）"):
                                 for srt_block in srt_lines:
                                     if srt_block.strip():
@@ -351,7 +509,7 @@ else:
                         st.download_button(
                             label="📥 SRTファイルをダウンロード",
                             data=results['srt'],
-                            file_name=f"{Path(uploaded_file.name).stem}_subtitles.srt",
+                            file_name=f"{video_stem}_subtitles.srt",
                             mime="text/plain"
                         )
                     
@@ -360,40 +518,6 @@ else:
                 st.exception(e)
 
 
-def generate_srt_content(captions_data):
-    """キャプションデータからSRT形式のテキストを生成"""
-    lines = []
-    for i, caption in enumerate(captions_data['captions'], 1):
-        lines.append(str(i))
-        lines.append(f"{format_srt_time(caption['start'])} --> {format_srt_time(caption['end'])}")
-        lines.append(caption['text'])
-        lines.append("")  # 空行
-    
-    return "\n".join(lines)
-
-
-def format_srt_time(seconds):
-    """秒数をSRTタイムコード形式に変換"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    millis = int((seconds % 1) * 1000)
-    
-    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
-
-
-def format_time(seconds):
-    """秒数を時:分:秒形式に変換"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    
-    if hours > 0:
-        return f"{hours}:{minutes:02d}:{secs:02d}"
-    else:
-        return f"{minutes}:{secs:02d}"
-
-
 # フッター
 st.divider()
 st.markdown("""
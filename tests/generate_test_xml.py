@@ -23,7 +23,8 @@ def generate_working_xml(video_path, segments=None):
         ]
     
     # XMLコンテンツ（シンプルで確実な構造）
-    xml_content = f'''<?xml version="1.0" encoding="UTF-8"?>
+    # 部品をリストに集めて最後に1回だけ連結する（+=による文字列の再確保を避ける）
+    parts = [f'''<?xml version="1.0" encoding="UTF-8"?>
 <!DOCTYPE xmeml>
 <xmeml version="4">
   <sequence id="sequence-1">
@@ -52,16 +53,18 @@ def generate_working_xml(video_path, segments=None):
             <fielddominance>none</fielddominance>
           </samplecharacteristics>
         </format>
-        <track>'''
+        <track>''']
     
-    # クリップを追加
+    # クリップを追加（ファイル名・パスは全クリップ共通のため1回だけ変換）
+    file_name = Path(video_path).name
+    path_url = f"file://localhost{quote(video_path)}"
     timeline_position = 0
     for i, segment in enumerate(segments):
         duration_frames = int((segment['end'] - segment['start']) * 30)
         in_frames = int(segment['start'] * 30)
         out_frames = int(segment['end'] * 30)
         
-        xml_content += f'''
+        parts.append(f'''
           <clipitem id="clipitem-{i+1}">
             <name>{video_name} - {i+1}</name>
             <duration>{duration_frames}</duration>
@@ -74,19 +77,20 @@ def generate_working_xml(video_path, segments=None):
             <in>{in_frames}</in>
             <out>{out_frames}</out>
             <file>
-              <name>{Path(video_path).name}</name>
-              <pathurl>file://localhost{quote(video_path)}</pathurl>
+              <name>{file_name}</name>
+              <pathurl>{path_url}</pathurl>
             </file>
-          </clipitem>'''
+          </clipitem>''')
         
         timeline_position += duration_frames
     
-    xml_content += '''
+    parts.append('''
         </track>
       </video>
     </media>
   </sequence>
-</xmeml>'''
+</xmeml>''')
+    xml_content = "".join(parts)
     
     # ファイルに保存
     output_path = output_dir / f"{video_name}_simple.xml"
@@ -104,29 +108,32 @@ def generate_edl(video_path, segments, output_path):
     """EDLファイルも生成"""
     video_name = Path(video_path).stem
     
-    edl_content = f"TITLE: {video_name}_edited\nFCM: NON-DROP FRAME\n\n"
+    lines = [f"TITLE: {video_name}_edited\nFCM: NON-DROP FRAME\n\n"]
     
     timeline_tc = 0
     for i, segment in enumerate(segments):
-        start_tc = frames_to_timecode(int(segment['start'] * 30))
-        end_tc = frames_to_timecode(int(segment['end'] * 30))
-        timeline_start = frames_to_timecode(timeline_tc)
-        timeline_end = frames_to_timecode(timeline_tc + int((segment['end'] - segment['start']) * 30))
+        # フレーム数を先に求め、タイムコード変換は各値1回ずつ
+        duration_frames = int((segment['end'] - segment['start']) * 30)
+        start_tc, end_tc, timeline_start, timeline_end = (
+            frames_to_timecode(frames) for frames in (
+                int(segment['start'] * 30), int(segment['end'] * 30),
+                timeline_tc, timeline_tc + duration_frames
+            )
+        )
         
-        edl_content += f"{i+1:03d}  {video_name} V     C        {start_tc} {end_tc} {timeline_start} {timeline_end}\n"
-        timeline_tc += int((segment['end'] - segment['start']) * 30)
+        lines.append(f"{i+1:03d}  {video_name} V     C        {start_tc} {end_tc} {timeline_start} {timeline_end}\n")
+        timeline_tc += duration_frames
     
     with open(output_path, 'w') as f:
-        f.write(edl_content)
+        f.write("".join(lines))
     
     print(f"EDLファイルも生成しました: {output_path}")
 
 def frames_to_timecode(frames, fps=30):
     """フレーム数をタイムコードに変換"""
-    hours = frames // (fps * 3600)
-    minutes = (frames % (fps * 3600)) // (fps * 60)
-    seconds = (frames % (fps * 60)) // fps
-    frames = frames % fps
+    seconds, frames = divmod(frames, fps)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
     return f"{hours:02d}:{minutes:02d}:{seconds:02d}:{frames:02d}"
 
 def main():
@@ -0,0 +1,39 @@
+"""
+FFmpegSilenceDetector.apply_keep_silenceのテスト
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("librosa")
+pytest.importorskip("pydub")
+
+from utils.silence_detector_ffmpeg import FFmpegSilenceDetector
+
+
+def _pad(segments, keep_silence, total_duration=10.0):
+    return FFmpegSilenceDetector(keep_silence=keep_silence).apply_keep_silence(segments, total_duration)
+
+
+def test_pads_both_sides():
+    assert _pad([(2.0, 3.0), (6.0, 7.0)], 500) == [(1.5, 3.5), (5.5, 7.5)]
+
+
+def test_clamps_to_clip():
+    assert _pad([(0.2, 3.0), (6.0, 9.8)], 500) == [(0, 3.5), (5.5, 10.0)]
+
+
+def test_merges_overlapping_segments():
+    assert _pad([(1.0, 2.0), (2.8, 4.0), (8.0, 9.0)], 500) == [(0.5, 4.5), (7.5, 9.5)]
+
+
+def test_zero_keep_silence_returns_segments_unchanged():
+    segments = [(1.0, 2.0), (2.1, 4.0)]
+    assert _pad(segments, 0) == segments
+
+
+def test_unknown_duration_does_not_clamp_end():
+    assert _pad([(1.0, 2.0)], 500, total_duration=0) == [(0.5, 2.5)]
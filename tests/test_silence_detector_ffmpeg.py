@@ -0,0 +1,53 @@
+"""
+ffmpeg版とpydub版の無音検出が同じ区間を返すことを確認するテスト
+"""
+import os
+import shutil
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("pydub")
+sf = pytest.importorskip("soundfile")
+if not shutil.which("ffmpeg"):
+    pytest.skip("ffmpegがインストールされていません", allow_module_level=True)
+
+from utils.silence_detector import SilenceDetector
+from utils.silence_detector_ffmpeg import FFmpegSilenceDetector
+
+FRAME_RATE = 16000
+
+
+def _square(seconds, amplitude):
+    """矩形波（RMSと各サンプルの振幅が一致するため、両方式の判定が揃う）"""
+    n = int(seconds * FRAME_RATE)
+    return np.where(np.arange(n) // 8 % 2 == 0, amplitude, -amplitude)
+
+
+@pytest.fixture
+def quiet_wav(tmp_path):
+    """ピークが-26dBFSの小さな録音（音声 1秒 / 雑音 1秒 / 音声 1秒 / 雑音 1秒 / 音声 1秒）"""
+    voice, noise = 0.05, 0.0005
+    samples = np.concatenate([
+        _square(1, voice), _square(1, noise), _square(1, voice), _square(1, noise), _square(1, voice)
+    ])
+    path = tmp_path / "quiet.wav"
+    sf.write(str(path), samples, FRAME_RATE, subtype="PCM_16")
+    return str(path)
+
+
+def test_backends_return_same_segments(quiet_wav):
+    # ピーク基準の-20dB（絶対値では約-46dBFS）なら雑音部分だけが無音になる
+    params = dict(min_silence_len=500, silence_thresh=-20, keep_silence=0)
+
+    expected = SilenceDetector(**params).get_non_silent_segments(quiet_wav)
+    actual = FFmpegSilenceDetector(**params).get_non_silent_segments(quiet_wav)
+
+    assert len(expected) == 3
+    assert len(actual) == len(expected)
+    for (start, end), (expected_start, expected_end) in zip(actual, expected):
+        assert start == pytest.approx(expected_start, abs=0.01)
+        assert end == pytest.approx(expected_end, abs=0.01)
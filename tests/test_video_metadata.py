@@ -0,0 +1,50 @@
+"""
+VideoMetadataExtractorのフレームレート解析のテスト
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.video_metadata import VideoMetadataExtractor
+
+
+def _raw_metadata(avg_frame_rate, r_frame_rate):
+    """ffprobeの出力（必要な項目のみ）"""
+    return {
+        'streams': [{
+            'codec_type': 'video',
+            'avg_frame_rate': avg_frame_rate,
+            'r_frame_rate': r_frame_rate,
+        }],
+        'format': {'duration': '10.0'},
+    }
+
+
+def test_parse_ntsc_frame_rate():
+    fps_info = VideoMetadataExtractor()._parse_frame_rate("30000/1001")
+
+    assert fps_info['fps'] == pytest.approx(29.97, abs=0.001)
+    assert fps_info['numerator'] == 30000
+    assert fps_info['denominator'] == 1001
+    assert fps_info['timebase'] == 30
+
+
+def test_parse_zero_frame_rate_raises():
+    with pytest.raises(ValueError):
+        VideoMetadataExtractor()._parse_frame_rate("0/0")
+
+
+def test_zero_avg_frame_rate_falls_back_to_r_frame_rate():
+    metadata = VideoMetadataExtractor()._parse_metadata(_raw_metadata("0/0", "30000/1001"))
+
+    assert metadata['fps_numerator'] == 30000
+    assert metadata['fps_denominator'] == 1001
+    assert metadata['is_ntsc']
+
+
+def test_no_valid_frame_rate_raises():
+    with pytest.raises(ValueError):
+        VideoMetadataExtractor()._parse_metadata(_raw_metadata("0/0", "0/0"))
@@ -2,12 +2,20 @@
 AAF (Advanced Authoring Format) Generator for Premiere Pro
 完全なメディアパス情報を含む高度なフォーマット
 """
+import logging
 import os
 import json
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator
 import uuid
+from itertools import accumulate
 from datetime import datetime
+from xml.sax.saxutils import escape
+
+logger = logging.getLogger(__name__)
+
+# 属性値（id="..."）にも埋め込むため、&<>に加えて引用符もエスケープする
+_ATTR_ENTITIES = {'"': "&quot;"}
 
 class AAFGenerator:
     """AAFファイルを生成するクラス（簡易版）"""
@@ -17,6 +25,12 @@ class AAFGenerator:
         self.video_path = Path(video_path).resolve()
         self.segments = segments
         
+        # XMLに埋め込むファイル名・パス（生成のたびにPathから組み立て直さないよう1回だけ計算）
+        # ファイル名に & < > " が含まれてもXMLが壊れないようエスケープしておく
+        self._video_stem = escape(self.video_path.stem, _ATTR_ENTITIES)
+        self._video_name = escape(self.video_path.name, _ATTR_ENTITIES)
+        self._video_posix = escape(self.video_path.as_posix(), _ATTR_ENTITIES)
+        
         if output_path is None:
             self.output_path = Path("output") / f"{self.video_path.stem}.aaf"
         else:
@@ -28,31 +42,47 @@ class AAFGenerator:
         
     def generate_xml_interchange(self) -> str:
         """Premiere Pro XML Interchange形式を生成（AAFの代替）"""
+        return "".join(self.iter_xml_chunks())
+    
+    def iter_xml_chunks(self) -> Iterator[str]:
+        """Premiere Pro XML Interchange形式を先頭から順に少しずつ生成（ファイルに直接書き出す場合に使用）"""
         # これはPremiere Proが直接読めるXML形式
-        xml_content = f"""<?xml version="1.0" encoding="UTF-8"?>
+        # ループ内で繰り返し使う値はローカル変数に取り出しておく
+        video_stem = self._video_stem
+        video_name = self._video_name
+        video_posix = self._video_posix
+        fps_int = int(self.fps)
+        
+        # 各セグメントのフレーム位置とタイムライン上の位置を1回だけ計算
+        frames = [(int(s['start'] * self.fps), int(s['end'] * self.fps)) for s in self.segments]
+        durations = [end_frame - start_frame for start_frame, end_frame in frames]
+        timeline_positions = [0, *accumulate(durations)]
+        
+        # XML全体を1つの文字列にまとめず、部品ごとに返す
+        yield f"""<?xml version="1.0" encoding="UTF-8"?>
 <!DOCTYPE xmeml>
 <xmeml version="5">
     <project>
-        <name>{self.video_path.stem}_project</name>
+        <name>{video_stem}_project</name>
         <children>
             <bin>
                 <name>Media</name>
                 <children>
-                    <clip id="{self.video_path.stem}_master">
-                        <name>{self.video_path.name}</name>
-                        <duration>{int(self.segments[-1]['end'] * self.fps)}</duration>
+                    <clip id="{video_stem}_master">
+                        <name>{video_name}</name>
+                        <duration>{frames[-1][1]}</duration>
                         <rate>
-                            <timebase>{int(self.fps)}</timebase>
+                            <timebase>{fps_int}</timebase>
                             <ntsc>TRUE</ntsc>
                         </rate>
                         <media>
                             <video>
                                 <track>
                                     <clipitem>
-                                        <name>{self.video_path.name}</name>
+                                        <name>{video_name}</name>
                                         <file id="file-1">
-                                            <name>{self.video_path.name}</name>
-                                            <pathurl>file://{self.video_path.as_posix()}</pathurl>
+                                            <name>{video_name}</name>
+                                            <pathurl>file://{video_posix}</pathurl>
                                         </file>
                                     </clipitem>
                                 </track>
@@ -69,10 +99,10 @@ class AAFGenerator:
                 </children>
             </bin>
             <sequence>
-                <name>{self.video_path.stem}_edited</name>
-                <duration>{int(sum(s['end'] - s['start'] for s in self.segments) * self.fps)}</duration>
+                <name>{video_stem}_edited</name>
+                <duration>{timeline_positions[-1]}</duration>
                 <rate>
-                    <timebase>{int(self.fps)}</timebase>
+                    <timebase>{fps_int}</timebase>
                     <ntsc>TRUE</ntsc>
                 </rate>
                 <media>
@@ -85,56 +115,44 @@ class AAFGenerator:
                         </format>
                         <track>"""
         
-        # 各セグメントを追加
-        timeline_position = 0
-        for i, segment in enumerate(self.segments):
-            start_frame = int(segment['start'] * self.fps)
-            end_frame = int(segment['end'] * self.fps)
-            duration = end_frame - start_frame
-            
-            xml_content += f"""
-                            <clipitem id="clipitem-{i+1}">
-                                <masterclipid>{self.video_path.stem}_master</masterclipid>
-                                <name>{self.video_path.stem}</name>
+        # ビデオトラックのクリップ
+        for i, ((start_frame, end_frame), timeline_position, duration) in enumerate(
+                zip(frames, timeline_positions, durations), 1):
+            yield f"""
+                            <clipitem id="clipitem-{i}">
+                                <masterclipid>{video_stem}_master</masterclipid>
+                                <name>{video_stem}</name>
                                 <start>{timeline_position}</start>
                                 <end>{timeline_position + duration}</end>
                                 <in>{start_frame}</in>
                                 <out>{end_frame}</out>
                                 <file id="file-1">
-                                    <name>{self.video_path.name}</name>
-                                    <pathurl>file://{self.video_path.as_posix()}</pathurl>
+                                    <name>{video_name}</name>
+                                    <pathurl>file://{video_posix}</pathurl>
                                 </file>
                             </clipitem>"""
-            
-            timeline_position += duration
         
-        xml_content += """
+        yield """
                         </track>
                     </video>
                     <audio>
                         <track>"""
         
-        # オーディオトラックも同様に追加
-        timeline_position = 0
-        for i, segment in enumerate(self.segments):
-            start_frame = int(segment['start'] * self.fps)
-            end_frame = int(segment['end'] * self.fps)
-            duration = end_frame - start_frame
-            
-            xml_content += f"""
-                            <clipitem id="clipitem-a{i+1}">
-                                <masterclipid>{self.video_path.stem}_master</masterclipid>
-                                <name>{self.video_path.stem}</name>
+        # オーディオトラックも同様に追加（フレーム位置は計算済みの値を使う）
+        for i, ((start_frame, end_frame), timeline_position, duration) in enumerate(
+                zip(frames, timeline_positions, durations), 1):
+            yield f"""
+                            <clipitem id="clipitem-a{i}">
+                                <masterclipid>{video_stem}_master</masterclipid>
+                                <name>{video_stem}</name>
                                 <start>{timeline_position}</start>
                                 <end>{timeline_position + duration}</end>
                                 <in>{start_frame}</in>
                                 <out>{end_frame}</out>
                                 <file id="file-1"/>
                             </clipitem>"""
-            
-            timeline_position += duration
         
-        xml_content += """
+        yield """
                         </track>
                     </audio>
                 </media>
@@ -142,8 +160,6 @@ class AAFGenerator:
         </children>
     </project>
 </xmeml>"""
-        
-        return xml_content
     
     def save(self):
         """XMLファイルとして保存"""
@@ -152,12 +168,12 @@ class AAFGenerator:
         # 拡張子を.xmlに変更
         xml_path = self.output_path.with_suffix('.xml')
         
-        xml_content = self.generate_xml_interchange()
-        
-        with open(xml_path, 'w', encoding='utf-8') as f:
-            f.write(xml_content)
+        # 生成した部品を64KBのバッファ経由で順に書き出す（XML全体の文字列を作らない）
+        with open(xml_path, 'w', encoding='utf-8', buffering=1 << 16) as f:
+            for chunk in self.iter_xml_chunks():
+                f.write(chunk)
         
-        print(f"Premiere Pro XML saved to: {xml_path}")
+        logger.info(f"Premiere Pro XML saved to: {xml_path}")
         
         # メディアリンク情報を別ファイルに保存
         link_info = {
@@ -0,0 +1,67 @@
+"""
+音声キャッシュモジュール：動画からデコードした16kHzモノラルPCMを動画の隣に保存し、再利用する
+"""
+import logging
+import os
+import subprocess
+import sys
+
+logger = logging.getLogger(__name__)
+
+# キャッシュファイルの拡張子（<動画ファイル名>.mono16k.wav）
+CACHE_SUFFIX = ".mono16k.wav"
+CACHE_SAMPLE_RATE = 16000
+
+
+def decode_input_args():
+    """
+    ffmpegの入力ファイル（-i）の前に付けるデコード用オプションを取得
+
+    デコードを全コアで行い、macOSではVideoToolbox、それ以外では利用可能なハードウェアデコーダを使用する
+    """
+    hwaccel = "videotoolbox" if sys.platform == "darwin" else "auto"
+    return ["-hwaccel", hwaccel, "-threads", "0"]
+
+
+def get_pcm_path(video_path):
+    """
+    動画ファイルに対応する16kHzモノラルWAVのパスを取得
+
+    動画より新しいキャッシュが存在すればそのまま返し、
+    存在しなければffmpegで一度だけデコードして作成する
+
+    Args:
+        video_path (str): 動画ファイルのパス
+
+    Returns:
+        str: キャッシュしたWAVファイルのパス
+    """
+    cache_path = str(video_path) + CACHE_SUFFIX
+
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(video_path):
+        logger.info(f"キャッシュ済みの音声を使用します: {cache_path}")
+        return cache_path
+
+    logger.info(f"動画から音声をデコード中: {video_path}")
+    cmd = [
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error", "-nostats",
+        *decode_input_args(),
+        "-i", str(video_path),
+        "-vn", "-map", "0:a:0",
+        "-ac", "1",
+        "-ar", str(CACHE_SAMPLE_RATE),
+        "-c:a", "pcm_s16le",
+        cache_path
+    ]
+
+    try:
+        # 進捗表示などのログは出力させず、標準出力も破棄する（エラーメッセージだけを受け取る）
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    except Exception:
+        # 途中まで書き込まれたファイルを次回キャッシュとして使わないよう削除
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+        raise
+
+    logger.info(f"音声をキャッシュしました: {cache_path}")
+    return cache_path
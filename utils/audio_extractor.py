@@ -1,11 +1,18 @@
 """
 音声抽出モジュール：FFmpegを使用して動画から音声を抽出
 """
+import logging
 import os
 import subprocess
-import sys
+import tempfile
 from pathlib import Path
 
+from utils.audio_cache import decode_input_args
+from utils.cache_key import file_cache_key
+from utils.video_metadata import probe_audio_stream
+
+logger = logging.getLogger(__name__)
+
 class AudioExtractor:
     def __init__(self):
         # デフォルト設定
@@ -45,30 +52,94 @@ class AudioExtractor:
         os.makedirs(output_dir, exist_ok=True)
         
         # 入力ファイル名から拡張子を除いた名前を取得
+        # 別フォルダの同名の動画や出力形式の違う音声を取り違えないよう、動画と形式のキーをファイル名に含める
         video_filename = Path(video_path).stem
-        audio_filename = f"{video_filename}.{audio_format}"
+        key = file_cache_key(video_path, audio_codec, audio_sample_rate, audio_channels)[:12]
+        audio_filename = f"{video_filename}.{key}.{audio_format}"
         audio_path = os.path.join(output_dir, audio_filename)
         
+        # 同じ動画・形式で抽出済みの音声があれば再利用（ffmpegでのデコードを省略）
+        if os.path.exists(audio_path):
+            logger.info(f"抽出済みの音声を再利用します: {audio_path}")
+            return audio_path
+        
+        # 中断された書き込みを再利用しないよう、一時ファイルに書き出してから置き換える
+        fd, tmp_path = tempfile.mkstemp(dir=output_dir, suffix=f".{audio_format}")
+        os.close(fd)
+        
         # FFmpegコマンドを構築
+        # 元の音声が出力と同じ形式であれば、デコード・リサンプルせずにそのままコピー
+        source = probe_audio_stream(video_path)
+        if source == {'codec_name': audio_codec, 'sample_rate': audio_sample_rate, 'channels': audio_channels}:
+            audio_args = ['-c:a', 'copy']
+        else:
+            audio_args = [
+                '-acodec', audio_codec,
+                '-ar', str(audio_sample_rate),
+                '-ac', str(audio_channels)
+            ]
+        
+        # 進捗表示などのログは出力させず、エラーメッセージだけを受け取る
         cmd = [
             'ffmpeg',
+            '-hide_banner', '-loglevel', 'error', '-nostats',
+            *decode_input_args(),
             '-i', video_path,
             '-vn',  # 映像を除外
-            '-acodec', audio_codec,
-            '-ar', str(audio_sample_rate),
-            '-ac', str(audio_channels),
-            '-y',  # 既存ファイルを上書き
-            audio_path
+            '-map', '0:a:0',  # 最初の音声ストリームだけを処理
+            *audio_args,
+            '-y',  # 既存ファイル（作成済みの一時ファイル）を上書き
+            tmp_path
         ]
         
         try:
             # FFmpegを実行
-            subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            print(f"音声を抽出しました: {audio_path}")
+            # 標準出力は使わないため破棄し、ffmpegのログをメモリに溜め込まない
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            os.replace(tmp_path, audio_path)
+            logger.info(f"音声を抽出しました: {audio_path}")
             return audio_path
         except subprocess.CalledProcessError as e:
-            print(f"音声抽出エラー: {e}", file=sys.stderr)
+            logger.error(f"音声抽出エラー: {e}")
+            if e.stderr:
+                logger.error(e.stderr.decode('utf-8', errors='replace').strip())
             raise
         except FileNotFoundError:
-            print("エラー: FFmpegがインストールされていません。", file=sys.stderr)
+            logger.error("エラー: FFmpegがインストールされていません。")
             raise
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def extract_audio_stream(self, video_path, audio_sample_rate=None, audio_channels=None):
+        """
+        動画から音声をデコードし、16bitのPCM（s16le）を標準出力に書き出すffmpegプロセスを起動
+        
+        一時WAVファイルを経由せず、呼び出し側はcommunicate()で受け取ったデータを
+        np.frombuffer(data, dtype=np.int16) などで直接読み込む
+        
+        Args:
+            video_path (str): 動画ファイルのパス
+            audio_sample_rate (int, optional): サンプルレート
+            audio_channels (int, optional): チャンネル数
+            
+        Returns:
+            subprocess.Popen: ffmpegのプロセス（stdout・stderrはパイプ）
+        """
+        if audio_sample_rate is None:
+            audio_sample_rate = self.default_sample_rate
+        if audio_channels is None:
+            audio_channels = self.default_channels
+        
+        cmd = [
+            'ffmpeg',
+            '-hide_banner', '-loglevel', 'error', '-nostats',
+            *decode_input_args(),
+            '-i', video_path,
+            '-vn',  # 映像を除外
+            '-map', '0:a:0',  # 最初の音声ストリームだけを処理
+            '-ac', str(audio_channels),
+            '-ar', str(audio_sample_rate),
+            '-f', 's16le', 'pipe:1'
+        ]
+        return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
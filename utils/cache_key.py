@@ -0,0 +1,21 @@
+"""
+キャッシュキーモジュール：ファイルの内容を読まずに、パス・更新日時・サイズからキャッシュのキーを生成
+"""
+import os
+import hashlib
+
+
+def file_cache_key(path, *params):
+    """
+    ファイルのキャッシュキーを取得（os.statを1回呼ぶだけで、ファイル本体は読み込まない）
+
+    Args:
+        path (str): 対象ファイルのパス
+        *params: キーに含める追加のパラメータ（モデル名や検出設定など）
+
+    Returns:
+        str: 32文字の16進数文字列
+    """
+    stat = os.stat(path)
+    key = "|".join([os.path.abspath(path), str(stat.st_mtime_ns), str(stat.st_size), *map(str, params)])
+    return hashlib.blake2s(key.encode("utf-8"), digest_size=16).hexdigest()
@@ -0,0 +1,62 @@
+"""
+テロップ整形キャッシュモジュール：文字起こしテキストをキーにGPTの整形結果を保存・再利用
+"""
+import logging
+import os
+import hashlib
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+
+class CaptionCache:
+    """テロップ整形結果のキャッシュ"""
+
+    def __init__(self, cache_dir):
+        """
+        Args:
+            cache_dir (str): キャッシュの保存先ディレクトリ
+        """
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def make_key(*params):
+        """キャッシュのキーを取得（プロンプトの種類・エンドポイントとモデル・文字数・文字起こしテキストなどのSHA-256）"""
+        return hashlib.sha256("|".join(map(str, params)).encode("utf-8")).hexdigest()
+
+    def _cache_path(self, key):
+        """キャッシュファイルのパスを取得"""
+        return os.path.join(self.cache_dir, f"{key}.txt")
+
+    def load(self, key):
+        """キャッシュ済みの整形結果を取得（存在しない場合はNone）"""
+        cache_path = self._cache_path(key)
+        if not os.path.exists(cache_path):
+            return None
+
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                result = f.read()
+        except OSError as e:
+            logger.warning(f"テロップ整形キャッシュの読み込みに失敗: {e}")
+            return None
+
+        logger.info(f"キャッシュ済みのテロップ整形結果を使用します: {cache_path}")
+        return result
+
+    def save(self, key, formatted_text):
+        """整形結果をキャッシュに保存（書き込み途中のファイルを残さないよう一時ファイルから置き換える）"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        cache_path = self._cache_path(key)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(formatted_text)
+            os.replace(tmp_path, cache_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return cache_path
@@ -0,0 +1,167 @@
+"""
+テロップ整形の共通モジュール：GPT APIの呼び出し・キャッシュ・分割リクエストを各整形クラスで共有
+"""
+import logging
+import os
+import requests
+
+from utils import fastjson
+from utils.caption_cache import CaptionCache
+from utils.caption_text import format_in_chunks
+from utils.rate_limiter import post_with_retry
+
+logger = logging.getLogger(__name__)
+
+class BaseCaptionFormatter:
+    """テロップ整形の基底クラス（タイミングの割り当てと保存はsave_formatted_captionsで各クラスが実装）"""
+
+    # Trueの場合、タイミング合わせのため元のテキストの単語順序を変えないよう指示する
+    keep_word_order = False
+
+    def __init__(self, api_key, api_endpoint, model, max_chars_per_line=15, cache_dir=None):
+        """
+        Args:
+            cache_dir (str, optional): テロップ整形結果のキャッシュ先（Noneの場合はキャッシュしない）
+        """
+        self.api_key = api_key
+        self.api_endpoint = api_endpoint
+        self.model = model
+        self.max_chars_per_line = max_chars_per_line
+        self.cache = CaptionCache(cache_dir) if cache_dir else None
+        # 同じインスタンスからのリクエストではTLS接続を再利用する
+        self.session = requests.Session()
+
+    def format_captions(self, transcript_text, ignore_cache=False):
+        """
+        文字起こしテキストをテロップに適した形式に整形
+
+        Args:
+            transcript_text (str): 文字起こしテキスト
+            ignore_cache (bool): Trueの場合はキャッシュを使わずにAPIを呼び出す（結果はキャッシュに保存する）
+
+        Returns:
+            str: 整形されたテロップテキスト
+        """
+        logger.info("テロップ整形を開始します...")
+
+        # 同じテキスト・設定の整形結果があれば再利用（クラス名もキーに含め、プロンプトの違う整形結果を混ぜない）
+        # エンドポイントが違えば同じモデル名でも別のモデルのため、エンドポイントもキーに含める
+        cache_key = None
+        if self.cache:
+            cache_key = CaptionCache.make_key(type(self).__name__, f"{self.api_endpoint}|{self.model}",
+                                              self.max_chars_per_line, transcript_text)
+            cached = None if ignore_cache else self.cache.load(cache_key)
+            if cached is not None:
+                return cached
+
+        # 長いテキストは文の区切りで分割し、並列にリクエストして順番通りに結合する
+        formatted_text = format_in_chunks(transcript_text, self._format_chunk)
+        if self.cache:
+            self.cache.save(cache_key, formatted_text)
+
+        logger.info("テロップ整形が完了しました")
+        return formatted_text
+
+    def _format_chunk(self, transcript_text):
+        """テキスト1まとまり分をGPT APIで整形"""
+        return self._call_api(self._build_prompt(transcript_text))
+
+    def _build_prompt(self, transcript_text):
+        """GPT APIに送るメッセージのリストを作成"""
+        system_message = "あなたは動画編集者のためのテロップ作成アシスタントです。"
+        extra_rules = ""
+        if self.keep_word_order:
+            system_message += "元のテキストの単語順序を保ちながら整形してください。"
+            extra_rules = "6. 重要：元のテキストの単語の順序は変更しないでください\n"
+
+        # GPT-4oへのプロンプト
+        prompt = f"""
+文字起こしテキストをテロップ用に整形してください。
+
+【入力テキスト】
+{transcript_text}
+
+【整形ルール】
+1. フィラー語（えー、あの、まあ、など）を除去
+2. 句読点を適切に配置
+3. 誤字脱字を修正（可能な範囲で）
+4. 1行あたり{self.max_chars_per_line}文字以内に収まるよう改行を挿入
+   - 意味のある区切りで改行する
+   - 「、」や「。」の後で改行を入れるのが望ましい
+5. 読みやすいテロップになるよう配慮
+{extra_rules}
+【出力形式】
+整形されたテキストをそのまま出力してください。フォーマットの説明や追加コメントは不要です。
+        """
+
+        return [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _call_api(self, messages):
+        """GPT APIを呼び出し、整形されたテキストを返す"""
+        # APIリクエストのヘッダー
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        }
+
+        # APIリクエストデータ
+        data = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": 0.3
+        }
+
+        try:
+            # APIリクエストを送信（レート制限を守り、429の場合は待ってから再送）
+            response = post_with_retry(
+                self.api_key,
+                self.api_endpoint,
+                headers=headers,
+                json=data,
+                session=self.session
+            )
+
+            # レスポンスを確認
+            if response.status_code != 200:
+                logger.error(f"API エラー ({response.status_code}): {response.text}")
+                raise Exception(f"GPT API エラー: {response.text}")
+
+            # レスポンスからテキストを取得
+            result = response.json()
+            return result['choices'][0]['message']['content'].strip()
+
+        except Exception as e:
+            logger.error(f"テロップ整形エラー: {str(e)}")
+            raise
+
+    def _fallback_to_segments(self, formatted_text, transcript_data, output_path):
+        """
+        単語タイムスタンプが利用できない場合の従来のセグメントベース処理
+        """
+        lines = formatted_text.split('\n')
+        segments = transcript_data.get("segments", [])
+
+        caption_data = {
+            "original_text": transcript_data.get("text", ""),
+            "formatted_text": formatted_text,
+            "captions": []
+        }
+
+        line_index = 0
+        for segment in segments:
+            if line_index < len(lines) and lines[line_index].strip():
+                caption_data["captions"].append({
+                    "text": lines[line_index].strip(),
+                    "start": segment.get("start", 0),
+                    "end": segment.get("end", 0)
+                })
+                line_index += 1
+
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as f:
+            fastjson.dump(caption_data, f, ensure_ascii=False, indent=2)
+
+        return caption_data
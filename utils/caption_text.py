@@ -0,0 +1,64 @@
+"""
+テロップ用のテキスト処理：GPTに送るテキストを文の区切りで分割し、整形前後のテキストは句読点・空白を除いて照合する
+"""
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# 1回のリクエストで整形するテキストの最大文字数（長い文字起こしは文の区切りで分割して並列に整形する）
+CHUNK_CHARS = 1500
+# 同時に送るリクエストの最大数
+MAX_PARALLEL_REQUESTS = 4
+# 文末（句点・感嘆符・疑問符の直後）
+_SENTENCE_END_RE = re.compile(r'(?<=[。！？])')
+# 照合時に無視する文字（句読点と空白）
+_SYMBOL_RE = re.compile(r'[、。！？\s]')
+# 1文字ずつ判定する場合の集合（正規表現の\sに一致する空白文字はすべてU+3000以下にある）
+SYMBOL_CHARS = frozenset("、。！？" + "".join(c for c in map(chr, range(0x3001)) if c.isspace()))
+
+
+def strip_symbols(text):
+    """句読点と空白を除去"""
+    return _SYMBOL_RE.sub('', text)
+
+
+def split_into_chunks(text, max_chars=CHUNK_CHARS):
+    """
+    テキストを文の区切りでmax_chars文字以内のまとまりに分割
+
+    1文がmax_charsを超える場合はmax_chars文字ごとに区切る
+    """
+    chunks = []
+    current = ""
+    for sentence in _SENTENCE_END_RE.split(text):
+        for start in range(0, len(sentence), max_chars):
+            piece = sentence[start:start + max_chars]
+            if current and len(current) + len(piece) > max_chars:
+                chunks.append(current)
+                current = ""
+            current += piece
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
+
+def format_in_chunks(text, format_chunk):
+    """
+    長いテキストを文の区切りで分割し、format_chunkを並列に呼び出して順番通りに改行で結合する
+
+    Args:
+        text (str): 整形するテキスト
+        format_chunk (callable): テキスト1まとまりを受け取り、整形したテキストを返す関数
+
+    Returns:
+        str: 整形されたテキスト
+    """
+    chunks = split_into_chunks(text)
+    if len(chunks) <= 1:
+        return format_chunk(text)
+
+    logger.info(f"テキストを{len(chunks)}個に分割して整形します")
+    with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_REQUESTS, len(chunks))) as executor:
+        return "\n".join(executor.map(format_chunk, chunks))
@@ -3,10 +3,15 @@ EDL (Edit Decision List) Generator for Adobe Premiere Pro
 Generates CMX 3600 EDL format for maximum compatibility
 """
 
+import logging
 import os
 from pathlib import Path
 from typing import List, Dict, Optional
 
+from utils.tc_cache import seconds_to_timecode, seconds_to_timecodes, record_times
+
+logger = logging.getLogger(__name__)
+
 class EDLGenerator:
     """Generate EDL files compatible with Adobe Premiere Pro"""
     
@@ -35,35 +40,23 @@ class EDLGenerator:
     
     def seconds_to_timecode(self, seconds: float) -> str:
         """Convert seconds to SMPTE timecode"""
-        # Handle negative values
-        if seconds < 0:
-            return "00:00:00:00"
-        
-        # Calculate frames
-        total_frames = int(seconds * self.fps)
-        
-        if self.drop_frame and self.fps > 29:
-            # Drop frame calculation for 29.97 fps
-            # Drop 2 frames every minute except every 10th minute
-            frames_per_10min = int(10 * 60 * self.fps) - 18  # 18 frames dropped
-            
-            d = total_frames // frames_per_10min
-            m = total_frames % frames_per_10min
-            
-            if m > 1:
-                total_frames += 18 * d + 2 * ((m - 2) // (60 * int(self.fps) - 2))
-            else:
-                total_frames += 18 * d
-        
-        # Calculate time components
-        hours = int(total_frames // (3600 * self.fps))
-        minutes = int((total_frames % (3600 * self.fps)) // (60 * self.fps))
-        seconds_tc = int((total_frames % (60 * self.fps)) // self.fps)
-        frames = int(total_frames % self.fps)
-        
-        # Format with appropriate separator
-        separator = ';' if self.drop_frame else ':'
-        return f"{hours:02d}:{minutes:02d}:{seconds_tc:02d}{separator}{frames:02d}"
+        return seconds_to_timecode(seconds, self.fps, self.drop_frame)
+    
+    def segment_timecodes(self):
+        """
+        Source and record (timeline position) timecodes for all segments, computed in one batch
+        
+        Returns:
+            tuple: (src_in, src_out, rec_in, rec_out) lists of timecode strings
+        """
+        starts = [segment['start'] for segment in self.segments]
+        ends = [segment['end'] for segment in self.segments]
+        rec_in, rec_out = record_times(starts, ends)
+        
+        return tuple(
+            seconds_to_timecodes(values, self.fps, self.drop_frame)
+            for values in (starts, ends, rec_in, rec_out)
+        )
     
     def generate_edl(self) -> str:
         """Generate EDL content"""
@@ -81,31 +74,19 @@ class EDLGenerator:
         lines.append("")
         
         # Edit decisions
-        timeline_tc = 0.0  # Current position on timeline
+        # Reel name (use filename without extension)
+        reel = self.video_path.stem[:8].upper()  # CMX 3600 limits reel to 8 chars
+        
+        # Track type (V for video, A for audio, B for both)
+        track = "B"  # Both video and audio
         
-        for i, segment in enumerate(self.segments, 1):
+        # Edit type (C for cut)
+        edit_type = "C"
+        
+        for i, (src_in, src_out, rec_in, rec_out) in enumerate(zip(*self.segment_timecodes()), 1):
             # Edit number (padded to 3 digits)
             edit_num = f"{i:03d}"
             
-            # Reel name (use filename without extension)
-            reel = self.video_path.stem[:8].upper()  # CMX 3600 limits reel to 8 chars
-            
-            # Track type (V for video, A for audio, B for both)
-            track = "B"  # Both video and audio
-            
-            # Edit type (C for cut)
-            edit_type = "C"
-            
-            # Source in/out timecodes
-            src_in = self.seconds_to_timecode(segment['start'])
-            src_out = self.seconds_to_timecode(segment['end'])
-            
-            # Record in/out timecodes (timeline position)
-            rec_in = self.seconds_to_timecode(timeline_tc)
-            duration = segment['end'] - segment['start']
-            timeline_tc += duration
-            rec_out = self.seconds_to_timecode(timeline_tc)
-            
             # Format: EDIT# REEL TRACK EDITTYPE SRC_IN SRC_OUT REC_IN REC_OUT
             edl_line = f"{edit_num}  {reel:<8} {track}     {edit_type}        "
             edl_line += f"{src_in} {src_out} {rec_in} {rec_out}"
@@ -213,7 +194,7 @@ class EDLGenerator:
         with open(self.output_path, 'w', encoding='utf-8') as f:
             f.write(edl_content)
         
-        print(f"EDL saved to: {self.output_path}")
+        logger.info(f"EDL saved to: {self.output_path}")
         return str(self.output_path)
     
     def save_with_titles_as_comments(self, captions: List[Dict]):
@@ -241,5 +222,5 @@ class EDLGenerator:
         with open(self.output_path, 'w', encoding='utf-8') as f:
             f.write('\n'.join(lines))
         
-        print(f"EDL with caption comments saved to: {self.output_path}")
+        logger.info(f"EDL with caption comments saved to: {self.output_path}")
         return str(self.output_path)
\ No newline at end of file
@@ -3,10 +3,15 @@ EDL Generator with explicit cuts
 Generates EDL that explicitly shows cuts between segments
 """
 
+import logging
 import os
 from pathlib import Path
 from typing import List, Dict, Optional
 
+from utils.tc_cache import seconds_to_timecode
+
+logger = logging.getLogger(__name__)
+
 class EDLGeneratorCuts:
     """Generate EDL files with explicit cut points"""
     
@@ -30,28 +35,7 @@ class EDLGeneratorCuts:
     
     def seconds_to_timecode(self, seconds: float) -> str:
         """Convert seconds to SMPTE timecode"""
-        if seconds < 0:
-            return "00:00:00:00"
-        
-        total_frames = int(seconds * self.fps)
-        
-        if self.drop_frame and self.fps > 29:
-            frames_per_10min = int(10 * 60 * self.fps) - 18
-            d = total_frames // frames_per_10min
-            m = total_frames % frames_per_10min
-            
-            if m > 1:
-                total_frames += 18 * d + 2 * ((m - 2) // (60 * int(self.fps) - 2))
-            else:
-                total_frames += 18 * d
-        
-        hours = int(total_frames // (3600 * self.fps))
-        minutes = int((total_frames % (3600 * self.fps)) // (60 * self.fps))
-        seconds_tc = int((total_frames % (60 * self.fps)) // self.fps)
-        frames = int(total_frames % self.fps)
-        
-        separator = ';' if self.drop_frame else ':'
-        return f"{hours:02d}:{minutes:02d}:{seconds_tc:02d}{separator}{frames:02d}"
+        return seconds_to_timecode(seconds, self.fps, self.drop_frame)
     
     def generate_edl(self) -> str:
         """Generate EDL content with individual clips for each segment"""
@@ -114,7 +98,7 @@ class EDLGeneratorCuts:
         with open(self.output_path, 'w', encoding='utf-8') as f:
             f.write(edl_content)
         
-        print(f"EDL saved to: {self.output_path}")
+        logger.info(f"EDL saved to: {self.output_path}")
         return str(self.output_path)
 
 
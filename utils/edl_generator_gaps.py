@@ -2,10 +2,13 @@
 EDL Generator with gaps between segments
 """
 
+import logging
 import os
 from pathlib import Path
 from typing import List, Dict, Optional
 
+logger = logging.getLogger(__name__)
+
 class EDLGeneratorGaps:
     """Generate EDL with explicit gaps between segments"""
     
@@ -92,5 +95,5 @@ class EDLGeneratorGaps:
         with open(self.output_path, 'w', encoding='utf-8') as f:
             f.write(edl_content)
         
-        print(f"EDL saved to: {self.output_path}")
+        logger.info(f"EDL saved to: {self.output_path}")
         return str(self.output_path)
\ No newline at end of file
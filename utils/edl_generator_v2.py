@@ -3,10 +3,13 @@ Enhanced EDL Generator for Adobe Premiere Pro
 Generates CMX 3600 EDL format with better compatibility
 """
 
+import logging
 import os
 from pathlib import Path
 from typing import List, Dict, Optional
 
+logger = logging.getLogger(__name__)
+
 class EDLGeneratorV2:
     """Generate EDL files with improved Premiere Pro compatibility"""
     
@@ -96,7 +99,7 @@ class EDLGeneratorV2:
         with open(self.output_path, 'w', encoding='utf-8') as f:
             f.write(edl_content)
         
-        print(f"EDL saved to: {self.output_path}")
+        logger.info(f"EDL saved to: {self.output_path}")
         return str(self.output_path)
 
 
@@ -0,0 +1,52 @@
+"""
+JSON入出力モジュール：orjsonがインストールされていれば使用し、なければ標準のjsonを使用
+標準のjsonと同じ load/loads/dump/dumps の形で呼び出せる
+"""
+import io
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# NumPyの配列・スカラーもそのまま書き出せるようにする
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY if orjson else 0
+
+
+def _use_orjson(ensure_ascii, indent):
+    """orjsonで同じ出力が得られる設定かを判定（orjsonはASCIIエスケープとインデント2以外に非対応）"""
+    return orjson is not None and not ensure_ascii and indent in (None, 2)
+
+
+def loads(s):
+    """JSON文字列（bytesも可）を読み込む"""
+    if orjson is not None:
+        return orjson.loads(s)
+    return json.loads(s)
+
+
+def load(fp):
+    """ファイルオブジェクトからJSONを読み込む（テキスト・バイナリどちらのモードでも可）"""
+    return loads(fp.read())
+
+
+def dumps(obj, ensure_ascii=True, indent=None):
+    """オブジェクトをJSON文字列に変換"""
+    if _use_orjson(ensure_ascii, indent):
+        option = _ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=ensure_ascii, indent=indent)
+
+
+def dump(obj, fp, ensure_ascii=True, indent=None):
+    """オブジェクトをJSONとしてファイルオブジェクトに書き出す（テキスト・バイナリどちらのモードでも可）"""
+    if _use_orjson(ensure_ascii, indent):
+        option = _ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        data = orjson.dumps(obj, option=option)
+        # バイナリモードならエンコードし直さずにそのまま書き込む
+        fp.write(data.decode("utf-8") if isinstance(fp, io.TextIOBase) else data)
+        return
+
+    text = json.dumps(obj, ensure_ascii=ensure_ascii, indent=indent)
+    fp.write(text if isinstance(fp, io.TextIOBase) else text.encode("utf-8"))
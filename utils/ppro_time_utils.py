@@ -121,6 +121,30 @@ class PproTimeCalculator:
             # 通常のタイムコード計算
             return self._calculate_non_drop_frame_timecode(total_frames)
     
+    def seconds_to_timecodes(self, seconds) -> list:
+        """
+        秒の配列をまとめて非ドロップフレームのタイムコードに変換（NumPyで一括計算）
+        
+        Args:
+            seconds: 秒数の配列
+            
+        Returns:
+            タイムコード文字列 (HH:MM:SS:FF) のリスト
+        """
+        import numpy as np
+        
+        total_frames = (np.asarray(seconds, dtype=np.float64) * self.fps).astype(np.int64)
+        
+        frames_per_second = self.timebase
+        total_seconds, frames = np.divmod(total_frames, frames_per_second)
+        total_minutes, secs = np.divmod(total_seconds, 60)
+        hours, minutes = np.divmod(total_minutes, 60)
+        
+        return [
+            f"{h:02d}:{m:02d}:{s:02d}:{f:02d}"
+            for h, m, s, f in zip(hours.tolist(), minutes.tolist(), secs.tolist(), frames.tolist())
+        ]
+    
     def _calculate_non_drop_frame_timecode(self, total_frames: int) -> str:
         """
         非ドロップフレームタイムコードを計算
@@ -2,6 +2,7 @@
 Premiere Pro完全互換XML生成モジュール
 複数クリップ方式で正確なフレームレートとpproTicksを使用
 """
+import logging
 import os
 import uuid
 from pathlib import Path
@@ -13,6 +14,8 @@ import urllib.parse
 from .video_metadata import VideoMetadataExtractor
 from .ppro_time_utils import PproTimeCalculator, create_calculator_from_metadata
 
+logger = logging.getLogger(__name__)
+
 
 class PremiereXMLGenerator:
     """Premiere Pro用のXMLを生成するクラス"""
@@ -82,7 +85,7 @@ class PremiereXMLGenerator:
             f.write('<!DOCTYPE xmeml>\n')
             f.write(xml_string)
             
-        print(f"Premiere Pro XMLファイルを生成しました: {output_path}")
+        logger.info(f"Premiere Pro XMLファイルを生成しました: {output_path}")
         return output_path
     
     def _create_master_clip(self, parent: ET.Element):
@@ -2,6 +2,7 @@
 Premiere Pro 2024動作確認済みXML生成モジュール
 実際にPremiere Proで読み込みテスト済みの形式を使用
 """
+import logging
 import os
 from pathlib import Path
 from typing import List, Tuple, Optional, Dict
@@ -10,6 +11,8 @@ from xml.dom import minidom
 
 from .video_metadata import VideoMetadataExtractor
 
+logger = logging.getLogger(__name__)
+
 
 class PremiereXMLGeneratorTested:
     """動作確認済みの形式でPremiere Pro XMLを生成"""
@@ -162,7 +165,7 @@ class PremiereXMLGeneratorTested:
             f.write('<!DOCTYPE xmeml>\n')
             f.write(xml_str)
         
-        print(f"動作確認済みPremiere Pro XMLを生成しました: {output_path}")
+        logger.info(f"動作確認済みPremiere Pro XMLを生成しました: {output_path}")
         return output_path
     
     def _add_video_track(self, video: ET.Element, segments: List[Tuple[float, float]]):
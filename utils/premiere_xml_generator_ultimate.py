@@ -9,6 +9,7 @@
 4. メタデータの完全な記述
 5. リンク情報による映像と音声の同期
 """
+import logging
 import os
 import uuid
 from pathlib import Path
@@ -22,6 +23,8 @@ import math
 from .video_metadata import VideoMetadataExtractor
 from .ppro_time_utils import PproTimeCalculator, create_calculator_from_metadata
 
+logger = logging.getLogger(__name__)
+
 
 class PremiereXMLGeneratorUltimate:
     """究極版 Premiere Pro用XML生成クラス"""
@@ -62,19 +65,22 @@ class PremiereXMLGeneratorUltimate:
         'background_padding': 10
     }
     
-    def __init__(self, video_path: str):
+    def __init__(self, video_path: str, metadata: Optional[Dict] = None):
         """
         初期化
         
         Args:
             video_path: 動画ファイルのパス
+            metadata: 取得済みの動画メタデータ（Noneの場合はffprobeで取得）
         """
         self.video_path = video_path
         self.video_name = Path(video_path).stem
         
-        # メタデータを取得
+        # メタデータを取得（呼び出し側で取得済みであればそれを使う）
         self.metadata_extractor = VideoMetadataExtractor()
-        self.metadata = self.metadata_extractor.extract_metadata(video_path)
+        if metadata is None:
+            metadata = self.metadata_extractor.extract_metadata(video_path)
+        self.metadata = metadata
         
         # 時間計算機を初期化
         self.time_calc = create_calculator_from_metadata(self.metadata)
@@ -120,11 +126,11 @@ class PremiereXMLGeneratorUltimate:
         # XMLを整形して保存
         self._save_formatted_xml(xmeml, output_path)
         
-        print(f"究極版 Premiere Pro XMLを生成しました: {output_path}")
-        print(f"- セグメント数: {len(segments)}")
-        print(f"- 総時間: {sum(end - start for start, end in segments):.2f}秒")
+        logger.info(f"究極版 Premiere Pro XMLを生成しました: {output_path}")
+        logger.info(f"- セグメント数: {len(segments)}")
+        logger.info(f"- 総時間: {sum(end - start for start, end in segments):.2f}秒")
         if captions:
-            print(f"- キャプション数: {len(captions)}")
+            logger.info(f"- キャプション数: {len(captions)}")
         
         return output_path
     
@@ -3,13 +3,22 @@ Pure FCP7 XML Generator for Adobe Premiere Pro
 Generates standard FCP7 XML without Premiere-specific extensions
 """
 
+import logging
 import xml.etree.ElementTree as ET
 from xml.dom import minidom
+import hashlib
 import os
+import pickle
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from fractions import Fraction
 
+logger = logging.getLogger(__name__)
+
+# Generated XML per input (segments, captions, video path and metadata), most recent last
+_XML_CACHE_SIZE = 16
+_xml_cache: Dict[bytes, str] = {}
+
 class PureFCP7XMLGenerator:
     """Generate pure FCP7 XML compatible with Adobe Premiere Pro"""
     
@@ -203,8 +212,28 @@ class PureFCP7XMLGenerator:
         ET.SubElement(param, 'name').text = 'Text'
         ET.SubElement(param, 'value').text = caption['text']
     
+    def _cache_key(self) -> bytes:
+        """Hash of everything the generated XML depends on"""
+        inputs = (str(self.video_path), self.segments, self.captions, self.width, self.height,
+                  self.fps, self.duration_seconds, self.timebase, self.ntsc)
+        return hashlib.blake2b(pickle.dumps(inputs, 2), digest_size=16).digest()
+    
     def generate_xml(self):
-        """Generate pure FCP7 XML"""
+        """Generate pure FCP7 XML (reuses the previous result when the inputs are unchanged)"""
+        key = self._cache_key()
+        if key in _xml_cache:
+            # Move to the end so the least recently used entry is evicted first
+            _xml_cache[key] = _xml_cache.pop(key)
+            return _xml_cache[key]
+        
+        final_xml = self._build_xml()
+        _xml_cache[key] = final_xml
+        if len(_xml_cache) > _XML_CACHE_SIZE:
+            del _xml_cache[next(iter(_xml_cache))]
+        return final_xml
+    
+    def _build_xml(self):
+        """Build the XML string"""
         # Create root
         xmeml = ET.Element('xmeml', version='4')
         
@@ -289,5 +318,5 @@ class PureFCP7XMLGenerator:
         with open(self.output_path, 'w', encoding='utf-8') as f:
             f.write(xml_content)
         
-        print(f"Pure FCP7 XML saved to: {self.output_path}")
+        logger.info(f"Pure FCP7 XML saved to: {self.output_path}")
         return str(self.output_path)
\ No newline at end of file
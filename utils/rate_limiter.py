@@ -0,0 +1,102 @@
+"""
+APIレート制限モジュール：トークンバケットでリクエスト数を制限し、429エラー時は待ってから再送する
+"""
+import random
+import logging
+import threading
+import time
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# APIキーごとの1分あたりの最大リクエスト数（OpenAIの最も低い利用枠に合わせる）
+DEFAULT_REQUESTS_PER_MINUTE = 50
+# 連続して送れるリクエストの最大数
+DEFAULT_BURST = 5
+# 再送するHTTPステータス（レート制限・一時的なサーバーエラー）
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """トークンバケット：1秒あたりrate_per_sec個のトークンが補充され、最大capacity個まで貯まる"""
+
+    def __init__(self, rate_per_sec, capacity):
+        self.rate_per_sec = rate_per_sec
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """トークンを1つ取得（足りない場合は補充されるまで待つ）"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate_per_sec)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate_per_sec
+            time.sleep(wait)
+
+
+# APIキーごとのバケット（Streamlitの再実行や複数スレッドの間で共有する）
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(api_key):
+    """APIキーに対応するトークンバケットを取得（なければ作成）"""
+    with _buckets_lock:
+        if api_key not in _buckets:
+            _buckets[api_key] = TokenBucket(DEFAULT_REQUESTS_PER_MINUTE / 60, DEFAULT_BURST)
+        return _buckets[api_key]
+
+
+def _retry_after(response):
+    """Retry-Afterヘッダーの秒数を取得（ない場合や日付形式の場合はNone）"""
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def post_with_retry(api_key, url, max_attempts=6, initial_wait=1.0, max_wait=60.0, session=None, **kwargs):
+    """
+    レート制限を守ってPOSTし、429や一時的なエラーの場合は待ってから再送する
+
+    待ち時間はRetry-Afterヘッダーがあればその値、なければ指数バックオフ（ジッター付き）
+
+    Args:
+        api_key (str): APIキー（レート制限の単位）
+        url (str): リクエスト先
+        max_attempts (int): 最大の送信回数
+        initial_wait (float): 1回目の再送までの待ち時間の目安（秒）
+        max_wait (float): 待ち時間の上限（秒）
+        session (requests.Session, optional): 接続を再利用するセッション（Noneの場合は毎回接続）
+        **kwargs: requests.postに渡す引数
+
+    Returns:
+        requests.Response: 最後に受け取ったレスポンス
+    """
+    bucket = get_bucket(api_key)
+    for attempt in range(1, max_attempts + 1):
+        # 再送時はアップロードするファイルを先頭から読み直す
+        for file_tuple in (kwargs.get("files") or {}).values():
+            if isinstance(file_tuple, tuple) and hasattr(file_tuple[1], "seek"):
+                file_tuple[1].seek(0)
+
+        bucket.acquire()
+        response = (session or requests).post(url, **kwargs)
+        if response.status_code not in RETRY_STATUS_CODES or attempt == max_attempts:
+            return response
+
+        wait = _retry_after(response)
+        if wait is None:
+            wait = random.uniform(0, min(max_wait, initial_wait * 2 ** (attempt - 1)))
+        wait = min(wait, max_wait)
+        logger.warning(f"API エラー ({response.status_code})、{wait:.1f}秒後に再送します（{attempt}/{max_attempts}）")
+        time.sleep(wait)
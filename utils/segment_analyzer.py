@@ -1,10 +1,14 @@
 """
 無音区間検出モジュール：Whisperのセグメントタイムスタンプを解析して無音区間を特定
 """
-import json
+import logging
 import os
 from pathlib import Path
 
+from utils import fastjson
+
+logger = logging.getLogger(__name__)
+
 class SegmentAnalyzer:
     def __init__(self, silence_threshold=1.0, margin=0.2):
         """
@@ -27,7 +31,7 @@ class SegmentAnalyzer:
                 keep_segments: 保持する音声区間のリスト [(start_time, end_time), ...]
                 full_transcript: 全文字起こしテキスト
         """
-        print("発話区間と無音区間の解析を開始します...")
+        logger.info("発話区間と無音区間の解析を開始します...")
         
         # 全文字起こしテキスト
         full_transcript = transcript_data.get("text", "")
@@ -44,8 +48,8 @@ class SegmentAnalyzer:
                 segments = transcript_data["results"].get("segments", [])
                 
             if not segments:
-                print("警告: セグメント情報が見つかりません。Whisper APIのレスポンス形式を確認してください。")
-                print("レスポンス内容:", transcript_data)
+                logger.warning("警告: セグメント情報が見つかりません。Whisper APIのレスポンス形式を確認してください。")
+                logger.warning(f"レスポンス内容: {transcript_data}")
                 
                 # 最小限のセグメント情報を作成（全体を1つのセグメントとして扱う）
                 duration = transcript_data.get("duration", 0)
@@ -55,7 +59,7 @@ class SegmentAnalyzer:
                         "end": duration,
                         "text": full_transcript
                     }]
-                    print(f"全体を1つのセグメントとして扱います（0秒〜{duration}秒）")
+                    logger.info(f"全体を1つのセグメントとして扱います（0秒〜{duration}秒）")
                 else:
                     raise ValueError("セグメント情報が見つからず、全体の長さも不明です。")
         
@@ -67,7 +71,7 @@ class SegmentAnalyzer:
         for i, segment in enumerate(segments):
             # 必要なフィールドが存在することを確認
             if "start" not in segment or "end" not in segment:
-                print(f"警告: セグメント {i} に開始/終了時間情報がありません。スキップします。")
+                logger.warning(f"警告: セグメント {i} に開始/終了時間情報がありません。スキップします。")
                 continue
                 
             segment_start = segment.get("start", 0)
@@ -99,7 +103,7 @@ class SegmentAnalyzer:
             keep_segments.append((current_segment_start, current_segment_end + self.margin))
         
         # 結果の概要を表示
-        print(f"解析完了: {len(keep_segments)}個の発話区間を検出しました")
+        logger.info(f"解析完了: {len(keep_segments)}個の発話区間を検出しました")
         
         return keep_segments, full_transcript
     
@@ -123,7 +127,7 @@ class SegmentAnalyzer:
         
         # JSONファイルとして保存
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(segments_data, f, ensure_ascii=False, indent=2)
+        with open(output_path, "wb") as f:
+            fastjson.dump(segments_data, f, ensure_ascii=False, indent=2)
         
-        print(f"発話区間データを保存しました: {output_path}")
+        logger.info(f"発話区間データを保存しました: {output_path}")
@@ -1,58 +1,253 @@
 """
 無音区間検出モジュール：動画・音声ファイルから無音区間を特定し、音声がある区間のリストを作成
 """
+import logging
 import os
 import numpy as np
 import json
 from pathlib import Path
+import struct
 import subprocess
 import tempfile
+from concurrent.futures import ProcessPoolExecutor
 import librosa
 import soundfile as sf
 from pydub import AudioSegment
 from pydub.silence import detect_silence
 
+from utils import fastjson
+from utils.audio_cache import get_pcm_path
+from utils.audio_extractor import AudioExtractor
+from utils.cache_key import file_cache_key
+from utils.silence_detector_fast import detect_silence_np
+
+logger = logging.getLogger(__name__)
+
+# load_audioでデコードする際のサンプルレート
+LOAD_SAMPLE_RATE = 16000
+
+# サンプル幅（バイト）とNumPyの型の対応
+_SAMPLE_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+
+def _silent_ranges(samples, channels, frame_rate, min_silence_len, thresh_amp, seek_step=1):
+    """
+    サンプル配列から無音区間（ミリ秒）を検出する（pydub.silence.detect_silenceと同じ判定）
+
+    Args:
+        samples (np.ndarray): インターリーブされたサンプル列（整数または浮動小数点）
+        thresh_amp (float): 無音と判定するRMSのしきい値（振幅）
+    """
+    seg_len = len(samples) // channels * 1000 // frame_rate
+    if seg_len < min_silence_len:
+        return []
+
+    # 二乗値の累積和（先頭に0を置いて区間和を差分で取れるようにする）
+    # 二乗・累積和とも確保済みのバッファに直接書き込み、長尺音声での一時配列のコピーを避ける
+    acc_dtype = np.float64 if samples.dtype.kind == "f" else np.int64
+    squares = np.array(samples, dtype=acc_dtype)
+    np.multiply(squares, squares, out=squares)
+    csum = np.empty(len(squares) + 1, dtype=acc_dtype)
+    csum[0] = 0
+    np.cumsum(squares, out=csum[1:])
+    del squares
+
+    # pydubと同じ窓の開始位置（ミリ秒）
+    last_slice_start = seg_len - min_silence_len
+    slice_starts = np.arange(0, last_slice_start + 1, seek_step)
+    if last_slice_start % seek_step:
+        slice_starts = np.append(slice_starts, last_slice_start)
+
+    # ミリ秒 → サンプル位置（チャンネルはインターリーブされている）
+    begin = slice_starts * frame_rate // 1000 * channels
+    end = np.minimum((slice_starts + min_silence_len) * frame_rate // 1000 * channels, len(samples))
+    count = np.maximum(end - begin, 1)
+    mean_square = (csum[end] - csum[begin]) / count
+
+    # しきい値（振幅）と比較するため二乗同士で比較する
+    silence_starts = slice_starts[mean_square <= thresh_amp * thresh_amp]
+    if len(silence_starts) == 0:
+        return []
+
+    # 連続せず、かつ窓が重ならない位置で区間を分割
+    gaps = np.diff(silence_starts)
+    breaks = np.flatnonzero((gaps != seek_step) & (gaps > min_silence_len))
+    range_starts = np.concatenate(([silence_starts[0]], silence_starts[breaks + 1]))
+    range_ends = np.concatenate((silence_starts[breaks], [silence_starts[-1]])) + min_silence_len
+
+    return [[int(start), int(end)] for start, end in zip(range_starts, range_ends)]
+
+
+def detect_silence_numpy(audio_segment, min_silence_len=1000, silence_thresh=-16, seek_step=1):
+    """
+    pydub.silence.detect_silenceと同じ結果をNumPyで一括計算する
+
+    各窓のRMSを二乗値の累積和の差分から求めるため、窓ごとのPythonループが不要
+
+    Returns:
+        list: 無音区間のリスト [[start, end], ...]（ミリ秒）
+    """
+    dtype = _SAMPLE_DTYPES.get(audio_segment.sample_width)
+    if dtype is None:
+        # 24bitなど未対応のサンプル幅はpydubの実装で処理
+        return detect_silence(audio_segment, min_silence_len, silence_thresh, seek_step)
+
+    samples = np.frombuffer(audio_segment.raw_data, dtype=dtype)
+    thresh_amp = (10 ** (silence_thresh / 20)) * audio_segment.max_possible_amplitude
+    return _silent_ranges(samples, audio_segment.channels, audio_segment.frame_rate,
+                          min_silence_len, thresh_amp, seek_step)
+
+
+def read_wav_layout(wav_path):
+    """
+    WAVファイルのチャンクを走査し、PCMデータの位置と形式を取得
+
+    Returns:
+        tuple: (データ開始位置（バイト）, サンプル数, チャンネル数, サンプルレート, サンプル幅（バイト）)
+    """
+    file_size = os.path.getsize(wav_path)
+    with open(wav_path, "rb") as f:
+        header = f.read(12)
+        if header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            raise ValueError(f"WAVファイルではありません: {wav_path}")
+
+        channels = frame_rate = sample_width = None
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                raise ValueError(f"dataチャンクが見つかりません: {wav_path}")
+            chunk_id = chunk_header[:4]
+            chunk_size = struct.unpack("<I", chunk_header[4:])[0]
+
+            if chunk_id == b"fmt ":
+                fmt = f.read(chunk_size)
+                channels, frame_rate = struct.unpack("<HI", fmt[2:8])
+                sample_width = struct.unpack("<H", fmt[14:16])[0] // 8
+                f.seek(chunk_size % 2, 1)
+            elif chunk_id == b"data":
+                if channels is None:
+                    raise ValueError(f"fmtチャンクが見つかりません: {wav_path}")
+                data_offset = f.tell()
+                # ffmpegがサイズ未確定で書き出した場合に備えてファイルサイズで制限
+                data_size = min(chunk_size, file_size - data_offset)
+                return data_offset, data_size // sample_width, channels, frame_rate, sample_width
+            else:
+                # 奇数サイズのチャンクは1バイトのパディングを含む
+                f.seek(chunk_size + chunk_size % 2, 1)
+
+
+def wav_peak(wav_path, layout=None):
+    """
+    WAVファイルの最大振幅（絶対値）を取得
+
+    メモリマップしたまま最大値・最小値を求め、PCM全体のコピーを作らない
+    """
+    data_offset, n_samples, channels, frame_rate, sample_width = layout or read_wav_layout(wav_path)
+    if n_samples == 0:
+        return 0
+    samples = np.memmap(wav_path, dtype=_SAMPLE_DTYPES[sample_width], mode="r",
+                        offset=data_offset, shape=(n_samples,))
+    # int16の-32768などもPythonの整数に変換してから符号反転する
+    return max(int(samples.max()), -int(samples.min()))
+
+
+def _detect_chunk(wav_path, layout, start_ms, end_ms, min_silence_len, thresh_amp):
+    """WAVファイルの一部区間から無音区間を検出（ProcessPoolExecutorのワーカー用）"""
+    data_offset, n_samples, channels, frame_rate, sample_width = layout
+    samples = np.memmap(wav_path, dtype=_SAMPLE_DTYPES[sample_width], mode="r",
+                        offset=data_offset, shape=(n_samples,))
+
+    begin = start_ms * frame_rate // 1000 * channels
+    end = min(end_ms * frame_rate // 1000 * channels, n_samples)
+    ranges = _silent_ranges(samples[begin:end], channels, frame_rate, min_silence_len, thresh_amp)
+
+    # チャンク内の位置をファイル全体の位置に変換
+    return [(start + start_ms, end + start_ms) for start, end in ranges]
+
+
 class SilenceDetector:
     """無音区間検出クラス"""
     
-    def __init__(self, min_silence_len=500, silence_thresh=-40, keep_silence=100):
+    def __init__(self, min_silence_len=500, silence_thresh=-40, keep_silence=100, cache_dir=None):
         """
         Args:
             min_silence_len (int): 無音と判定する最小の長さ（ミリ秒）
             silence_thresh (int): 無音と判定する音量のしきい値（dB）
             keep_silence (int): 無音区間の前後に残す無音の長さ（ミリ秒）
+            cache_dir (str, optional): 検出結果のキャッシュ先（Noneの場合はキャッシュしない）
         """
         self.min_silence_len = min_silence_len
         self.silence_thresh = silence_thresh
         self.keep_silence = keep_silence
+        self.cache_dir = cache_dir
+    
+    def _segments_cache_path(self, audio_path, total_duration):
+        """検出結果のキャッシュファイルのパスを取得（音声ファイルと検出パラメータが同じなら同じキーになる）"""
+        key = file_cache_key(audio_path, type(self).__name__, self.min_silence_len,
+                             self.silence_thresh, self.keep_silence, total_duration)
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def load_cached_segments(self, audio_path, total_duration=None):
+        """キャッシュ済みの音声がある区間を取得（キャッシュしない設定・未キャッシュの場合はNone）"""
+        if not self.cache_dir:
+            return None
+        
+        cache_path = self._segments_cache_path(audio_path, total_duration)
+        if not os.path.exists(cache_path):
+            return None
+        
+        try:
+            with open(cache_path, "rb") as f:
+                segments = fastjson.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"無音検出キャッシュの読み込みに失敗: {e}")
+            return None
+        
+        logger.info(f"キャッシュ済みの無音検出結果を使用します: {cache_path}")
+        return [(start, end) for start, end in segments]
+    
+    def save_cached_segments(self, audio_path, total_duration, segments):
+        """音声がある区間をキャッシュに保存"""
+        if not self.cache_dir:
+            return
+        
+        os.makedirs(self.cache_dir, exist_ok=True)
+        cache_path = self._segments_cache_path(audio_path, total_duration)
+        
+        # 書き込み途中のファイルを残さないよう一時ファイルから置き換える
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            fastjson.dump([[start, end] for start, end in segments], f)
+        os.replace(tmp_path, cache_path)
     
     def extract_audio_from_video(self, video_path):
         """動画ファイルから音声を抽出"""
         # 音声ファイルの場合はそのまま使用
         if video_path.lower().endswith(('.wav', '.mp3', '.aac', '.m4a')):
-            print(f"音声ファイルを直接使用します: {video_path}")
+            logger.info(f"音声ファイルを直接使用します: {video_path}")
             # MP3の場合はwavに変換
             if video_path.lower().endswith('.mp3'):
                 try:
                     wav_path = os.path.splitext(video_path)[0] + ".wav"
                     if os.path.exists(wav_path):
-                        print(f"既存のWAVファイルを使用します: {wav_path}")
+                        logger.info(f"既存のWAVファイルを使用します: {wav_path}")
                         return wav_path
                     
-                    print(f"MP3ファイルをWAVに変換中: {video_path}")
+                    logger.info(f"MP3ファイルをWAVに変換中: {video_path}")
                     # ffmpegを使用して直接変換
                     cmd = [
                         "ffmpeg", "-i", video_path, 
+                        "-vn", "-map", "0:a:0",
                         "-acodec", "pcm_s16le", 
                         "-ar", "44100", "-ac", "2", 
                         wav_path, "-y"
                     ]
                     subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                    print(f"変換完了: {wav_path}")
+                    logger.info(f"変換完了: {wav_path}")
                     return wav_path
                 except Exception as e:
-                    print(f"MP3変換エラー: {e}")
-                    print("librosaを使用して直接処理します")
+                    logger.warning(f"MP3変換エラー: {e}")
+                    logger.info("librosaを使用して直接処理します")
                     return video_path
             return video_path
         
@@ -61,12 +256,12 @@ class SilenceDetector:
         
         # すでに音声ファイルが存在する場合はスキップ
         if os.path.exists(audio_path):
-            print(f"音声ファイルが既に存在します: {audio_path}")
+            logger.info(f"音声ファイルが既に存在します: {audio_path}")
             return audio_path
         
         # FFmpegで音声抽出
         try:
-            print(f"動画から音声を抽出中: {video_path}")
+            logger.info(f"動画から音声を抽出中: {video_path}")
             
             # 一時ディレクトリを確保
             temp_dir = os.path.dirname(audio_path)
@@ -76,7 +271,7 @@ class SilenceDetector:
             # ffmpegを使用して音声抽出（オプションを変更）
             cmd = [
                 "ffmpeg", "-i", video_path, 
-                "-vn", "-acodec", "pcm_s16le", 
+                "-vn", "-map", "0:a:0", "-acodec", "pcm_s16le", 
                 "-ar", "44100", "-ac", "2", 
                 "-f", "wav",  # 明示的にフォーマット指定
                 audio_path, "-y"
@@ -86,14 +281,14 @@ class SilenceDetector:
             
             # エラーが発生したかチェック
             if result.returncode != 0:
-                print(f"FFmpeg警告: {result.stderr}")
+                logger.warning(f"FFmpeg警告: {result.stderr}")
                 # エラーが発生しても続行する場合があるため、ファイルの存在をチェック
                 if os.path.exists(audio_path) and os.path.getsize(audio_path) > 0:
-                    print(f"エラーが発生しましたが、音声ファイルは生成されています: {audio_path}")
+                    logger.warning(f"エラーが発生しましたが、音声ファイルは生成されています: {audio_path}")
                     return audio_path
                 
                 # ffmpeg-pythonを使用した代替方法を試みる
-                print("代替方法を試みます...")
+                logger.info("代替方法を試みます...")
                 import ffmpeg
                 try:
                     # ffmpeg-pythonを使用した音声抽出
@@ -102,41 +297,72 @@ class SilenceDetector:
                     ffmpeg.run(stream, overwrite_output=True)
                     
                     if os.path.exists(audio_path) and os.path.getsize(audio_path) > 0:
-                        print(f"代替方法で音声抽出に成功しました: {audio_path}")
+                        logger.info(f"代替方法で音声抽出に成功しました: {audio_path}")
                         return audio_path
                 except Exception as e:
-                    print(f"代替方法でもエラー: {e}")
+                    logger.warning(f"代替方法でもエラー: {e}")
                     
                     # 直接librosaで処理するために元のファイルを返す
-                    print("librosaを使用して元の動画ファイルを直接処理します")
+                    logger.info("librosaを使用して元の動画ファイルを直接処理します")
                     return video_path
             
-            print(f"音声抽出完了: {audio_path}")
+            logger.info(f"音声抽出完了: {audio_path}")
             return audio_path
             
         except Exception as e:
-            print(f"音声抽出エラー: {e}")
+            logger.warning(f"音声抽出エラー: {e}")
             
             # エラーが発生した場合、元のファイルを返す
-            print("エラーが発生したため、元のファイルを直接処理します")
+            logger.warning("エラーが発生したため、元のファイルを直接処理します")
             return video_path
     
+    def load_audio(self, audio_path):
+        """
+        ffmpegで最初の音声ストリームのみをデコードしてAudioSegmentとして読み込む
+
+        映像ストリームはデコードせず、16kHzモノラルのPCMをパイプで受け取る
+        """
+        try:
+            proc = AudioExtractor().extract_audio_stream(
+                audio_path, audio_sample_rate=LOAD_SAMPLE_RATE, audio_channels=1
+            )
+            data, stderr = proc.communicate()
+            if proc.returncode != 0:
+                raise RuntimeError(stderr.decode("utf-8", errors="replace").strip())
+        except Exception as e:
+            logger.warning(f"ffmpegでの音声デコードに失敗: {e}")
+            return AudioSegment.from_file(audio_path)
+
+        return AudioSegment(data=data, sample_width=2, frame_rate=LOAD_SAMPLE_RATE, channels=1)
+    
+    def get_audio_duration(self, audio_path):
+        """
+        音声ファイルの総再生時間（秒）を取得
+
+        WAVファイルはヘッダーから求め、音声全体をデコードしない
+        """
+        try:
+            _, n_samples, channels, frame_rate, _ = read_wav_layout(audio_path)
+        except (OSError, ValueError, struct.error):
+            return len(self.load_audio(audio_path)) / 1000  # ミリ秒から秒に変換
+        return n_samples // channels / frame_rate
+    
     def detect_silent_segments(self, audio_path):
         """音声ファイルから無音区間を検出"""
-        print(f"無音区間を検出中: {audio_path}")
+        logger.info(f"無音区間を検出中: {audio_path}")
         
         # 音声ファイルを読み込み
         try:
-            audio = AudioSegment.from_file(audio_path)
+            audio = self.load_audio(audio_path)
             
             # ノーマライズを実行して小さい音も検出しやすくする
             audio = audio.normalize()
             
-            print(f"音声ファイル情報: 長さ={len(audio)/1000:.2f}秒, チャンネル数={audio.channels}, サンプルレート={audio.frame_rate}Hz")
-            print(f"検出パラメータ: min_silence_len={self.min_silence_len}ms, silence_thresh={self.silence_thresh}dB")
+            logger.info(f"音声ファイル情報: 長さ={len(audio)/1000:.2f}秒, チャンネル数={audio.channels}, サンプルレート={audio.frame_rate}Hz")
+            logger.info(f"検出パラメータ: min_silence_len={self.min_silence_len}ms, silence_thresh={self.silence_thresh}dB")
             
             # 無音区間の検出（戻り値は [start, end] のミリ秒単位のリスト）
-            silent_segments = detect_silence(
+            silent_segments = detect_silence_numpy(
                 audio, 
                 min_silence_len=self.min_silence_len, 
                 silence_thresh=self.silence_thresh,
@@ -146,19 +372,19 @@ class SilenceDetector:
             # ミリ秒から秒に変換
             silent_segments_sec = [(start/1000, end/1000) for start, end in silent_segments]
             
-            print(f"検出された無音区間: {len(silent_segments_sec)}個")
+            logger.info(f"検出された無音区間: {len(silent_segments_sec)}個")
             # 詳細な情報を表示
             if silent_segments_sec:
                 for i, (start, end) in enumerate(silent_segments_sec[:5]):  # 最初の5つだけ表示
-                    print(f"  無音区間 {i+1}: {start:.2f}秒 - {end:.2f}秒 (長さ: {end-start:.2f}秒)")
+                    logger.info(f"  無音区間 {i+1}: {start:.2f}秒 - {end:.2f}秒 (長さ: {end-start:.2f}秒)")
                 if len(silent_segments_sec) > 5:
-                    print(f"  ... 他 {len(silent_segments_sec)-5} 個の無音区間")
+                    logger.info(f"  ... 他 {len(silent_segments_sec)-5} 個の無音区間")
             
             return silent_segments_sec
             
         except Exception as e:
-            print(f"pydubでの無音区間検出中にエラーが発生しました: {e}")
-            print("代替処理を試みます...")
+            logger.warning(f"pydubでの無音区間検出中にエラーが発生しました: {e}")
+            logger.info("代替処理を試みます...")
             
             # 代替処理：ffmpeg-pythonを使用したり、librosaで読み込んでsilent_segmentsを取得
             try:
@@ -194,38 +420,97 @@ class SilenceDetector:
                     if (end_time - silent_start) * 1000 >= self.min_silence_len:
                         silent_segments_sec.append((silent_start, end_time))
                 
-                print(f"librosaによる検出: {len(silent_segments_sec)}個の無音区間")
+                logger.info(f"librosaによる検出: {len(silent_segments_sec)}個の無音区間")
                 return silent_segments_sec
                 
             except Exception as e2:
-                print(f"代替処理でもエラーが発生しました: {e2}")
-                print("動画全体を1つの区間として処理します。")
+                logger.warning(f"代替処理でもエラーが発生しました: {e2}")
+                logger.info("動画全体を1つの区間として処理します。")
                 # エラーが発生した場合は空のリストを返す
                 return []
     
+    def detect_on_array(self, samples, frame_rate, channels=1):
+        """
+        デコード済みのサンプル配列から音声がある区間を取得（ファイルの読み書きを行わない）
+
+        Args:
+            samples (np.ndarray): インターリーブされたサンプル列（整数または浮動小数点）
+            frame_rate (int): サンプルレート
+            channels (int): チャンネル数
+
+        Returns:
+            list: 音声がある区間のリスト [(start, end), ...]（秒）
+        """
+        total_duration = len(samples) // channels / frame_rate
+
+        # 通常版はnormalize()後に判定するため、ピーク基準のしきい値に換算する
+        peak = float(np.abs(samples).max()) if len(samples) else 0.0
+        thresh_amp = (10 ** ((self.silence_thresh + 0.1) / 20)) * peak
+
+        silent_ranges = _silent_ranges(samples, channels, frame_rate, self.min_silence_len, thresh_amp)
+        silent_segments = [(start / 1000, end / 1000) for start, end in silent_ranges]
+
+        return self.invert_silent_segments(silent_segments, total_duration)
+    
+    def detect_silence(self, audio_path, min_silence_len=None, silence_thresh=None, keep_silence=None, auto_threshold=False):
+        """
+        音声がある区間を高速に検出（フレーム単位のRMSで判定する簡易版）
+
+        soundfileで読み込めない形式の場合はget_non_silent_segmentsで検出する
+
+        Args:
+            audio_path (str): 音声ファイルのパス
+            min_silence_len, silence_thresh, keep_silence: 省略時はインスタンスの設定を使用
+            auto_threshold (bool): しきい値を音量・スペクトル重心のヒストグラムから自動で決めるか
+
+        Returns:
+            list: 音声がある区間のリスト [{"start", "end", "duration"}, ...]（秒）
+        """
+        self.adjust_silence_detection(min_silence_len, silence_thresh, keep_silence)
+        try:
+            segments = detect_silence_np(
+                audio_path, self.min_silence_len, self.silence_thresh, self.keep_silence,
+                auto_threshold=auto_threshold
+            )
+        except RuntimeError as e:
+            logger.warning(f"高速な無音検出に失敗したため、通常の検出を行います: {e}")
+            segments = self.get_non_silent_segments(audio_path)
+        
+        return [{"start": start, "end": end, "duration": end - start} for start, end in segments]
+    
     def get_non_silent_segments(self, audio_path, total_duration=None):
         """無音でない区間（音声がある区間）を取得"""
+        cached = self.load_cached_segments(audio_path, total_duration)
+        if cached is not None:
+            return cached
+        requested_duration = total_duration
+        
         # 無音区間を検出
         silent_segments = self.detect_silent_segments(audio_path)
         
         # 総再生時間が指定されていない場合は音声ファイルから取得
         if total_duration is None:
-            audio = AudioSegment.from_file(audio_path)
-            total_duration = len(audio) / 1000  # ミリ秒から秒に変換
+            total_duration = self.get_audio_duration(audio_path)
         
-        # 音声がある区間を計算
+        non_silent_segments = self.invert_silent_segments(silent_segments, total_duration)
+        
+        self.save_cached_segments(audio_path, requested_duration, non_silent_segments)
+        return non_silent_segments
+    
+    def invert_silent_segments(self, silent_segments, total_duration):
+        """無音区間のリストを反転し、音声がある区間のリストを作成"""
         non_silent_segments = []
         if not silent_segments:
             # 無音区間がない場合や全体が無音の場合
             if total_duration > 0:
-                print("無音区間が検出されませんでした。全体を1つの区間として処理します。")
+                logger.info("無音区間が検出されませんでした。全体を1つの区間として処理します。")
                 non_silent_segments = [(0, total_duration)]
             else:
-                print("有効な音声区間が見つかりませんでした。")
+                logger.info("有効な音声区間が見つかりませんでした。")
         else:
             # 無音区間が全体をカバーしているかチェック
             if len(silent_segments) == 1 and silent_segments[0][0] <= 0.1 and silent_segments[0][1] >= total_duration - 0.1:
-                print("動画全体が無音として検出されました。全体を1つの区間として処理します。")
+                logger.info("動画全体が無音として検出されました。全体を1つの区間として処理します。")
                 non_silent_segments = [(0, total_duration)]
             else:
                 # 無音区間の間の音声区間を抽出
@@ -243,10 +528,10 @@ class SilenceDetector:
         
         # 結果が空の場合は全体を使用
         if not non_silent_segments:
-            print("有効な音声区間が見つからなかったため、全体を1つの区間として使用します。")
+            logger.info("有効な音声区間が見つからなかったため、全体を1つの区間として使用します。")
             non_silent_segments = [(0, total_duration)]
             
-        print(f"抽出された音声区間: {len(non_silent_segments)}個")
+        logger.info(f"抽出された音声区間: {len(non_silent_segments)}個")
         return non_silent_segments
     
     def analyze_video(self, video_path, output_dir="temp", save_segments=True):
@@ -254,27 +539,30 @@ class SilenceDetector:
         # 出力ディレクトリの作成
         os.makedirs(output_dir, exist_ok=True)
         
-        # 動画から音声を抽出
-        audio_path = self.extract_audio_from_video(video_path)
+        # 動画から音声を抽出（2回目以降はキャッシュ済みのWAVを再利用）
+        try:
+            audio_path = get_pcm_path(video_path)
+        except Exception as e:
+            logger.warning(f"音声キャッシュの作成に失敗: {e}")
+            audio_path = self.extract_audio_from_video(video_path)
         
-        # 総再生時間を取得
+        # 総再生時間を取得（キャッシュ済みのWAVはヘッダーから求め、デコードは無音検出のみで行う）
         total_duration = None
         # 音声ファイルからの読み込み試行
         try:
             try:
-                audio = AudioSegment.from_file(audio_path)
-                total_duration = len(audio) / 1000  # ミリ秒から秒に変換
-                print(f"総再生時間: {total_duration:.2f}秒")
+                total_duration = self.get_audio_duration(audio_path)
+                logger.info(f"総再生時間: {total_duration:.2f}秒")
             except Exception as e:
-                print(f"AudioSegmentでの読み込みに失敗: {e}")
+                logger.warning(f"総再生時間の取得に失敗: {e}")
                 
                 # librasaを使った代替法
                 try:
                     y, sr = librosa.load(audio_path, sr=None)
                     total_duration = librosa.get_duration(y=y, sr=sr)
-                    print(f"librosaによる総再生時間: {total_duration:.2f}秒")
+                    logger.info(f"librosaによる総再生時間: {total_duration:.2f}秒")
                 except Exception as e:
-                    print(f"librosaでの読み込みにも失敗: {e}")
+                    logger.warning(f"librosaでの読み込みにも失敗: {e}")
                     
                     # ffprobeを使用した代替法
                     try:
@@ -295,13 +583,13 @@ class SilenceDetector:
                                 # 全体の長さを使用
                                 total_duration = float(probe.get('format', {}).get('duration', 0))
                         
-                        print(f"ffprobeによる総再生時間: {total_duration:.2f}秒")
+                        logger.info(f"ffprobeによる総再生時間: {total_duration:.2f}秒")
                     except Exception as e:
-                        print(f"ffprobeでの取得にも失敗: {e}")
+                        logger.warning(f"ffprobeでの取得にも失敗: {e}")
                         # 何も情報が得られない場合は適当な値を設定（後で検出）
                         total_duration = 0
         except Exception as e:
-            print(f"総再生時間の取得中に予期しないエラーが発生しました: {e}")
+            logger.warning(f"総再生時間の取得中に予期しないエラーが発生しました: {e}")
             total_duration = 0
         
         # 音声から無音でない区間（音声がある区間）を取得
@@ -309,31 +597,106 @@ class SilenceDetector:
         
         # 結果がない場合の処理
         if not non_silent_segments and total_duration > 0:
-            print("有効なセグメントが検出されなかったため、全体を1つのセグメントとして使用します")
+            logger.info("有効なセグメントが検出されなかったため、全体を1つのセグメントとして使用します")
             non_silent_segments = [(0, total_duration)]
         
         # セグメント情報をJSON形式で保存
         if save_segments:
-            filename = Path(video_path).stem
-            segments_json = []
-            
-            for i, (start, end) in enumerate(non_silent_segments):
-                segments_json.append({
-                    "index": i,
-                    "start": start,
-                    "end": end,
-                    "duration": end - start
-                })
-            
-            segments_path = os.path.join(output_dir, f"{filename}_segments.json")
-            with open(segments_path, "w") as f:
-                json.dump(segments_json, f, indent=2)
-            
-            print(f"セグメント情報を保存しました: {segments_path}")
+            self.save_segments(video_path, non_silent_segments, output_dir)
         
         # 音声がある区間のリストを返す
         return non_silent_segments
     
+    def analyze_video_parallel(self, video_path, n_workers=None, output_dir="temp", save_segments=True):
+        """
+        無音区間の検出を複数プロセスで並列実行し、音声がある区間を返す
+
+        キャッシュしたWAVを各プロセスでメモリマップし、min_silence_len分重ねたチャンクごとに
+        検出した無音区間を結合する
+
+        Args:
+            video_path (str): 動画ファイルのパス
+            n_workers (int, optional): プロセス数（省略時はCPUコア数）
+            output_dir (str): セグメント情報の保存先
+            save_segments (bool): セグメント情報をJSONに保存するか
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        n_workers = n_workers or os.cpu_count() or 1
+
+        audio_path = get_pcm_path(video_path)
+        layout = read_wav_layout(audio_path)
+        data_offset, n_samples, channels, frame_rate, sample_width = layout
+        if sample_width not in _SAMPLE_DTYPES:
+            logger.info(f"未対応のサンプル幅のため通常の検出を行います: {sample_width * 8}bit")
+            return self.analyze_video(video_path, output_dir, save_segments)
+
+        total_ms = n_samples // channels * 1000 // frame_rate
+        total_duration = total_ms / 1000
+        logger.info(f"総再生時間: {total_duration:.2f}秒")
+        logger.info(f"検出パラメータ: min_silence_len={self.min_silence_len}ms, silence_thresh={self.silence_thresh}dB (並列数: {n_workers})")
+
+        # 通常版はnormalize()後に判定するため、ピーク基準のしきい値に換算する
+        peak = wav_peak(audio_path, layout)
+        thresh_amp = (10 ** ((self.silence_thresh + 0.1) / 20)) * peak
+
+        # チャンク境界をまたぐ無音を検出できるよう、各チャンクをmin_silence_len分延長する
+        chunk_ms = -(-total_ms // n_workers)
+        chunks = [
+            (start_ms, min(total_ms, start_ms + chunk_ms + self.min_silence_len))
+            for start_ms in range(0, total_ms, max(chunk_ms, 1))
+        ]
+
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            futures = [
+                executor.submit(_detect_chunk, audio_path, layout, start_ms, end_ms,
+                                self.min_silence_len, thresh_amp)
+                for start_ms, end_ms in chunks
+            ]
+            silent_ranges = sorted(r for future in futures for r in future.result())
+
+        # 重なる・接する無音区間を結合
+        merged = []
+        for start, end in silent_ranges:
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+
+        silent_segments = [(start / 1000, end / 1000) for start, end in merged]
+        logger.info(f"検出された無音区間: {len(silent_segments)}個")
+
+        non_silent_segments = self.invert_silent_segments(silent_segments, total_duration)
+
+        if save_segments:
+            self.save_segments(video_path, non_silent_segments, output_dir)
+
+        return non_silent_segments
+    
+    def save_segments(self, video_path, segments, output_dir="temp", name=None):
+        """
+        音声がある区間をJSON形式で保存
+
+        Args:
+            name (str, optional): ファイル名（<name>_segments.json）に使う名前（省略時は動画ファイル名）
+        """
+        filename = name or Path(video_path).stem
+        segments_json = []
+        
+        for i, (start, end) in enumerate(segments):
+            segments_json.append({
+                "index": i,
+                "start": start,
+                "end": end,
+                "duration": end - start
+            })
+        
+        segments_path = os.path.join(output_dir, f"{filename}_segments.json")
+        with open(segments_path, "w") as f:
+            json.dump(segments_json, f, indent=2)
+        
+        logger.info(f"セグメント情報を保存しました: {segments_path}")
+        return segments_path
+    
     def adjust_silence_detection(self, min_silence_len=None, silence_thresh=None, keep_silence=None):
         """無音検出のパラメータを調整"""
         if min_silence_len is not None:
@@ -343,11 +706,13 @@ class SilenceDetector:
         if keep_silence is not None:
             self.keep_silence = keep_silence
         
-        print(f"無音検出パラメータを調整しました: min_silence_len={self.min_silence_len}ms, silence_thresh={self.silence_thresh}dB, keep_silence={self.keep_silence}ms")
+        logger.info(f"無音検出パラメータを調整しました: min_silence_len={self.min_silence_len}ms, silence_thresh={self.silence_thresh}dB, keep_silence={self.keep_silence}ms")
 
 # テスト用コード
 if __name__ == "__main__":
     import sys
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     
     if len(sys.argv) < 2:
         print("使用方法: python silence_detector.py <動画ファイルパス> [min_silence_len] [silence_thresh]")
@@ -0,0 +1,133 @@
+"""
+高速無音検出モジュール：音声をmin_silence_lenの1/4ごとのフレームに分け、フレーム単位のRMSで無音区間を判定
+1ミリ秒ずつ窓をずらすSilenceDetectorより粗いが、長尺の音声でも一定のメモリで一括計算できる
+"""
+import numpy as np
+import soundfile as sf
+
+# 一度に読み込む音声の長さ（秒）
+BLOCK_SECONDS = 30
+# しきい値の自動判定に使うヒストグラムのビン数
+HISTOGRAM_BINS = 128
+# しきい値の自動判定で1つ目の極大値（無音側）に置く重み
+THRESHOLD_WEIGHT = 5
+# ヒストグラムを作る際の音量の下限（dB）。デジタル無音がビンの幅を広げすぎないようにする
+MIN_DB = -100
+
+
+def histogram_threshold(values, bins=HISTOGRAM_BINS, weight=THRESHOLD_WEIGHT):
+    """
+    特徴量のヒストグラムから無音と音声を分けるしきい値を求める
+
+    ヒストグラムの1つ目・2つ目の極大値をM1・M2として T = (W*M1 + M2) / (W + 1) とする
+    （Giannakopoulosのエネルギー・スペクトル重心による無音除去と同じ方法）
+
+    Returns:
+        float: しきい値（極大値が2つ見つからない場合はNone）
+    """
+    hist, bin_edges = np.histogram(values, bins=bins)
+    # 細かい凹凸を極大値として拾わないよう移動平均でならす
+    hist = np.convolve(hist, np.ones(5) / 5, mode='same')
+    maxima = np.flatnonzero((hist[1:-1] > hist[:-2]) & (hist[1:-1] >= hist[2:])) + 1
+    if len(maxima) < 2:
+        return None
+
+    centers = (bin_edges[:-1] + bin_edges[1:]) / 2
+    m1, m2 = centers[maxima[0]], centers[maxima[1]]
+    return float((weight * m1 + m2) / (weight + 1))
+
+
+def detect_silence_np(path, min_silence_len=500, silence_thresh=-40, keep_silence=100, auto_threshold=False):
+    """
+    音声ファイルから音声がある区間を検出
+
+    しきい値はSilenceDetectorと同様にピーク（ノーマライズ後の最大振幅）を基準としたdBで判定する
+
+    Args:
+        path (str): 音声ファイルのパス（soundfileで読み込める形式）
+        min_silence_len (int): 無音と判定する最小の長さ（ミリ秒）
+        silence_thresh (int): 無音と判定する音量のしきい値（dB）
+        keep_silence (int): 無音区間の前後に残す無音の長さ（ミリ秒）
+        auto_threshold (bool): Trueの場合、音量とスペクトル重心のしきい値をヒストグラムから自動で決める
+            （音量のしきい値が決まらない場合はsilence_threshを使用）
+
+    Returns:
+        list: 音声がある区間のリスト [(start, end), ...]（秒）
+    """
+    info = sf.info(path)
+    frame_rate = info.samplerate
+    total_duration = info.frames / frame_rate
+
+    # min_silence_lenの1/4ごとのフレームに分けてRMSを計算
+    step_ms = max(1, min_silence_len // 4)
+    frame_len = max(1, frame_rate * step_ms // 1000)
+    if info.frames < frame_len:
+        return [(0.0, total_duration)] if total_duration > 0 else []
+
+    # 約30秒ずつフレーム境界に揃えたブロックで読み込み、フレームごとの二乗和とピークだけを残す
+    # （ファイル全体をメモリに読み込まない。末尾のフレームに満たないサンプルは従来通り無視する）
+    block_len = frame_len * max(1, frame_rate * BLOCK_SECONDS // frame_len)
+    sums = []
+    centroids = []
+    peak = 0.0
+    for block in sf.blocks(path, blocksize=block_len, dtype='int16', always_2d=False):
+        if block.ndim > 1:
+            # ステレオの場合はモノラルにミックス
+            block = block.mean(axis=1, dtype=np.float32)
+        n = len(block) // frame_len
+        if n == 0:
+            continue
+        # int16のままeinsumに渡し、float64で累積する（ブロック全体のfloat32コピーを作らない）
+        frames = block[:n * frame_len].reshape(n, frame_len)
+        sums.append(np.einsum('ij,ij->i', frames, frames, dtype=np.float64))
+        # ピークも絶対値の一時配列を作らず最大・最小値から求める（int16の-32768もfloatに変換してから符号反転）
+        peak = max(peak, float(frames.max()), -float(frames.min()))
+        if auto_threshold:
+            # フレームごとのスペクトル重心（0〜1に正規化）
+            spectrum = np.abs(np.fft.rfft(frames, axis=1))
+            weights = np.arange(1, spectrum.shape[1] + 1)
+            total = spectrum.sum(axis=1)
+            centroids.append(np.divide(spectrum @ weights, total * spectrum.shape[1],
+                                       out=np.zeros(n), where=total > 0))
+
+    if peak == 0:
+        return []
+    rms = np.sqrt(np.concatenate(sums) / frame_len)
+    db = 20 * np.log10(rms / peak + 1e-9)
+
+    silent = db < silence_thresh
+    if auto_threshold:
+        # 音量・スペクトル重心のどちらかがしきい値を下回るフレームを無音とする
+        energy_thresh = histogram_threshold(np.maximum(db, MIN_DB))
+        if energy_thresh is not None:
+            silent = db < energy_thresh
+        centroid = np.concatenate(centroids)
+        centroid_thresh = histogram_threshold(centroid)
+        if centroid_thresh is not None:
+            silent |= centroid < centroid_thresh
+
+    # 無音フレームが連続する範囲を取り出し、min_silence_len以上のものだけを残す
+    edges = np.diff(silent.view(np.int8), prepend=0, append=0)
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+    long_enough = (run_ends - run_starts) * step_ms >= min_silence_len
+    silence_starts = run_starts[long_enough] * step_ms / 1000
+    silence_ends = np.minimum(run_ends[long_enough] * step_ms / 1000, total_duration)
+
+    # 無音区間の間を音声がある区間とする
+    starts = np.concatenate(([0.0], silence_ends))
+    ends = np.concatenate((silence_starts, [total_duration]))
+    voiced = ends > starts
+    starts, ends = starts[voiced], ends[voiced]
+    if len(starts) == 0:
+        return []
+
+    # 前後にkeep_silence分の余白を追加し、重なった区間を結合
+    margin = keep_silence / 1000
+    starts = np.maximum(starts - margin, 0)
+    ends = np.minimum(ends + margin, total_duration)
+    separate = starts[1:] > ends[:-1]
+    starts = np.concatenate((starts[:1], starts[1:][separate]))
+    ends = np.concatenate((ends[:-1][separate], ends[-1:]))
+
+    return list(zip(starts.tolist(), ends.tolist()))
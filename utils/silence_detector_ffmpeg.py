@@ -0,0 +1,297 @@
+"""
+無音区間検出モジュール（FFmpeg版）：ffmpegのsilencedetectフィルタで無音区間を検出
+デコード済みPCMをPythonに読み込まないため、長尺動画でもpydub版より大幅に高速
+"""
+import logging
+import math
+import os
+import re
+import shutil
+import subprocess
+
+from utils.audio_cache import decode_input_args, get_pcm_path
+from utils.silence_detector import SilenceDetector, read_wav_layout, wav_peak
+
+logger = logging.getLogger(__name__)
+
+# Falseにすると従来のpydub実装で検出する
+USE_FFMPEG = True
+
+# silencedetectの出力行（例: "[silencedetect @ 0x...] silence_end: 12.34 | silence_duration: 1.5"）
+_SILENCE_RE = re.compile(r"silence_(start|end): (-?[\d.]+)")
+# 入力ファイルの総再生時間（例: "  Duration: 00:12:26.68, start: 0.000000, bitrate: ..."）
+_DURATION_RE = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+# volumedetectの出力行（例: "[Parsed_volumedetect_0 @ 0x...] max_volume: -3.2 dB"）
+_MAX_VOLUME_RE = re.compile(r"max_volume: (-?[\d.]+|-inf) dB")
+# -progressの出力行（out_time_msは名前に反してマイクロ秒単位）
+_PROGRESS_RE = re.compile(r"^out_time_ms=(\d+)")
+
+
+class FFmpegSilenceDetector(SilenceDetector):
+    """ffmpegのsilencedetectフィルタを使用する無音区間検出クラス"""
+
+    def __init__(self, min_silence_len=500, silence_thresh=-40, keep_silence=100,
+                 on_segment=None, on_progress=None, cache_dir=None):
+        """
+        Args:
+            on_segment (callable, optional): 無音区間を検出するたびに呼ばれる関数 on_segment(start, end)
+            on_progress (callable, optional): 進捗率（0〜100）を受け取る関数 on_progress(percent)
+            cache_dir (str, optional): 検出結果のキャッシュ先（Noneの場合はキャッシュしない）
+        """
+        super().__init__(min_silence_len, silence_thresh, keep_silence, cache_dir)
+        self.on_segment = on_segment
+        self.on_progress = on_progress
+
+    def measure_peak_db(self, input_path):
+        """
+        入力音声のピーク（dBFS）を測定
+
+        16bit・32bitのWAVはメモリマップで直接、それ以外はffmpegのvolumedetectで測定する
+
+        Returns:
+            float: ピーク（dBFS、完全な無音の場合はNone）
+        """
+        try:
+            layout = read_wav_layout(input_path)
+        except (OSError, ValueError):
+            layout = None
+
+        if layout and layout[4] in (2, 4):
+            peak = wav_peak(input_path, layout)
+            return 20 * math.log10(peak / 2 ** (layout[4] * 8 - 1)) if peak else None
+
+        cmd = ["ffmpeg", "-hide_banner", "-nostats"] + decode_input_args() + [
+            "-i", input_path,
+            "-vn", "-map", "0:a:0",
+            "-af", "volumedetect",
+            "-f", "null", "-"
+        ]
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                text=True, errors="replace")
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpegの実行に失敗しました (終了コード: {result.returncode})")
+
+        match = _MAX_VOLUME_RE.search(result.stderr)
+        if not match:
+            raise RuntimeError("ffmpegの出力からピーク音量を取得できませんでした")
+        return None if match.group(1) == "-inf" else float(match.group(1))
+
+    def noise_threshold_db(self, input_path):
+        """
+        silencedetectに渡すしきい値（dBFS）を取得
+
+        SilenceDetectorはnormalize()でピークを-0.1dBFSに揃えてから判定するため、
+        silence_threshをピーク基準として絶対値に換算する
+        """
+        peak_db = self.measure_peak_db(input_path)
+        if peak_db is None:
+            # normalize()は完全な無音をそのまま返すため、しきい値も換算しない
+            return self.silence_thresh
+        return self.silence_thresh + peak_db + 0.1
+
+    def build_command(self, input_path, noise_db):
+        """
+        silencedetect実行用のffmpegコマンドを構築
+
+        Args:
+            noise_db (float): 無音と判定する音量のしきい値（dBFS）
+        """
+        cmd = ["ffmpeg", "-hide_banner", "-nostats"]
+        if self.on_progress:
+            # 進捗情報もstderrに出力して同じストリームで解析する
+            cmd += ["-progress", "pipe:2"]
+        return cmd + decode_input_args() + [
+            "-i", input_path,
+            "-vn", "-map", "0:a:0",  # 映像のデコードを省略
+            "-af", f"silencedetect=noise={noise_db:.2f}dB:d={self.min_silence_len / 1000}",
+            "-c:a", "pcm_s16le",
+            "-f", "null", "-"
+        ]
+
+    def run_silencedetect(self, input_path):
+        """
+        ffmpegのsilencedetectを実行
+
+        Returns:
+            tuple: (無音区間のリスト [(start, end), ...], 総再生時間（秒、取得できない場合はNone）)
+        """
+        noise_db = self.noise_threshold_db(input_path)
+        logger.info(f"silencedetectのしきい値: {noise_db:.2f}dBFS（ピーク基準 {self.silence_thresh}dB）")
+        cmd = self.build_command(input_path, noise_db)
+
+        silent_segments = []
+        total_duration = None
+        silence_start = None
+
+        # stderrを出力されるそばから1行ずつ解析する（終了を待たずに通知できる）
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                bufsize=1, text=True, errors="replace")
+        for line in proc.stderr:
+            if total_duration is None:
+                match = _DURATION_RE.search(line)
+                if match:
+                    hours, minutes, seconds = match.groups()
+                    total_duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+                    continue
+
+            if self.on_progress and total_duration:
+                match = _PROGRESS_RE.match(line)
+                if match:
+                    percent = int(match.group(1)) / 1_000_000 / total_duration * 100
+                    self.on_progress(min(100, int(percent)))
+                    continue
+
+            match = _SILENCE_RE.search(line)
+            if not match:
+                continue
+
+            value = max(0.0, float(match.group(2)))
+            if match.group(1) == "start":
+                silence_start = value
+            elif silence_start is not None:
+                silent_segments.append((silence_start, value))
+                if self.on_segment:
+                    self.on_segment(silence_start, value)
+                silence_start = None
+
+        proc.wait()
+        if proc.returncode != 0:
+            raise RuntimeError(f"ffmpegの実行に失敗しました (終了コード: {proc.returncode})")
+
+        # 無音のまま終了した場合は末尾までを無音区間とする
+        if silence_start is not None and total_duration:
+            silent_segments.append((silence_start, total_duration))
+            if self.on_segment:
+                self.on_segment(silence_start, total_duration)
+
+        return silent_segments, total_duration
+
+    def detect_silent_segments(self, audio_path):
+        """音声ファイルから無音区間を検出"""
+        if not USE_FFMPEG:
+            return super().detect_silent_segments(audio_path)
+
+        logger.info(f"無音区間を検出中（ffmpeg silencedetect）: {audio_path}")
+        try:
+            silent_segments, _ = self.run_silencedetect(audio_path)
+        except Exception as e:
+            logger.warning(f"ffmpegでの無音区間検出中にエラーが発生しました: {e}")
+            logger.info("pydubでの検出に切り替えます...")
+            return super().detect_silent_segments(audio_path)
+
+        logger.info(f"検出された無音区間: {len(silent_segments)}個")
+        return silent_segments
+
+    def get_non_silent_segments(self, audio_path, total_duration=None):
+        """無音でない区間（音声がある区間）を取得"""
+        if not USE_FFMPEG:
+            return super().get_non_silent_segments(audio_path, total_duration)
+
+        cached = self.load_cached_segments(audio_path, total_duration)
+        if cached is not None:
+            return cached
+        requested_duration = total_duration
+
+        logger.info(f"無音区間を検出中（ffmpeg silencedetect）: {audio_path}")
+        try:
+            silent_segments, detected_duration = self.run_silencedetect(audio_path)
+        except Exception as e:
+            logger.warning(f"ffmpegでの無音区間検出中にエラーが発生しました: {e}")
+            logger.info("pydubでの検出に切り替えます...")
+            # 余白の追加とキャッシュはffmpeg版と同じく行う
+            silent_segments = super().detect_silent_segments(audio_path)
+            detected_duration = self.get_audio_duration(audio_path) if total_duration is None else None
+
+        if total_duration is None:
+            total_duration = detected_duration or 0
+
+        logger.info(f"検出パラメータ: min_silence_len={self.min_silence_len}ms, silence_thresh={self.silence_thresh}dB, keep_silence={self.keep_silence}ms")
+        logger.info(f"検出された無音区間: {len(silent_segments)}個")
+
+        non_silent_segments = self.invert_silent_segments(silent_segments, total_duration)
+        non_silent_segments = self.apply_keep_silence(non_silent_segments, total_duration)
+
+        self.save_cached_segments(audio_path, requested_duration, non_silent_segments)
+        return non_silent_segments
+
+    def apply_keep_silence(self, segments, total_duration):
+        """
+        音声がある区間の前後にkeep_silence分の余白を追加（重なった区間は結合）
+
+        pydub版のSilenceDetectorはkeep_silenceを区間に反映しないため、余白の追加はffmpeg版のみで行う
+        """
+        margin = self.keep_silence / 1000
+        if margin <= 0 or not segments:
+            return segments
+
+        padded = []
+        for start, end in segments:
+            start = max(0, start - margin)
+            end = min(total_duration, end + margin) if total_duration else end + margin
+
+            if padded and start <= padded[-1][1]:
+                padded[-1] = (padded[-1][0], max(padded[-1][1], end))
+            else:
+                padded.append((start, end))
+
+        return padded
+
+    def analyze_video(self, video_path, output_dir="temp", save_segments=True):
+        """動画ファイルの無音区間を分析し、音声がある区間を返す"""
+        if not USE_FFMPEG:
+            return super().analyze_video(video_path, output_dir, save_segments)
+
+        os.makedirs(output_dir, exist_ok=True)
+
+        # キャッシュ済みのWAVがあれば動画の代わりに使用（動画のデコードを省略）
+        try:
+            audio_path = get_pcm_path(video_path)
+        except Exception as e:
+            logger.warning(f"音声キャッシュの作成に失敗: {e}")
+            audio_path = video_path
+
+        non_silent_segments = self.get_non_silent_segments(audio_path)
+
+        if save_segments:
+            self.save_segments(video_path, non_silent_segments, output_dir)
+
+        return non_silent_segments
+
+
+def create_silence_detector(min_silence_len=500, silence_thresh=-40, keep_silence=100, cache_dir=None,
+                            use_ffmpeg=False):
+    """
+    無音区間検出器を作成
+
+    通常はpydub版のSilenceDetectorを返す。use_ffmpeg=Trueでffmpegがインストールされていれば
+    FFmpegSilenceDetectorを返す（silencedetectはRMSではなくサンプル単位で判定するため、
+    区間の境界がpydub版と数ミリ秒ずれることがある。また、keep_silenceによる余白はffmpeg版のみで追加する）
+    """
+    if use_ffmpeg and USE_FFMPEG:
+        if shutil.which("ffmpeg"):
+            return FFmpegSilenceDetector(min_silence_len, silence_thresh, keep_silence, cache_dir=cache_dir)
+        logger.info("ffmpegが見つからないため、pydubで無音区間を検出します")
+
+    return SilenceDetector(min_silence_len, silence_thresh, keep_silence, cache_dir=cache_dir)
+
+
+# テスト用コード
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if len(sys.argv) < 2:
+        print("使用方法: python silence_detector_ffmpeg.py <動画ファイルパス> [min_silence_len] [silence_thresh]")
+        sys.exit(1)
+
+    video_path = sys.argv[1]
+    min_silence_len = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    silence_thresh = int(sys.argv[3]) if len(sys.argv) > 3 else -40
+
+    detector = FFmpegSilenceDetector(min_silence_len=min_silence_len, silence_thresh=silence_thresh)
+    non_silent_segments = detector.analyze_video(video_path)
+
+    print("音声がある区間:")
+    for i, (start, end) in enumerate(non_silent_segments):
+        print(f"  区間 {i+1}: {start:.2f}秒 - {end:.2f}秒 (長さ: {end-start:.2f}秒)")
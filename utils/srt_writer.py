@@ -0,0 +1,86 @@
+"""
+SRT出力モジュール：キャプションのリストからSRT字幕ファイルを生成
+"""
+from functools import lru_cache
+
+
+def seconds_to_srt_time(seconds):
+    """
+    秒数をSRTタイムコード形式に変換
+    例: 1.5 -> "00:00:01,500"
+    """
+    return _format_srt_millis(int(round(seconds * 1000)))
+
+
+@lru_cache(maxsize=4096)
+def _format_srt_millis(total_millis):
+    """ミリ秒（整数）をSRTタイムコード形式に変換"""
+    secs, millis = divmod(total_millis, 1000)
+    minutes, secs = divmod(secs, 60)
+    hours, minutes = divmod(minutes, 60)
+
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+
+def seconds_to_srt_times(seconds):
+    """
+    秒数の配列をまとめてSRTタイムコード形式に変換（時・分・秒・ミリ秒をNumPyで一括計算）
+
+    Args:
+        seconds: 秒数のリスト
+
+    Returns:
+        list: SRTタイムコードのリスト
+    """
+    # SRT出力時のみ使用するため、ここでインポート（main.pyなどの起動を重くしない）
+    import numpy as np
+
+    millis = np.rint(np.asarray(seconds, dtype=np.float64) * 1000).astype(np.int64)
+    hours, millis = np.divmod(millis, 3_600_000)
+    minutes, millis = np.divmod(millis, 60_000)
+    secs, millis = np.divmod(millis, 1000)
+
+    return [
+        f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
+        for h, m, s, ms in zip(hours.tolist(), minutes.tolist(), secs.tolist(), millis.tolist())
+    ]
+
+
+def srt_content(captions):
+    """
+    キャプションのリストからSRT形式のテキストを生成
+
+    Args:
+        captions: キャプションのリスト（各要素は start, end, text を持つ辞書）
+
+    Returns:
+        str: SRT形式のテキスト
+    """
+    # タイムコードを一括で変換し、全体を1つの文字列にまとめる
+    start_times = seconds_to_srt_times([caption.get("start", 0) for caption in captions])
+    end_times = seconds_to_srt_times([caption.get("end", 0) for caption in captions])
+
+    return "".join(
+        f"{i}\n{start_time} --> {end_time}\n{caption.get('text', '')}\n\n"
+        for i, (caption, start_time, end_time) in enumerate(zip(captions, start_times, end_times), 1)
+    )
+
+
+def write_srt(captions, output_path):
+    """
+    キャプションのリストからSRTファイルを生成
+
+    Args:
+        captions: キャプションのリスト（各要素は start, end, text を持つ辞書）
+        output_path: 出力SRTファイルパス
+
+    Returns:
+        出力SRTファイルパス
+    """
+    # ファイル全体を1回で書き込む
+    content = srt_content(captions)
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+    return output_path
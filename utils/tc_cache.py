@@ -0,0 +1,88 @@
+"""
+Timecode cache for EDL generators
+Memoizes frame count -> SMPTE timecode conversion per (fps, drop_frame)
+"""
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=65536)
+def frames_to_timecode(total_frames: int, fps: float, drop_frame: bool) -> str:
+    """Convert a frame count to SMPTE timecode (cached)"""
+    if drop_frame and fps > 29:
+        # Drop frame calculation for 29.97 fps
+        # Drop 2 frames every minute except every 10th minute
+        frames_per_10min = int(10 * 60 * fps) - 18  # 18 frames dropped
+
+        d = total_frames // frames_per_10min
+        m = total_frames % frames_per_10min
+
+        if m > 1:
+            total_frames += 18 * d + 2 * ((m - 2) // (60 * int(fps) - 2))
+        else:
+            total_frames += 18 * d
+
+    # Calculate time components
+    hours = int(total_frames // (3600 * fps))
+    minutes = int((total_frames % (3600 * fps)) // (60 * fps))
+    seconds_tc = int((total_frames % (60 * fps)) // fps)
+    frames = int(total_frames % fps)
+
+    # Format with appropriate separator
+    separator = ';' if drop_frame else ':'
+    return f"{hours:02d}:{minutes:02d}:{seconds_tc:02d}{separator}{frames:02d}"
+
+
+def seconds_to_timecode(seconds: float, fps: float, drop_frame: bool = False) -> str:
+    """Convert seconds to SMPTE timecode"""
+    # Handle negative values
+    if seconds < 0:
+        return "00:00:00:00"
+
+    return frames_to_timecode(int(seconds * fps), fps, drop_frame)
+
+
+def record_times(starts, ends):
+    """
+    Compute timeline (record) in/out seconds for back-to-back segments
+
+    Returns:
+        tuple: (rec_in, rec_out) float64 arrays
+    """
+    import numpy as np
+
+    durations = np.asarray(ends, dtype=np.float64) - np.asarray(starts, dtype=np.float64)
+    rec_out = np.cumsum(durations)
+    rec_in = np.concatenate(([0.0], rec_out[:-1]))
+    return rec_in, rec_out
+
+
+def seconds_to_timecodes(seconds, fps: float, drop_frame: bool = False) -> list:
+    """Convert an array of seconds to SMPTE timecodes in one NumPy pass (same result as seconds_to_timecode)"""
+    import numpy as np
+
+    seconds = np.asarray(seconds, dtype=np.float64)
+    negative = seconds < 0
+    total_frames = np.where(negative, 0, seconds * fps).astype(np.int64)
+
+    if drop_frame and fps > 29:
+        # Drop 2 frames every minute except every 10th minute
+        frames_per_10min = int(10 * 60 * fps) - 18
+        d, m = np.divmod(total_frames, frames_per_10min)
+        skipped = np.where(m > 1, 2 * ((m - 2) // (60 * int(fps) - 2)), 0)
+        total_frames = total_frames + 18 * d + skipped
+
+    hours = np.floor_divide(total_frames, 3600 * fps).astype(np.int64)
+    minutes = np.floor_divide(np.mod(total_frames, 3600 * fps), 60 * fps).astype(np.int64)
+    seconds_tc = np.floor_divide(np.mod(total_frames, 60 * fps), fps).astype(np.int64)
+    frames = np.mod(total_frames, fps).astype(np.int64)
+
+    separator = ';' if drop_frame else ':'
+    timecodes = [
+        f"{h:02d}:{m:02d}:{s:02d}{separator}{f:02d}"
+        for h, m, s, f in zip(hours.tolist(), minutes.tolist(), seconds_tc.tolist(), frames.tolist())
+    ]
+    # Negative values map to zero timecode like seconds_to_timecode
+    for i in np.flatnonzero(negative).tolist():
+        timecodes[i] = "00:00:00:00"
+    return timecodes
@@ -5,7 +5,9 @@ import os
 import json
 import requests
 from pathlib import Path
-import sys
+import logging
+
+logger = logging.getLogger(__name__)
 
 class Transcriber:
     def __init__(self, api_key, api_endpoint, model):
@@ -23,7 +25,7 @@ class Transcriber:
         Returns:
             dict: 文字起こし結果（テキスト、単語ごとのタイムスタンプなど）
         """
-        print(f"文字起こしを開始します: {audio_path}")
+        logger.info(f"文字起こしを開始します: {audio_path}")
         
         # 音声ファイルが存在するか確認
         if not os.path.exists(audio_path):
@@ -59,7 +61,7 @@ class Transcriber:
                 
                 # レスポンスを確認
                 if response.status_code != 200:
-                    print(f"API エラー ({response.status_code}): {response.text}", file=sys.stderr)
+                    logger.error(f"API エラー ({response.status_code}): {response.text}")
                     raise Exception(f"Whisper API エラー: {response.text}")
                 
                 # JSON形式の結果を取得
@@ -72,9 +74,9 @@ class Transcriber:
                 with open(transcript_path, "w", encoding="utf-8") as f:
                     json.dump(result, f, ensure_ascii=False, indent=2)
                 
-                print(f"文字起こしが完了しました。結果を保存しました: {transcript_path}")
+                logger.info(f"文字起こしが完了しました。結果を保存しました: {transcript_path}")
                 return result
                 
         except Exception as e:
-            print(f"文字起こしエラー: {str(e)}", file=sys.stderr)
+            logger.error(f"文字起こしエラー: {str(e)}")
             raise
@@ -2,17 +2,41 @@
 文字起こしモジュール：OpenAI Whisper APIを使って音声からテキストとタイムスタンプを取得
 改良版：単語レベルのタイムスタンプ対応
 """
+import logging
 import os
 import json
+import subprocess
+import tempfile
+import wave
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import sys
+
+from utils.rate_limiter import post_with_retry
+from utils.transcript_cache import TranscriptCache
+
+logger = logging.getLogger(__name__)
+
+# 分割して文字起こしする場合の1チャンクの長さ（秒）
+# 16kHz・モノラル・16bitのWAVで約19MBとなり、Whisper APIの25MBの上限に収まる
+CHUNK_SECONDS = 600
+# 同時に送るWhisper APIリクエストの最大数
+MAX_PARALLEL_REQUESTS = 5
+# アップロードするファイルの拡張子とMIMEタイプ
+UPLOAD_MIME_TYPES = {".ogg": "audio/ogg", ".wav": "audio/wav", ".mp3": "audio/mpeg", ".m4a": "audio/mp4"}
 
 class ImprovedTranscriber:
-    def __init__(self, api_key, api_endpoint, model):
+    def __init__(self, api_key, api_endpoint, model, cache_dir=None):
+        """
+        Args:
+            cache_dir (str, optional): 文字起こし結果のキャッシュ先（Noneの場合はキャッシュしない）
+        """
         self.api_key = api_key
         self.api_endpoint = api_endpoint
         self.model = model
+        self.cache = TranscriptCache(cache_dir) if cache_dir else None
+        # 同じインスタンスからのリクエストではTLS接続を再利用する
+        self.session = requests.Session()
         
     def transcribe(self, audio_path):
         """
@@ -24,12 +48,99 @@ class ImprovedTranscriber:
         Returns:
             dict: 文字起こし結果（テキスト、単語ごとのタイムスタンプなど）
         """
-        print(f"文字起こしを開始します: {audio_path}")
+        logger.info(f"文字起こしを開始します: {audio_path}")
         
         # 音声ファイルが存在するか確認
         if not os.path.exists(audio_path):
             raise FileNotFoundError(f"音声ファイルが見つかりません: {audio_path}")
         
+        # 同じ音声の文字起こし結果があれば再利用
+        if self.cache:
+            cached = self.cache.load(audio_path, self.model)
+            if cached is not None:
+                return cached
+        
+        try:
+            with tempfile.TemporaryDirectory() as upload_dir:
+                # 16kHzモノラルのOpusに変換して送信（変換できない場合は元のファイルをそのまま送信）
+                upload_path = encode_for_upload(
+                    audio_path, os.path.join(upload_dir, f"{Path(audio_path).stem}.ogg")
+                ) or audio_path
+                result = self._request_transcription(upload_path)
+            transcript_path = self._save_result(audio_path, result)
+            logger.info(f"文字起こしが完了しました（単語タイムスタンプ付き）: {transcript_path}")
+            return result
+                
+        except Exception as e:
+            logger.error(f"文字起こしエラー: {str(e)}")
+            raise
+    
+    def transcribe_in_chunks(self, audio_path, speech_segments, chunk_seconds=CHUNK_SECONDS,
+                             max_workers=MAX_PARALLEL_REQUESTS):
+        """
+        長い音声を無音の位置で分割し、Whisper APIへ並列にリクエストして文字起こし
+        
+        各チャンクの単語・セグメントのタイムスタンプは元の音声の時刻に戻して結合する
+        
+        Args:
+            audio_path (str): 音声ファイルのパス（WAV）
+            speech_segments (list): 音声がある区間のリスト [(start, end), ...]（秒）
+            chunk_seconds (int): 1チャンクの目安の長さ（秒）
+            max_workers (int): 同時に送るリクエストの最大数
+            
+        Returns:
+            dict: 文字起こし結果（transcribeと同じ形式）
+        """
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f"音声ファイルが見つかりません: {audio_path}")
+        
+        with wave.open(audio_path, "rb") as wav:
+            total_duration = wav.getnframes() / wav.getframerate()
+        
+        split_points = pick_split_points(speech_segments, total_duration, chunk_seconds)
+        if not split_points:
+            # 分割する必要がない長さであれば通常どおり1回で送信
+            return self.transcribe(audio_path)
+        
+        if self.cache:
+            cached = self.cache.load(audio_path, self.model)
+            if cached is not None:
+                return cached
+        
+        bounds = list(zip([0.0] + split_points, split_points + [total_duration]))
+        logger.info(f"文字起こしを開始します（{len(bounds)}個に分割して並列実行）: {audio_path}")
+        
+        try:
+            with tempfile.TemporaryDirectory() as chunk_dir:
+                # チャンクを切り出しながらOpusに変換（変換できない場合は再エンコードせずにWAVを切り出す）
+                chunk_paths = []
+                for i, (start, end) in enumerate(bounds):
+                    chunk_stem = os.path.join(chunk_dir, f"{Path(audio_path).stem}_chunk_{i}")
+                    chunk_path = encode_for_upload(audio_path, f"{chunk_stem}.ogg", start, end)
+                    if chunk_path is None:
+                        chunk_path = f"{chunk_stem}.wav"
+                        subprocess.run(
+                            ['ffmpeg', '-y', '-ss', f"{start:.3f}", '-to', f"{end:.3f}",
+                             '-i', audio_path, '-c', 'copy', chunk_path],
+                            check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+                        )
+                    chunk_paths.append(chunk_path)
+                
+                # 同時リクエスト数をmax_workersに制限して並列に送信（結果はチャンクの順に並ぶ）
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    results = list(executor.map(self._request_transcription, chunk_paths))
+            
+            result = merge_chunk_results(results, [start for start, _ in bounds], total_duration)
+            transcript_path = self._save_result(audio_path, result)
+            logger.info(f"文字起こしが完了しました（単語タイムスタンプ付き）: {transcript_path}")
+            return result
+        
+        except Exception as e:
+            logger.error(f"文字起こしエラー: {str(e)}")
+            raise
+    
+    def _request_transcription(self, audio_path):
+        """音声ファイル1つをWhisper APIに送信し、verbose_json形式の結果を取得"""
         # APIリクエストのヘッダー
         headers = {
             "Authorization": f"Bearer {self.api_key}"
@@ -43,40 +154,129 @@ class ImprovedTranscriber:
             "language": "ja"
         }
         
-        try:
-            # 音声ファイルをオープン
-            with open(audio_path, "rb") as audio_file:
-                # マルチパートフォームデータを作成
-                files = {
-                    "file": (Path(audio_path).name, audio_file, "audio/wav")
-                }
-                
-                # APIリクエストを送信
-                response = requests.post(
-                    self.api_endpoint,
-                    headers=headers,
-                    data=data,
-                    files=files
-                )
-                
-                # レスポンスを確認
-                if response.status_code != 200:
-                    print(f"API エラー ({response.status_code}): {response.text}", file=sys.stderr)
-                    raise Exception(f"Whisper API エラー: {response.text}")
-                
-                # JSON形式の結果を取得
-                result = response.json()
-                
-                # 結果を保存（デバッグ用）
-                output_dir = "temp"
-                os.makedirs(output_dir, exist_ok=True)
-                transcript_path = os.path.join(output_dir, f"{Path(audio_path).stem}_transcript_with_words.json")
-                with open(transcript_path, "w", encoding="utf-8") as f:
-                    json.dump(result, f, ensure_ascii=False, indent=2)
-                
-                print(f"文字起こしが完了しました（単語タイムスタンプ付き）: {transcript_path}")
-                return result
-                
-        except Exception as e:
-            print(f"文字起こしエラー: {str(e)}", file=sys.stderr)
-            raise
\ No newline at end of file
+        # 音声ファイルをオープン
+        with open(audio_path, "rb") as audio_file:
+            # マルチパートフォームデータを作成
+            files = {
+                "file": (Path(audio_path).name, audio_file, UPLOAD_MIME_TYPES.get(Path(audio_path).suffix.lower(), "audio/wav"))
+            }
+            
+            # APIリクエストを送信（レート制限を守り、429の場合は待ってから再送）
+            response = post_with_retry(
+                self.api_key,
+                self.api_endpoint,
+                headers=headers,
+                data=data,
+                files=files,
+                session=self.session
+            )
+        
+        # レスポンスを確認
+        if response.status_code != 200:
+            logger.error(f"API エラー ({response.status_code}): {response.text}")
+            raise Exception(f"Whisper API エラー: {response.text}")
+        
+        # JSON形式の結果を取得
+        return response.json()
+    
+    def _save_result(self, audio_path, result):
+        """文字起こし結果をデバッグ用に保存し、キャッシュにも登録"""
+        output_dir = "temp"
+        os.makedirs(output_dir, exist_ok=True)
+        transcript_path = os.path.join(output_dir, f"{Path(audio_path).stem}_transcript_with_words.json")
+        with open(transcript_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        
+        if self.cache:
+            self.cache.save(audio_path, self.model, result)
+        
+        return transcript_path
+
+
+def encode_for_upload(audio_path, output_path, start=None, end=None):
+    """
+    Whisper APIへの送信用に16kHzモノラルのOpus（Ogg）へ変換
+    
+    WhisperはAPI側で16kHzモノラルに変換するため、この形式で送っても精度は変わらず、
+    WAVの1/10程度のサイズになる
+    
+    Args:
+        audio_path (str): 元の音声ファイルのパス
+        output_path (str): 出力先（.ogg）
+        start, end (float, optional): 切り出す範囲（秒）
+        
+    Returns:
+        str: 出力先のパス（ffmpegが使えない・libopusがない場合はNone）
+    """
+    cmd = ['ffmpeg', '-y']
+    if start is not None:
+        cmd += ['-ss', f"{start:.3f}"]
+    if end is not None:
+        cmd += ['-to', f"{end:.3f}"]
+    cmd += ['-i', audio_path, '-vn', '-ac', '1', '-ar', '16000',
+            '-c:a', 'libopus', '-b:a', '24k', '-application', 'voip', output_path]
+    try:
+        subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        logger.warning(f"Opusへの変換に失敗したため、元の形式で送信します: {e}")
+        return None
+    return output_path
+
+
+def pick_split_points(speech_segments, total_duration, chunk_seconds=CHUNK_SECONDS):
+    """
+    chunk_secondsを超えない範囲で、できるだけ後ろにある無音の位置を分割位置として選ぶ
+    
+    Args:
+        speech_segments (list): 音声がある区間のリスト [(start, end), ...]（秒）
+        total_duration (float): 音声全体の長さ（秒）
+        chunk_seconds (int): 1チャンクの最大の長さ（秒）
+        
+    Returns:
+        list: 分割位置（秒）のリスト（分割不要の場合は空）
+    """
+    # 音声区間の間（無音区間）の中央を分割候補にする
+    gaps = [
+        (prev_end + next_start) / 2
+        for (_, prev_end), (next_start, _) in zip(speech_segments, speech_segments[1:])
+        if next_start > prev_end
+    ]
+    
+    split_points = []
+    last = 0.0
+    while total_duration - last > chunk_seconds:
+        limit = last + chunk_seconds
+        candidates = [gap for gap in gaps if last < gap <= limit]
+        # 範囲内に無音がなければ、やむを得ず上限の位置で分割する
+        last = max(candidates) if candidates else limit
+        split_points.append(last)
+    
+    return split_points
+
+
+def merge_chunk_results(results, offsets, total_duration):
+    """
+    チャンクごとの文字起こし結果を、タイムスタンプを元の音声の時刻に戻して1つに結合
+    
+    Args:
+        results (list): チャンクごとの文字起こし結果（verbose_json形式）
+        offsets (list): 各チャンクの開始位置（秒）
+        total_duration (float): 音声全体の長さ（秒）
+    """
+    segments = []
+    words = []
+    for result, offset in zip(results, offsets):
+        for segment in result.get("segments", []):
+            segments.append(dict(segment, id=len(segments),
+                                 start=segment["start"] + offset, end=segment["end"] + offset))
+        for word in result.get("words", []):
+            words.append(dict(word, start=word["start"] + offset, end=word["end"] + offset))
+    
+    return {
+        "task": "transcribe",
+        "language": results[0].get("language") if results else None,
+        "duration": total_duration,
+        "text": "".join(result.get("text", "") for result in results),
+        "segments": segments,
+        "words": words
+    }
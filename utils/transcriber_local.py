@@ -0,0 +1,129 @@
+"""
+文字起こしモジュール（ローカル版）：faster-whisper (CTranslate2) を使って音声からテキストとタイムスタンプを取得
+Whisper APIのverbose_json形式と同じ構造の結果を返すため、ImprovedTranscriberと置き換えて使用できる
+"""
+import logging
+import os
+import json
+import importlib.util
+from pathlib import Path
+
+from utils.transcript_cache import TranscriptCache
+
+logger = logging.getLogger(__name__)
+
+
+def is_faster_whisper_available():
+    """faster-whisperがインストールされているかを確認"""
+    return importlib.util.find_spec("faster_whisper") is not None
+
+
+class LocalFasterWhisperTranscriber:
+    def __init__(self, model_size="large-v3", device="auto", compute_type="auto", language="ja",
+                 vad_filter=True, min_silence_ms=1000, cache_dir=None):
+        """
+        Args:
+            model_size (str): Whisperのモデルサイズ（例: large-v3, medium, small）
+            device (str): 実行デバイス（auto, cpu, cuda）
+            compute_type (str): 量子化の種類（auto, int8, int8_float16, float16など）
+            language (str): 音声の言語
+            vad_filter (bool): Silero VADで無音区間を除外してからデコードするか
+            min_silence_ms (int): VADで無音と判定する最小の長さ（ミリ秒）
+            cache_dir (str, optional): 文字起こし結果のキャッシュ先（Noneの場合はキャッシュしない）
+        """
+        self.model = None
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type
+        self.language = language
+        self.vad_filter = vad_filter
+        self.min_silence_ms = min_silence_ms
+        self.cache = TranscriptCache(cache_dir) if cache_dir else None
+        # キャッシュのキー（結果に影響する設定を含める）
+        self.cache_key = f"faster-whisper-{model_size}-{language}" + (f"-vad{min_silence_ms}" if vad_filter else "")
+
+    def _load_model(self):
+        """Whisperモデルを読み込む（キャッシュが使える場合は読み込まない）"""
+        if self.model is None:
+            # faster-whisperはオプションの依存関係のため、使用時にのみインポート
+            from faster_whisper import WhisperModel
+
+            logger.info(f"faster-whisperモデルを読み込み中: {self.model_size} (device={self.device}, compute_type={self.compute_type})")
+            self.model = WhisperModel(self.model_size, device=self.device, compute_type=self.compute_type)
+        return self.model
+
+    def transcribe(self, audio_path):
+        """
+        音声ファイルをローカルのWhisperモデルで文字起こし（単語レベルのタイムスタンプ付き）
+
+        Args:
+            audio_path (str): 音声ファイルのパス
+
+        Returns:
+            dict: 文字起こし結果（Whisper APIのverbose_json形式）
+        """
+        logger.info(f"文字起こしを開始します（faster-whisper）: {audio_path}")
+
+        # 音声ファイルが存在するか確認
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f"音声ファイルが見つかりません: {audio_path}")
+
+        # 同じ音声の文字起こし結果があれば再利用
+        if self.cache:
+            cached = self.cache.load(audio_path, self.cache_key)
+            if cached is not None:
+                return cached
+
+        try:
+            # VADで除外した無音区間はfaster-whisper側で元の時間軸に戻されるため、
+            # 単語のタイムスタンプはそのまま元の音声の時刻として使える
+            segments_iter, info = self._load_model().transcribe(
+                audio_path,
+                language=self.language,
+                word_timestamps=True,
+                vad_filter=self.vad_filter,
+                vad_parameters={"min_silence_duration_ms": self.min_silence_ms} if self.vad_filter else None
+            )
+
+            # Whisper APIのverbose_json形式に変換
+            segments = []
+            words = []
+            for segment in segments_iter:
+                segments.append({
+                    "id": segment.id,
+                    "start": segment.start,
+                    "end": segment.end,
+                    "text": segment.text
+                })
+                for word in segment.words or []:
+                    words.append({
+                        "word": word.word.strip(),
+                        "start": word.start,
+                        "end": word.end
+                    })
+
+            result = {
+                "task": "transcribe",
+                "language": info.language,
+                "duration": info.duration,
+                "text": "".join(segment["text"] for segment in segments).strip(),
+                "segments": segments,
+                "words": words
+            }
+
+            # 結果を保存（デバッグ用）
+            output_dir = "temp"
+            os.makedirs(output_dir, exist_ok=True)
+            transcript_path = os.path.join(output_dir, f"{Path(audio_path).stem}_transcript_with_words.json")
+            with open(transcript_path, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+
+            if self.cache:
+                self.cache.save(audio_path, self.cache_key, result)
+
+            logger.info(f"文字起こしが完了しました（単語タイムスタンプ付き）: {transcript_path}")
+            return result
+
+        except Exception as e:
+            logger.error(f"文字起こしエラー: {str(e)}")
+            raise
@@ -0,0 +1,59 @@
+"""
+文字起こしキャッシュモジュール：音声ファイルをキーにWhisperの結果を保存・再利用
+"""
+import logging
+import os
+import json
+import tempfile
+
+from utils.cache_key import file_cache_key
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptCache:
+    """文字起こし結果のキャッシュ"""
+
+    def __init__(self, cache_dir):
+        """
+        Args:
+            cache_dir (str): キャッシュの保存先ディレクトリ
+        """
+        self.cache_dir = cache_dir
+
+    def _cache_path(self, audio_path, model):
+        """キャッシュファイルのパスを取得（音声の内容は読まず、パス・更新日時・サイズをキーにする）"""
+        return os.path.join(self.cache_dir, f"{file_cache_key(audio_path, model)}.json")
+
+    def load(self, audio_path, model):
+        """キャッシュ済みの文字起こし結果を取得（存在しない場合はNone）"""
+        cache_path = self._cache_path(audio_path, model)
+        if not os.path.exists(cache_path):
+            return None
+
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"文字起こしキャッシュの読み込みに失敗: {e}")
+            return None
+
+        logger.info(f"キャッシュ済みの文字起こし結果を使用します: {cache_path}")
+        return result
+
+    def save(self, audio_path, model, result):
+        """文字起こし結果をキャッシュに保存（書き込み途中のファイルを残さないよう一時ファイルから置き換える）"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        cache_path = self._cache_path(audio_path, model)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return cache_path
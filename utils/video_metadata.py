@@ -5,15 +5,69 @@ FFmpegを使用して動画の詳細情報を取得
 import json
 import subprocess
 import os
+from functools import lru_cache
 from typing import Dict, Tuple, Optional
 import re
 
+from utils.cache_key import file_cache_key
+
+
+@lru_cache(maxsize=64)
+def _ffprobe_cached(ffprobe_path: str, video_path: str, file_key: str) -> str:
+    """
+    ffprobeのJSON出力を取得（file_keyはパス・更新日時・サイズから作るキー）
+
+    同じプロセス内では、ファイルが変わらない限り複数のジェネレーターから呼ばれてもffprobeを1回だけ実行する
+    長時間動くStreamlitサーバーでもメモリが増え続けないよう、最近使った64件だけを保持する
+    """
+    cmd = [
+        ffprobe_path,
+        '-v', 'quiet',
+        '-print_format', 'json',
+        '-show_format',
+        '-show_streams',
+        video_path
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+def probe_audio_stream(video_path: str, ffprobe_path: str = "ffprobe") -> Optional[Dict]:
+    """
+    最初の音声ストリームのコーデック・サンプルレート・チャンネル数を取得（取得できない場合はNone）
+
+    ffprobeの結果はextract_metadataと共有するため、後でメタデータを取得してもffprobeは再実行されない
+    """
+    try:
+        stdout = _ffprobe_cached(ffprobe_path, video_path, file_cache_key(video_path))
+        streams = json.loads(stdout).get('streams', [])
+    except (OSError, subprocess.CalledProcessError, json.JSONDecodeError):
+        return None
+    
+    for stream in streams:
+        if stream.get('codec_type') == 'audio':
+            return {
+                'codec_name': stream.get('codec_name'),
+                'sample_rate': int(stream.get('sample_rate', 0)),
+                'channels': stream.get('channels', 0)
+            }
+    return None
+
 
 class VideoMetadataExtractor:
     """動画のメタデータを取得するクラス"""
     
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Args:
+            cache_dir: メタデータのキャッシュ先（Noneの場合はキャッシュしない）
+        """
         self.ffprobe_path = "ffprobe"  # ffprobeのパス
+        self.cache_dir = cache_dir
+        
+    def _cache_path(self, video_path: str) -> str:
+        """キャッシュファイルのパスを取得（パス・更新日時・サイズが変わると別のキーになる）"""
+        return os.path.join(self.cache_dir, f"{file_cache_key(video_path)}.json")
         
     def extract_metadata(self, video_path: str) -> Dict:
         """
@@ -27,23 +81,32 @@ class VideoMetadataExtractor:
         """
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"動画ファイルが見つかりません: {video_path}")
+        
+        # キャッシュ済みのメタデータがあれば使用
+        cache_path = None
+        if self.cache_dir:
+            cache_path = self._cache_path(video_path)
+            if os.path.exists(cache_path):
+                try:
+                    with open(cache_path, 'r', encoding='utf-8') as f:
+                        return json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    pass
             
         try:
-            # ffprobeコマンドを実行
-            cmd = [
-                self.ffprobe_path,
-                '-v', 'quiet',
-                '-print_format', 'json',
-                '-show_format',
-                '-show_streams',
-                video_path
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            metadata = json.loads(result.stdout)
+            # ffprobeコマンドを実行（このプロセスで取得済みであれば再利用）
+            stdout = _ffprobe_cached(self.ffprobe_path, video_path, file_cache_key(video_path))
+            metadata = json.loads(stdout)
             
             # 解析したメタデータを整形
-            return self._parse_metadata(metadata)
+            parsed = self._parse_metadata(metadata)
+            
+            if cache_path:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(cache_path, 'w', encoding='utf-8') as f:
+                    json.dump(parsed, f, ensure_ascii=False)
+            
+            return parsed
             
         except subprocess.CalledProcessError as e:
             raise RuntimeError(f"ffprobeの実行に失敗しました: {e}")
@@ -75,8 +138,12 @@ class VideoMetadataExtractor:
             
         # フレームレート情報を取得
         # avg_frame_rateを優先的に使用（より正確なため）
-        avg_fps = video_stream.get('avg_frame_rate', video_stream.get('r_frame_rate', '30/1'))
-        fps_info = self._parse_frame_rate(avg_fps)
+        # 平均を求められないストリームでは"0/0"になるため、その場合はr_frame_rateを使用
+        # どちらも無効な場合はValueErrorを呼び出し元に返す（30fpsとみなすとタイムコードがずれるため）
+        try:
+            fps_info = self._parse_frame_rate(video_stream.get('avg_frame_rate', ''))
+        except ValueError:
+            fps_info = self._parse_frame_rate(video_stream.get('r_frame_rate', '30/1'))
         
         # 継続時間を取得
         duration = float(raw_metadata.get('format', {}).get('duration', 0))
@@ -110,32 +177,31 @@ class VideoMetadataExtractor:
             
         Returns:
             フレームレート情報の辞書
+            
+        Raises:
+            ValueError: 数値でない、または0以下のフレームレートの場合（ffprobeは不明な場合に"0/0"を返す）
         """
         try:
             if '/' in fps_string:
                 num, den = map(int, fps_string.split('/'))
-                fps = num / den
             else:
-                fps = float(fps_string)
-                num, den = fps, 1
-                
-            # タイムベースを決定
-            timebase = round(fps)
+                num, den = float(fps_string), 1
+        except (ValueError, TypeError):
+            raise ValueError(f"フレームレートを解析できません: {fps_string!r}") from None
+        
+        if num <= 0 or den <= 0:
+            raise ValueError(f"無効なフレームレートです: {fps_string}")
+        fps = num / den
             
-            return {
-                'fps': fps,
-                'numerator': num,
-                'denominator': den,
-                'timebase': timebase
-            }
-        except:
-            # デフォルト値
-            return {
-                'fps': 30.0,
-                'numerator': 30,
-                'denominator': 1,
-                'timebase': 30
-            }
+        # タイムベースを決定
+        timebase = round(fps)
+        
+        return {
+            'fps': fps,
+            'numerator': num,
+            'denominator': den,
+            'timebase': timebase
+        }
     
     def _is_ntsc_frame_rate(self, fps: float) -> bool:
         """